@@ -1,4 +1,5 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, verify_jwt_in_request
@@ -16,6 +17,11 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 import pytz
 
+try:
+    import orjson
+except ImportError:  # Optional; without it responses use Flask's stdlib json encoder
+    orjson = None
+
 # Configure logging to show all logs in terminal
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +41,22 @@ if backend_env_path.exists():
 
 app = Flask(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode jsonify() responses with orjson, keeping Flask's key order and fallbacks."""
+    
+    def dumps(self, obj, **kwargs):
+        # Pretty-printed debug output keeps the stdlib path
+        if 'indent' in kwargs:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        # Datetimes go through Flask's default so they keep the HTTP date format
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string-change-in-production')
@@ -935,7 +957,8 @@ def get_relevant_articles():
         
         # Check if we should exclude hidden articles (for dashboard)
         exclude_hidden = request.args.get('exclude_hidden', 'false').lower() == 'true'
-        hidden_clause = 'AND (ec.hidden_from_dashboard IS NULL OR ec.hidden_from_dashboard = 0)' if exclude_hidden else ''
+        # Matches the idx_ec_visible_ranked partial index predicate
+        hidden_clause = 'AND COALESCE(ec.hidden_from_dashboard, 0) = 0' if exclude_hidden else ''
         
         # Get relevant articles with enhanced classification data
         query = f"""
@@ -1816,32 +1839,20 @@ def scheduled_fetch_articles():
             # Send summary email to all admins
             if ADMIN_EMAILS:
                 try:
-                    from utils.email_sender import send_summary_email
+                    from utils.email_sender import send_summary_email_bulk
                     subject = f"📅 Scheduled Article Processing Complete: {start_date} to {end_date}"
                     
-                    # Send email to each admin
-                    emails_sent = 0
-                    for admin_email in ADMIN_EMAILS:
-                        try:
-                            success = send_summary_email(
-                                to_email=admin_email,
-                                subject=subject,
-                                summary_data=result,
-                                start_date=start_date,
-                                end_date=end_date
-                            )
-                            if success:
-                                emails_sent += 1
-                                task_logger.info(f"✅ Summary email sent to {admin_email}")
-                            else:
-                                task_logger.warning(f"⚠️ Failed to send email to {admin_email}")
-                        except Exception as email_error:
-                            task_logger.error(f"Error sending email to {admin_email}: {email_error}", exc_info=True)
-                    
-                    if emails_sent > 0:
-                        task_logger.info(f"📧 Summary emails sent to {emails_sent}/{len(ADMIN_EMAILS)} admin(s)")
+                    # One message is built and sent to each admin
+                    if send_summary_email_bulk(
+                        to_emails=ADMIN_EMAILS,
+                        subject=subject,
+                        summary_data=result,
+                        start_date=start_date,
+                        end_date=end_date
+                    ):
+                        task_logger.info(f"📧 Summary emails queued for {len(ADMIN_EMAILS)} admin(s)")
                     else:
-                        task_logger.warning("⚠️ No summary emails were sent successfully")
+                        task_logger.warning("⚠️ No summary emails were queued")
                 except ImportError:
                     task_logger.warning("Email sender module not found. Skipping email notification.")
                 except Exception as email_error:
@@ -1854,22 +1865,18 @@ def scheduled_fetch_articles():
             # Send error notification email to all admins
             if ADMIN_EMAILS:
                 try:
-                    from utils.email_sender import send_summary_email
+                    from utils.email_sender import send_summary_email_bulk
                     subject = f"❌ Scheduled Article Processing Failed: {start_date} to {end_date}"
                     
-                    # Send error email to each admin
-                    for admin_email in ADMIN_EMAILS:
-                        try:
-                            send_summary_email(
-                                to_email=admin_email,
-                                subject=subject,
-                                summary_data=result,
-                                start_date=start_date,
-                                end_date=end_date
-                            )
-                            task_logger.info(f"Error notification email sent to {admin_email}")
-                        except Exception as email_error:
-                            task_logger.error(f"Error sending error notification to {admin_email}: {email_error}")
+                    # One message is built and sent to each admin
+                    if send_summary_email_bulk(
+                        to_emails=ADMIN_EMAILS,
+                        subject=subject,
+                        summary_data=result,
+                        start_date=start_date,
+                        end_date=end_date
+                    ):
+                        task_logger.info(f"Error notification emails queued for {len(ADMIN_EMAILS)} admin(s)")
                 except Exception:
                     pass  # Don't fail if email sending fails
             
@@ -1879,24 +1886,20 @@ def scheduled_fetch_articles():
         # Try to send error notification email to all admins
         if ADMIN_EMAILS:
             try:
-                from utils.email_sender import send_summary_email
+                from utils.email_sender import send_summary_email_bulk
                 error_result = {
                     'success': False,
                     'error': str(e)
                 }
                 subject = "❌ Scheduled Article Processing Error"
                 
-                for admin_email in ADMIN_EMAILS:
-                    try:
-                        send_summary_email(
-                            to_email=admin_email,
-                            subject=subject,
-                            summary_data=error_result,
-                            start_date='N/A',
-                            end_date='N/A'
-                        )
-                    except Exception:
-                        pass  # Don't fail if email sending fails
+                send_summary_email_bulk(
+                    to_emails=ADMIN_EMAILS,
+                    subject=subject,
+                    summary_data=error_result,
+                    start_date='N/A',
+                    end_date='N/A'
+                )
             except Exception:
                 pass  # Don't fail if email sending fails
 
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from medical_processing.database.schema import get_read_connection, get_write_connection
+
+logger = logging.getLogger(__name__)
+
+# Keep IN (...) lists under SQLite's host-parameter limit on older builds
+_IN_CHUNK = 500
+
+# Shorter titles are too generic to identify the same study across records
+_MIN_TITLE_WORDS = 8
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Part of every key; bump when the classifier's prompts or scoring change so earlier
+# results are classified again instead of being served from the cache
+PROMPT_VERSION = "v3.0"
+
+_dumps = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+def key(article: Dict, model_provider: str = "claude") -> str:
+    """Exact-match cache key: MD5 of the provider, prompt version and normalized title + abstract."""
+    text = f"{article.get('title') or ''} {article.get('abstract') or ''}".lower().strip()
+    return hashlib.md5(f"{model_provider}:{PROMPT_VERSION}:{text}".encode('utf-8')).hexdigest()
+
+def title_key(article: Dict, model_provider: str = "claude") -> Optional[str]:
+    """Near-duplicate key: MD5 of the provider and the title's words, ignoring case and punctuation."""
+    words = _WORD_RE.findall((article.get('title') or '').lower())
+    if len(words) < _MIN_TITLE_WORDS:
+        return None
+    return hashlib.md5(f"{model_provider}:{PROMPT_VERSION}:title:{' '.join(words)}".encode('utf-8')).hexdigest()
+
+_SQL_SELECT_EXACT = "SELECT key, classification_json FROM classification_cache WHERE key IN ({})"
+
+_SQL_SELECT_BY_TITLE = """
+    SELECT t.title_key, c.classification_json
+    FROM classification_cache_titles t
+    JOIN classification_cache c ON c.key = t.key
+    WHERE t.title_key IN ({})
+"""
+
+def _select_in(conn, sql: str, keys: List[str]) -> Dict[str, str]:
+    """Run a two-column SELECT whose IN list is `{}` over keys in chunks of _IN_CHUNK."""
+    found = {}
+    for start in range(0, len(keys), _IN_CHUNK):
+        chunk = keys[start:start + _IN_CHUNK]
+        found.update(conn.execute(sql.format(','.join('?' * len(chunk))), chunk))
+    return found
+
+def lookup(articles: List[Dict], model_provider: str = "claude") -> List[Optional[Dict]]:
+    """Return the cached classification for each article, or None on a miss."""
+    keys = [key(article, model_provider) for article in articles]
+    try:
+        with get_read_connection() as conn:
+            found = _select_in(conn, _SQL_SELECT_EXACT, keys)
+            # Exact misses fall back to an earlier article with the same normalized title,
+            # e.g. a preprint re-indexed with a revised abstract
+            title_keys = {}
+            for i, article in enumerate(articles):
+                if keys[i] not in found:
+                    near_key = title_key(article, model_provider)
+                    if near_key is not None:
+                        title_keys[i] = near_key
+            similar = _select_in(conn, _SQL_SELECT_BY_TITLE, list(title_keys.values()))
+    except sqlite3.Error as e:
+        logger.warning(f"Classification cache lookup failed: {e}")
+        return [None] * len(articles)
+    
+    results = [json.loads(found[k]) if k in found else None for k in keys]
+    title_hits = 0
+    for i, near_key in title_keys.items():
+        if near_key in similar:
+            results[i] = json.loads(similar[near_key])
+            title_hits += 1
+    
+    if found or title_hits:
+        logger.info(f"Classification cache hits: {len(found)} exact + {title_hits} by title of {len(articles)}")
+    return results
+
+def store(results: List[Tuple[Dict, Dict]], model_provider: str = "claude") -> None:
+    """Cache (article, classification) pairs in one transaction."""
+    if not results:
+        return
+    rows, title_rows = [], []
+    for article, result in results:
+        exact_key = key(article, model_provider)
+        rows.append((exact_key, _dumps(result)))
+        near_key = title_key(article, model_provider)
+        if near_key is not None:
+            title_rows.append((near_key, exact_key))
+    try:
+        with get_write_connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO classification_cache (key, classification_json) VALUES (?, ?)", rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO classification_cache_titles (title_key, key) VALUES (?, ?)", title_rows
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Classification cache store failed: {e}")
@@ -1,10 +1,17 @@
+import asyncio
 import logging
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
 import os
+import re
+import threading
 import time
+from datetime import datetime
 from dotenv import load_dotenv
-from medical_processing.config import MEDICAL_CATEGORIES
+from medical_processing.config import MEDICAL_CATEGORIES, NON_RESEARCH_PUBLICATION_TYPES
+from medical_processing.classification import cache as classification_cache
 import anthropic
 import google.generativeai as genai
 
@@ -14,76 +21,95 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class MedicalArticleClassifier:
-    """Classifier for medical articles using Claude or Gemini API."""
-    
-    def __init__(self, model_provider: str = "claude"):
-        """
-        Initialize the classifier with specified model provider.
-        
-        Args:
-            model_provider: Either "claude" or "gemini" (default: "claude" for Claude Sonnet 4.5)
-        """
-        self.medical_categories = MEDICAL_CATEGORIES
-        self.model_provider = model_provider.lower()
-        
-        if self.model_provider == "claude":
-            self._init_claude()
-        elif self.model_provider == "gemini":
-            self._init_gemini()
-        else:
-            raise ValueError("model_provider must be either 'claude' or 'gemini'")
+# Reason the default (error) responses carry; such results are never cached
+_ERROR_REASON = 'API error or content filtering'
+
+# Articles sent to the model per filtering prompt
+FILTER_BATCH_SIZE = 5
+
+# Seconds between status checks while a Message Batch is processing (batches take minutes to hours)
+BATCH_POLL_INTERVAL = 60
+
+# Animal-model titles with no sign of human subjects. Only unambiguous cases are rejected
+# locally: bare words like 'murine' or 'rat' also name human diseases (murine typhus, rat-bite
+# fever), and pediatric, obstetric, transplant or in vitro wording can still describe adult
+# internal-medicine studies, so everything else goes to the model
+_ANIMAL_MODEL_TITLE = re.compile(
+    r'\bmice\b|\b(?:mouse|rat|zebrafish|rodent|murine) models?\b|\bin (?:rats|zebrafish|rodents)\b', re.I)
+_HUMAN_SUBJECT_TITLE = re.compile(
+    r'\b(?:patients?|humans?|adults?|men|women|people|persons?|participants?|individuals?|cohorts?|trials?)\b', re.I)
+
+# Notices about another article rather than research of their own
+_NOTICE_TITLE = re.compile(r'^\W*(?:erratum|errata|corrigendum|correction|retraction|expression of concern)\b', re.I)
+
+# Rejections made without an API call, by reason; each one is a filtering call saved
+prefilter_hits: Counter = Counter()
+_PREFILTER_HITS_LOCK = threading.Lock()
+
+# Hold new Claude calls back once no more than this share of a rate-limit budget remains
+RATE_LIMIT_HEADROOM = 0.05
+
+class _RateLimitBudget:
+    """Pause calls until the reset time when the anthropic-ratelimit-* headers show a budget nearly spent."""
     
-    def _init_claude(self):
-        """Initialize Claude client."""
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-        
-        self.client = anthropic.Anthropic(api_key=api_key)
-        self.model = "claude-sonnet-4-5-20250929"  # Latest and most advanced model
-        logger.info("Initialized Claude classifier")
+    _KINDS = ('requests', 'tokens', 'input-tokens', 'output-tokens')
     
-    def _init_gemini(self):
-        """Initialize Gemini client."""
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable not set")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
-        logger.info("Initialized Gemini classifier")
+    def __init__(self, headroom: float = RATE_LIMIT_HEADROOM):
+        self._headroom = headroom
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
     
+    def wait(self):
+        with self._lock:
+            delay = self._resume_at - time.time()
+        if delay > 0:
+            logger.info("Rate limit budget nearly spent; waiting %.1fs for it to reset", delay)
+            time.sleep(delay)
     
-    def create_inclusion_based_filtering_prompt(self, title: str, abstract: str, 
-                              mesh_terms: str, publication_type: str, journal_name: str = None) -> str:
-        """Create an inclusion-focused prompt for filtering articles for relevance."""
-        
-        # Handle journal info display
-        journal_display = journal_name if journal_name else "Not specified"
-        
-        prompt = f"""
-You are an expert AI medical research analyst. Your task is to determine if a PubMed article is relevant for a dashboard for internal medicine doctors in Israel.
-Analyze the provided article information and determine relevance. Your final output must be only the JSON object, with no introductory or concluding text.
+    def update(self, headers):
+        resume_at = 0.0
+        for kind in self._KINDS:
+            limit = headers.get(f'anthropic-ratelimit-{kind}-limit')
+            remaining = headers.get(f'anthropic-ratelimit-{kind}-remaining')
+            reset = headers.get(f'anthropic-ratelimit-{kind}-reset')
+            if not (limit and remaining and reset):
+                continue
+            try:
+                if int(remaining) > int(limit) * self._headroom:
+                    continue
+                resume_at = max(resume_at, datetime.fromisoformat(reset.replace('Z', '+00:00')).timestamp())
+            except ValueError:
+                continue
+        # The latest response reflects the current budget, so it also lifts an earlier pause
+        with self._lock:
+            self._resume_at = resume_at
 
-**Input:**
-Title: {title}
-Abstract: {abstract}
-MeSH Terms: {mesh_terms}
-Publication Type: {publication_type}
-Journal: {journal_display}
+# Limits apply per API key, so every classifier in the process shares one budget
+_claude_budget = _RateLimitBudget()
 
-**Output Schema (JSON):**
-{{
-    "is_relevant": "boolean",
-    "reason": "string"
-}}
+def _prefilter_reason(article_data: Dict) -> Optional[str]:
+    """Rejection reason from the publication type or title alone, if any."""
+    publication_type = (article_data.get('publication_type') or '').lower()
+    if any(non_research in publication_type for non_research in NON_RESEARCH_PUBLICATION_TYPES):
+        return 'Non-research publication type'
+    title = article_data.get('title') or ''
+    if _NOTICE_TITLE.search(title):
+        return 'Erratum or retraction notice'
+    if _ANIMAL_MODEL_TITLE.search(title) and not _HUMAN_SUBJECT_TITLE.search(title):
+        return 'Basic science focus'
+    return None
 
-IMPORTANT: The "reason" field must ALWAYS be filled with a brief explanation:
-- If is_relevant is TRUE: Provide the reason for INCLUSION (e.g., "RCT on sepsis treatment", "Guidelines for heart failure management")
-- If is_relevant is FALSE: Provide the reason for REJECTION (e.g., "Pediatric focus", "Basic science focus")
+def prefilter_article(article_data: Dict) -> Optional[Dict]:
+    """Filtering result for an article its publication type or title alone rejects, else None."""
+    reason = _prefilter_reason(article_data)
+    if reason is None:
+        return None
+    with _PREFILTER_HITS_LOCK:
+        prefilter_hits[reason] += 1
+    return {'is_relevant': False, 'reason': reason}
 
-FILTERING LOGIC
+# Relevance rules shared by the single-article and batched filtering prompts
+_FILTERING_CRITERIA = """FILTERING LOGIC
 Evaluate the article step by step. Default to "is_relevant": false and set to true only if inclusion criteria are met and no rejection criteria apply.
 
 STEP 1: IMMEDIATE REJECTIONS (Apply First)
@@ -156,7 +182,78 @@ Reason: "Does not match inclusion criteria for internal medicine dashboard"
 STEP 3: FINAL VALIDATION
 If inclusion criteria are met, verify it's truly an internal medicine disease. 
 Else, reject with reason: "internal medicine disease"
+"""
+
+class MedicalArticleClassifier:
+    """Classifier for medical articles using Claude or Gemini API."""
+    
+    def __init__(self, model_provider: str = "claude"):
+        """
+        Initialize the classifier with specified model provider.
+        
+        Args:
+            model_provider: Either "claude" or "gemini" (default: "claude" for Claude Sonnet 4.5)
+        """
+        self.medical_categories = MEDICAL_CATEGORIES
+        self.model_provider = model_provider.lower()
+        
+        if self.model_provider == "claude":
+            self._init_claude()
+        elif self.model_provider == "gemini":
+            self._init_gemini()
+        else:
+            raise ValueError("model_provider must be either 'claude' or 'gemini'")
+    
+    def _init_claude(self):
+        """Initialize Claude client."""
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+        
+        self.client = anthropic.Anthropic(api_key=api_key)
+        self.model = "claude-sonnet-4-5-20250929"  # Latest and most advanced model
+        logger.info("Initialized Claude classifier")
+    
+    def _init_gemini(self):
+        """Initialize Gemini client."""
+        api_key = os.getenv('GOOGLE_API_KEY')
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable not set")
+        
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        logger.info("Initialized Gemini classifier")
+    
+    
+    def create_inclusion_based_filtering_prompt(self, title: str, abstract: str, 
+                              mesh_terms: str, publication_type: str, journal_name: str = None) -> str:
+        """Create an inclusion-focused prompt for filtering articles for relevance."""
+        
+        # Handle journal info display
+        journal_display = journal_name if journal_name else "Not specified"
+        
+        prompt = f"""
+You are an expert AI medical research analyst. Your task is to determine if a PubMed article is relevant for a dashboard for internal medicine doctors in Israel.
+Analyze the provided article information and determine relevance. Your final output must be only the JSON object, with no introductory or concluding text.
 
+**Input:**
+Title: {title}
+Abstract: {abstract}
+MeSH Terms: {mesh_terms}
+Publication Type: {publication_type}
+Journal: {journal_display}
+
+**Output Schema (JSON):**
+{{
+    "is_relevant": "boolean",
+    "reason": "string"
+}}
+
+IMPORTANT: The "reason" field must ALWAYS be filled with a brief explanation:
+- If is_relevant is TRUE: Provide the reason for INCLUSION (e.g., "RCT on sepsis treatment", "Guidelines for heart failure management")
+- If is_relevant is FALSE: Provide the reason for REJECTION (e.g., "Pediatric focus", "Basic science focus")
+
+{_FILTERING_CRITERIA}
 *Example Outputs:*
 
 For INCLUDED article:
@@ -170,6 +267,56 @@ For REJECTED article:
     "is_relevant": false,
     "reason": "Pediatric focus"
 }}
+"""
+        return prompt
+
+    def _build_batched_prompt(self, articles_chunk: List[Dict]) -> str:
+        """Create one filtering prompt covering several articles, answered as a JSON array."""
+        article_blocks = []
+        for n, article in enumerate(articles_chunk, 1):
+            article_blocks.append(f"""Article {n}:
+PMID: {article.get('pmid', '')}
+Title: {article.get('title', '')}
+Abstract: {article.get('abstract', '')}
+MeSH Terms: {article.get('mesh_terms', '')}
+Publication Type: {article.get('publication_type', '')}
+Journal: {article.get('journal') or 'Not specified'}""")
+        articles_display = "\n\n".join(article_blocks)
+
+        prompt = f"""
+You are an expert AI medical research analyst. Your task is to determine, for each of the {len(articles_chunk)} PubMed articles below, whether it is relevant for a dashboard for internal medicine doctors in Israel.
+Judge every article independently. Your final output must be only the JSON array, with no introductory or concluding text.
+
+**Input:**
+{articles_display}
+
+**Output Schema (JSON array, one object per article, in input order):**
+[
+    {{
+        "pmid": "string",
+        "is_relevant": "boolean",
+        "reason": "string"
+    }}
+]
+
+IMPORTANT: Copy each article's PMID exactly into "pmid". The "reason" field must ALWAYS be filled with a brief explanation:
+- If is_relevant is TRUE: Provide the reason for INCLUSION (e.g., "RCT on sepsis treatment", "Guidelines for heart failure management")
+- If is_relevant is FALSE: Provide the reason for REJECTION (e.g., "Pediatric focus", "Basic science focus")
+
+{_FILTERING_CRITERIA}
+*Example Output:*
+[
+    {{
+        "pmid": "12345678",
+        "is_relevant": true,
+        "reason": "RCT on antibiotic therapy for septic shock"
+    }},
+    {{
+        "pmid": "23456789",
+        "is_relevant": false,
+        "reason": "Pediatric focus"
+    }}
+]
 """
         return prompt
 
@@ -344,27 +491,9 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
             # Parse JSON
             result = json.loads(response)
 
-            # Coerce field types
-            if 'is_relevant' in result and isinstance(result['is_relevant'], str):
-                lower_val = result['is_relevant'].strip().lower()
-                result['is_relevant'] = lower_val in {'true', 'yes', 'y', '1'}
-            
-            # Validate required fields
-            required_fields = ['is_relevant']
-            for field in required_fields:
-                if field not in result:
-                    logger.error(f"Missing required field: {field}")
-                    return self._get_default_filtering_response()
-            
-            # Ensure optional fields have default values
-            reason = result.get('reason', None)
-            if reason is not None and not isinstance(reason, str):
-                try:
-                    result['reason'] = str(reason)
-                except Exception:
-                    result['reason'] = None
-            else:
-                result.setdefault('reason', None)
+            result = self._normalize_filtering_result(result)
+            if result is None:
+                return self._get_default_filtering_response()
             
             return result
             
@@ -373,11 +502,71 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
             logger.error(f"Response was: {response}")
             return self._get_default_filtering_response()
     
+    def parse_batched_filtering_response(self, response: str, pmids: List[str]) -> Dict[str, Dict]:
+        """Parse a batched filtering response into {pmid: filtering result}, skipping invalid items."""
+        results = {}
+        try:
+            response = response.strip()
+            if response.startswith('```'):
+                response = response.split('\n', 1)[1]
+            if response.endswith('```'):
+                response = response.rsplit('\n', 1)[0]
+            # Trim any preface/trailer around the array
+            first_bracket = response.find('[')
+            last_bracket = response.rfind(']')
+            if first_bracket >= 0 and last_bracket > first_bracket:
+                response = response[first_bracket:last_bracket + 1]
+
+            items = json.loads(response)
+            if not isinstance(items, list):
+                raise ValueError("Batched filtering response is not a JSON array")
+        except (json.JSONDecodeError, IndexError, ValueError) as e:
+            logger.error(f"Error parsing batched filtering response: {e}")
+            return results
+
+        expected = set(pmids)
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            pmid = str(item.pop('pmid', '')).strip()
+            if pmid not in expected or pmid in results:
+                continue
+            result = self._normalize_filtering_result(item)
+            if result is not None:
+                results[pmid] = result
+        return results
+
+    def _normalize_filtering_result(self, result: Dict) -> Optional[Dict]:
+        """Coerce a parsed filtering object's field types; None if it lacks required fields."""
+        # Coerce field types
+        if 'is_relevant' in result and isinstance(result['is_relevant'], str):
+            lower_val = result['is_relevant'].strip().lower()
+            result['is_relevant'] = lower_val in {'true', 'yes', 'y', '1'}
+        
+        # Validate required fields
+        required_fields = ['is_relevant']
+        for field in required_fields:
+            if field not in result:
+                logger.error(f"Missing required field: {field}")
+                return None
+        
+        # Ensure optional fields have default values
+        reason = result.get('reason', None)
+        if reason is not None and not isinstance(reason, str):
+            try:
+                result['reason'] = str(reason)
+            except Exception:
+                result['reason'] = None
+        else:
+            result.setdefault('reason', None)
+        
+        return result
+    
     def _get_default_filtering_response(self) -> Dict:
         """Get default filtering response structure for error cases."""
         return {
             'is_relevant': False,
-            'reason': 'API error or content filtering'
+            'reason': _ERROR_REASON
         }
 
     def parse_enhanced_response(self, response: str) -> Dict:
@@ -512,7 +701,7 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
         return {
             'participants': None,
             'is_relevant': False,
-            'reason': 'API error or content filtering',
+            'reason': _ERROR_REASON,
             'medical_category': 'Other',
             'clinical_bottom_line': '',
             'tags': [],
@@ -567,10 +756,15 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
         if not title and not abstract:
             return self._get_default_filtering_response()
         
+        rejected = prefilter_article(article_data)
+        if rejected:
+            logger.info("Rejected without an API call (%s): %.50s...", rejected['reason'], title)
+            return rejected
+        
         prompt = self.create_inclusion_based_filtering_prompt(title, abstract, mesh_terms, 
         publication_type, journal_name)
         
-        logger.info(f"Filtering: {title[:50]}... (Journal: {journal_name})")
+        logger.info("Filtering: %.50s... (Journal: %s)", title, journal_name)
         
         try:
             # Call API directly
@@ -584,9 +778,41 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
             if "safety filters" in str(e) or "recitation filters" in str(e):
                 logger.warning("Using fallback filtering response due to content filtering")
             return self._get_default_filtering_response()
-    
-    
-    
+
+    def filter_articles(self, articles: List[Dict]) -> List[Dict]:
+        """Filter several articles with a single prompt; articles the model skips are filtered one by one."""
+        results: List[Optional[Dict]] = [None] * len(articles)
+        batchable = []
+        for i, article in enumerate(articles):
+            if not article.get('title') and not article.get('abstract'):
+                results[i] = self._get_default_filtering_response()
+            elif (rejected := prefilter_article(article)) is not None:
+                results[i] = rejected
+            elif article.get('pmid'):
+                batchable.append(i)
+
+        # A single article gains nothing from the batched prompt
+        if len(batchable) > 1:
+            chunk = [articles[i] for i in batchable]
+            pmids = [str(article['pmid']) for article in chunk]
+            logger.info(f"Filtering batch of {len(chunk)} articles: {', '.join(pmids)}")
+            try:
+                response = self._call_api(self._build_batched_prompt(chunk))
+                parsed = self.parse_batched_filtering_response(response, pmids)
+            except Exception as e:
+                logger.error(f"Error calling {self.model_provider} API for batched filtering: {e}")
+                parsed = {}
+            for i, pmid in zip(batchable, pmids):
+                results[i] = parsed.get(pmid)
+
+        # Re-queue anything missing from the batched answer individually
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing and len(batchable) > 1:
+            logger.warning(f"Batched filtering missed {len(missing)} article(s); filtering individually")
+        for i in missing:
+            results[i] = self.filter_article(articles[i])
+        return results
+
     def classify_relevant_article(self, article_data: Dict) -> Dict:
         """Classify, rank, and summarize a relevant article using the specified model provider."""
         title = article_data.get('title', '')
@@ -602,7 +828,7 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
         prompt = self.create_classification_prompt(title, abstract, mesh_terms, 
                                                  publication_type, journal_name)
         
-        logger.info(f"Classifying relevant article: {title[:50]}... (Journal: {journal_name})")
+        logger.info("Classifying relevant article: %.50s... (Journal: %s)", title, journal_name)
         
         
         try:
@@ -618,15 +844,20 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
                 logger.warning("Using fallback classification response due to content filtering")
             return self._get_default_enhanced_response()
 
-    def classify_article_enhanced(self, article_data: Dict, force_relevant: bool = False) -> Dict:
-        """Classify a single article using the specified model provider with two-step approach."""
-        # Step 1: Filter for relevance (unless forced)
+    def classify_article_enhanced(self, article_data: Dict, force_relevant: bool = False,
+                                  filtering_result: Optional[Dict] = None,
+                                  classification_result: Optional[Dict] = None) -> Dict:
+        """Classify a single article using the specified model provider with two-step approach.
+        
+        Either step's model output can be passed in (e.g. from a Message Batch) to skip its API call.
+        """
+        # Step 1: Filter for relevance (unless forced or already filtered in a batch)
         if force_relevant:
             filtering_result = {
                 'is_relevant': True,
                 'reason': 'Forced relevance by user'
             }
-        else:
+        elif filtering_result is None:
             filtering_result = self.filter_article(article_data)
         
         # If not relevant, return with filtering results and default values
@@ -636,7 +867,8 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
             return result
         
         # Step 2: If relevant, perform full classification
-        classification_result = self.classify_relevant_article(article_data)
+        if classification_result is None:
+            classification_result = self.classify_relevant_article(article_data)
         
         # Step 3: Apply rule-based scoring for relevant articles (title-based, journal-based)
         rule_based_scores = self._calculate_rule_based_scores(article_data)
@@ -686,27 +918,120 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
         
         result['ranking_score'] = max(0, total_score)  # Ensure score doesn't go below 0
         
-        logger.info(f"Ranking breakdown: base={base_score}, "
-                   f"prevention={prevention_penalty_points}, biologic={biologic_penalty_points}, "
-                   f"screening={screening_penalty_points}, scores={scores_penalty_points}, "
-                   f"subanalysis={subanalysis_penalty_points}, "
-                   f"neurology={neurology_penalty_points}, total={result['ranking_score']}")
+        logger.info("Ranking breakdown: base=%s, prevention=%s, biologic=%s, screening=%s, "
+                    "scores=%s, subanalysis=%s, neurology=%s, total=%s",
+                    base_score, prevention_penalty_points, biologic_penalty_points,
+                    screening_penalty_points, scores_penalty_points, subanalysis_penalty_points,
+                    neurology_penalty_points, result['ranking_score'])
         
         return result
     
     
     
+    def _message_params(self, prompt: str) -> Dict:
+        """Claude request parameters, shared by direct calls and Message Batch requests."""
+        return {
+            'model': self.model,
+            'max_tokens': 2500,
+            'temperature': 0.01,  # Low temperature for consistent classification
+            'messages': [{"role": "user", "content": prompt}],
+        }
+    
+    def submit_batch(self, prompts: Dict[str, str]) -> str:
+        """Submit {custom_id: prompt} as one Claude Message Batch and return its ID."""
+        if self.model_provider != "claude":
+            raise ValueError("Message Batches require model_provider 'claude'")
+        batch = self.client.messages.batches.create(requests=[
+            {'custom_id': custom_id, 'params': self._message_params(prompt)}
+            for custom_id, prompt in prompts.items()
+        ])
+        logger.info("Submitted message batch %s with %d requests", batch.id, len(prompts))
+        return batch.id
+    
+    def wait_for_batch(self, batch_id: str,
+                       poll_interval: float = BATCH_POLL_INTERVAL) -> Iterator[Tuple[str, Optional[str]]]:
+        """Poll a Message Batch until it ends, then yield (custom_id, response text, or None if the request failed)."""
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == 'ended':
+                break
+            logger.info("Message batch %s is %s: %s", batch_id, batch.processing_status, batch.request_counts)
+            time.sleep(poll_interval)
+        
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == 'succeeded':
+                yield entry.custom_id, entry.result.message.content[0].text
+            else:
+                # errored, canceled or expired
+                logger.warning("Message batch %s request %s %s", batch_id, entry.custom_id, entry.result.type)
+                yield entry.custom_id, None
+    
+    def _run_batch(self, prompts: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Submit prompts as a Message Batch and block until every response is in."""
+        if not prompts:
+            return {}
+        return dict(self.wait_for_batch(self.submit_batch(prompts)))
+    
+    def classify_articles_via_batch(self, articles: List[Dict]) -> List[Dict]:
+        """Two-step classification of many articles through Claude Message Batches.
+        
+        Half the price of direct calls and free of rate limiting, but results take up to 24 hours:
+        one batch filters every article, a second classifies the relevant ones. Results match
+        classify_article_enhanced, with default (uncacheable) responses where a request failed.
+        """
+        # Step 1: filter, with the same local short-circuits as filter_article
+        filtering_results: List[Optional[Dict]] = [None] * len(articles)
+        prompts = {}
+        for i, article in enumerate(articles):
+            if not article.get('title') and not article.get('abstract'):
+                filtering_results[i] = self._get_default_filtering_response()
+            elif (rejected := prefilter_article(article)) is not None:
+                filtering_results[i] = rejected
+            else:
+                prompts[str(i)] = self.create_inclusion_based_filtering_prompt(
+                    article.get('title', ''), article.get('abstract', ''), article.get('mesh_terms', ''),
+                    article.get('publication_type', ''), article.get('journal', ''))
+        responses = self._run_batch(prompts)
+        for custom_id in prompts:
+            response = responses.get(custom_id)
+            filtering_results[int(custom_id)] = (self.parse_filtering_response(response) if response is not None
+                                                 else self._get_default_filtering_response())
+        
+        # Step 2: classify the relevant articles
+        prompts = {
+            str(i): self.create_classification_prompt(
+                article.get('title', ''), article.get('abstract', ''), article.get('mesh_terms', ''),
+                article.get('publication_type', ''), article.get('journal', ''))
+            for i, (article, filtering_result) in enumerate(zip(articles, filtering_results))
+            if filtering_result.get('is_relevant', False)
+        }
+        responses = self._run_batch(prompts)
+        
+        # Step 3: rule-based scoring and totals, as for a direct call
+        results = []
+        for i, article in enumerate(articles):
+            classification_result = None
+            if str(i) in prompts:
+                response = responses.get(str(i))
+                classification_result = (self.parse_enhanced_response(response) if response is not None
+                                         else self._get_default_enhanced_response())
+            results.append(self.classify_article_enhanced(article, filtering_result=filtering_results[i],
+                                                          classification_result=classification_result))
+        return results
+    
     def _call_api(self, prompt: str) -> str:
         """Call the appropriate API (Claude or Gemini) with the given prompt."""
         try:
             if self.model_provider == "claude":
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=2500,
-                    temperature=0.01,  # Low temperature for consistent classification
-                    messages=[{"role": "user", "content": prompt}],
+                # Sleeps only when the last response showed the budget nearly spent; 429s that
+                # still happen are retried with backoff by the SDK
+                _claude_budget.wait()
+                raw_response = self.client.messages.with_raw_response.create(
+                    **self._message_params(prompt),
                     timeout=60.0  # 60 second timeout to prevent hanging
                 )
+                _claude_budget.update(raw_response.headers)
+                response = raw_response.parse()
                 return response.content[0].text
             elif self.model_provider == "gemini":
                 response = self.model.generate_content(
@@ -744,37 +1069,124 @@ ranking_score = focus_points + type_points + prevalence_points + hospitalization
             raise
     
 
-def classify_articles_batch(articles: List[Dict], model_provider: str = "claude") -> List[Dict]:
-    """Classify a batch of articles using inclusion-based filtering (default: Claude Sonnet 4.5)."""
-    classifier = MedicalArticleClassifier(model_provider=model_provider)
-    classified_articles = []
+def _is_cacheable(result: Dict) -> bool:
+    """Whether a classification came back from the model rather than an error fallback."""
+    if result.get('reason') == _ERROR_REASON:
+        return False
+    # A relevant article whose classification step failed has no bottom line
+    return not (result.get('is_relevant') and not result.get('clinical_bottom_line'))
+
+def _classify_with_fallback(classifier: MedicalArticleClassifier, article: Dict,
+                            filtering_result: Optional[Dict] = None) -> Tuple[Dict, Optional[Dict]]:
+    """Classify one article, falling back to default values on error.
     
-    for i, article in enumerate(articles):
-        try:
-            logger.info(f"Processing article {i+1}/{len(articles)}: {article.get('pmid', 'unknown')}")
-            
-            # Use unified two-step classification (filter then classify)
-            result = classifier.classify_article_enhanced(article)
-            
+    Returns the merged article and the cacheable result (None if it should not be cached).
+    """
+    try:
+        # Use unified two-step classification (filter then classify)
+        result = classifier.classify_article_enhanced(article, filtering_result=filtering_result)
+    except Exception as e:
+        logger.error(f"Error processing article {article.get('pmid', 'unknown')}: {e}")
+        # Add unclassified version with default values
+        result = classifier._get_default_enhanced_response()
+    
+    article_copy = article.copy()
+    article_copy.update(result)
+    return article_copy, (result if _is_cacheable(result) else None)
+
+# One classifier per provider for the life of the process; SDK clients are thread-safe
+_classifiers: Dict[str, MedicalArticleClassifier] = {}
+_CLASSIFIERS_LOCK = threading.Lock()
+
+def get_classifier(model_provider: str = "claude") -> MedicalArticleClassifier:
+    """Shared classifier for a provider, built on first use so SDK clients are set up once."""
+    provider = model_provider.lower()
+    with _CLASSIFIERS_LOCK:
+        classifier = _classifiers.get(provider)
+        if classifier is None:
+            # Construction errors (unknown provider, missing API key) are not cached
+            classifier = _classifiers[provider] = MedicalArticleClassifier(model_provider=provider)
+    return classifier
+
+def _classify_chunk(classifier: MedicalArticleClassifier, chunk: List[Dict]) -> List[Tuple[Dict, Optional[Dict]]]:
+    """Filter a chunk of articles in one prompt, then classify the relevant ones individually."""
+    try:
+        filtering_results = classifier.filter_articles(chunk)
+    except Exception as e:
+        logger.error(f"Error filtering batch: {e}")
+        filtering_results = [None] * len(chunk)
+    return [_classify_with_fallback(classifier, article, filtering_result)
+            for article, filtering_result in zip(chunk, filtering_results)]
+
+def _merge_cached(articles: List[Dict], cached: List[Optional[Dict]]) -> List[Optional[Dict]]:
+    """Merge cache hits into copies of their articles; misses stay None."""
+    merged = []
+    for article, result in zip(articles, cached):
+        if result is None:
+            merged.append(None)
+        else:
             article_copy = article.copy()
             article_copy.update(result)
-            
-            classified_articles.append(article_copy)
-            
-            # Rate limiting - be respectful to Claude API
-            # Two API calls per article, so we need to be more conservative
-            time.sleep(1)  # Increased rate limiting for two-step approach
-            
-        except Exception as e:
-            logger.error(f"Error processing article {article.get('pmid', 'unknown')}: {e}")
-            # Add unclassified version with default values
-            article_copy = article.copy()
-            article_copy.update(classifier._get_default_enhanced_response())
-            classified_articles.append(article_copy)
+            merged.append(article_copy)
+    return merged
+
+def _chunks(indices: List[int], size: int) -> List[List[int]]:
+    """Split article indices into consecutive chunks of at most `size`."""
+    size = max(1, size)
+    return [indices[start:start + size] for start in range(0, len(indices), size)]
+
+def classify_articles_batch(articles: List[Dict], model_provider: str = "claude",
+                            batch_size: int = FILTER_BATCH_SIZE) -> List[Dict]:
+    """Classify a batch of articles using inclusion-based filtering (default: Claude Sonnet 4.5)."""
+    classifier = get_classifier(model_provider)
+    
+    # Identical title/abstract pairs skip the LLM entirely
+    classified_articles = _merge_cached(articles, classification_cache.lookup(articles, model_provider))
+    misses = [i for i, article in enumerate(classified_articles) if article is None]
+    fresh_results = []
     
+    for chunk in _chunks(misses, batch_size):
+        logger.info("Processing articles %d-%d/%d", chunk[0] + 1, chunk[-1] + 1, len(articles))
+        outcomes = _classify_chunk(classifier, [articles[i] for i in chunk])
+        for i, (article_copy, result) in zip(chunk, outcomes):
+            classified_articles[i] = article_copy
+            if result is not None:
+                fresh_results.append((articles[i], result))
+    
+    classification_cache.store(fresh_results, model_provider)
     logger.info(f"Processed {len(classified_articles)} articles using {model_provider} with inclusion-based filtering")
     return classified_articles
 
+async def classify_articles_batch_async(articles: List[Dict], model_provider: str = "claude",
+                                        concurrency: int = 16,
+                                        batch_size: int = FILTER_BATCH_SIZE) -> List[Dict]:
+    """Classify a batch of articles with up to `concurrency` chunks of `batch_size` in flight at once."""
+    classifier = get_classifier(model_provider)
+    loop = asyncio.get_running_loop()
+    
+    classified_articles = _merge_cached(articles, classification_cache.lookup(articles, model_provider))
+    misses = [i for i, article in enumerate(classified_articles) if article is None]
+    chunks = _chunks(misses, batch_size)
+    
+    # The SDK clients are thread-safe; each worker runs the blocking two-step pipeline for one chunk
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        chunk_outcomes = await asyncio.gather(*(
+            loop.run_in_executor(executor, _classify_chunk, classifier, [articles[i] for i in chunk])
+            for chunk in chunks
+        ))
+    
+    fresh_results = []
+    for chunk, outcomes in zip(chunks, chunk_outcomes):
+        for i, (article_copy, result) in zip(chunk, outcomes):
+            classified_articles[i] = article_copy
+            if result is not None:
+                fresh_results.append((articles[i], result))
+    classification_cache.store(fresh_results, model_provider)
+    
+    logger.info(f"Processed {len(classified_articles)} articles using {model_provider} "
+                f"with inclusion-based filtering ({concurrency} concurrent)")
+    return classified_articles
+
 
 
 if __name__ == "__main__":
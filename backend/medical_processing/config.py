@@ -78,6 +78,26 @@ PUBMED_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
 PUBMED_SEARCH_URL = f"{PUBMED_BASE_URL}esearch.fcgi"
 PUBMED_FETCH_URL = f"{PUBMED_BASE_URL}efetch.fcgi"
 
+# Publication types that are never research articles (matched as lowercase substrings of
+# the '; '-joined PubMed types, so e.g. 'retraction' also covers 'Retraction of Publication');
+# the PubMed client drops them at collection and the classifier rejects any that are already
+# stored without an API call
+NON_RESEARCH_PUBLICATION_TYPES = (
+    'editorial', 'letter', 'comment',
+    'news', 'biography', 'historical article',
+    'interview', 'personal narrative', 'portrait',
+    'retraction', 'republished article',
+    'duplicate publication', 'published erratum',
+    'video-audio media', 'audiovisual', 'webcast',
+    'consensus development conference',
+    'congress', 'conference proceedings', 'meeting abstract'
+)
+
 # Collection settings
 ARTICLES_PER_BATCH = 100
-DAYS_TO_COLLECT = 7  # Collect articles from last 7 days
\ No newline at end of file
+DAYS_TO_COLLECT = 7  # Collect articles from last 7 days
+
+# On-disk PubMed response cache (used when requests-cache is installed).
+# efetch records for a PMID rarely change; esearch results grow as new articles are indexed
+PUBMED_FETCH_CACHE_DAYS = 7
+PUBMED_SEARCH_CACHE_HOURS = 1
@@ -1,31 +1,127 @@
+import asyncio
+import itertools
+import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Sequence, Tuple
 import time
 import logging
-from ..config import PUBMED_SEARCH_URL, PUBMED_FETCH_URL, ARTICLES_PER_BATCH, DAYS_TO_COLLECT, JOURNALS
+from ..config import (PUBMED_SEARCH_URL, PUBMED_FETCH_URL, ARTICLES_PER_BATCH, DAYS_TO_COLLECT, JOURNALS,
+                      PUBMED_FETCH_CACHE_DAYS, PUBMED_SEARCH_CACHE_HOURS, NON_RESEARCH_PUBLICATION_TYPES)
+
+try:
+    import requests_cache
+except ImportError:  # Optional; without it every run downloads PubMed responses again
+    requests_cache = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Configured journal names, frozen once so search queries can be cached per tuple
+JOURNAL_NAMES: Tuple[str, ...] = tuple(JOURNALS.values())
+
+# Keep-alive connections to eutils.ncbi.nlm.nih.gov; enough for the concurrent EFetch batches
+_POOL_SIZE = 20
+
+def _create_session() -> requests.Session:
+    """HTTP session for eUtils, backed by an on-disk SQLite cache when requests-cache is installed."""
+    if requests_cache is None:
+        session = requests.Session()
+    else:
+        cache_dir = os.getenv('PERSISTENT_DATA_PATH') or '.'
+        session = requests_cache.CachedSession(
+            os.path.join(cache_dir, 'pubmed_cache'),
+            backend='sqlite',
+            wal=True,
+            expire_after=timedelta(days=PUBMED_FETCH_CACHE_DAYS),
+            # Short-lived search results so re-runs still pick up newly indexed articles
+            urls_expire_after={PUBMED_SEARCH_URL: timedelta(hours=PUBMED_SEARCH_CACHE_HOURS)},
+        )
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=_POOL_SIZE))
+    return session
+
+@lru_cache(maxsize=16)
+def _journal_query(journal_names: Tuple[str, ...]) -> str:
+    """OR-joined [journal] clause for a set of journals, built once per distinct tuple."""
+    return " OR ".join([f'"{journal}"[journal]' for journal in journal_names])
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def _get_shared_session() -> requests.Session:
+    """Process-wide session, so every PubMedClient reuses the same TLS connections."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = _create_session()
+        return _shared_session
+
+class _AsyncRateLimiter:
+    """Space request starts at least 1/rate seconds apart across concurrent coroutines."""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+            self._next_start = max(now, self._next_start) + self._interval
+
+class _RateLimiter:
+    """Thread-safe counterpart of _AsyncRateLimiter for executor workers."""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+# PMIDs per ESearch page
+_SEARCH_PAGE_SIZE = ARTICLES_PER_BATCH * 10
+
+# ESearch only returns the first 10,000 PMIDs of a result set (retstart past 9,999 is rejected)
+_ESEARCH_MAX_RECORDS = 10000
+
 class PubMedClient:
-    """Client for interacting with PubMed API (no API key required)."""
+    """Client for interacting with PubMed API (API key optional)."""
     
-    def __init__(self, email: str = None):
+    def __init__(self, email: str = None, api_key: str = None):
         self.email = email
+        self.api_key = api_key or os.getenv('NCBI_API_KEY')
         self.base_params = {}
         # Email is optional but recommended for higher usage
         if email:
             self.base_params['tool'] = 'medical_articles_system'
             self.base_params['email'] = email
+        if self.api_key:
+            self.base_params['api_key'] = self.api_key
+        # NCBI allows 3 requests/second without an API key, 10 with one
+        self.requests_per_second = 10 if self.api_key else 3
+        # Per-client email/api_key travel as query params, so clients can share one session
+        self.session = _get_shared_session()
         self.ahead_of_print_filtered = 0  # Track filtered articles
         self.non_research_filtered = 0  # Track non-research publication types filtered
         self.no_abstract_filtered = 0  # Track articles without abstracts (non-case reports)
         self.title_filtered = 0  # Track articles filtered by title terms
         self.vaccine_dose_filtered = 0  # Track articles filtered by vaccine + dose/dosing combination
     
-    def search_articles(self, journal_names: List[str], days_back: int = DAYS_TO_COLLECT) -> List[str]:
+    def search_articles(self, journal_names: Sequence[str], days_back: int = DAYS_TO_COLLECT) -> List[str]:
         """Search for article PMIDs from specified journals within the last N days."""
         # Calculate date range
         end_date = datetime.now()
@@ -35,28 +131,15 @@ class PubMedClient:
         date_range = f"{start_date.strftime('%Y/%m/%d')}:{end_date.strftime('%Y/%m/%d')}[pdat]"
         
         # Build journal query
-        journal_query = " OR ".join([f'"{journal}"[journal]' for journal in journal_names])
+        journal_query = _journal_query(tuple(journal_names))
         
         # Complete search query
         search_query = f"({journal_query}) AND {date_range}"
         
-        params = {
-            **self.base_params,
-            'db': 'pubmed',
-            'term': search_query,
-            'retmax': ARTICLES_PER_BATCH * 10,  # Get more to ensure we have enough
-            'retmode': 'xml'
-        }
-        
         logger.info(f"Searching PubMed with query: {search_query}")
         
         try:
-            response = requests.get(PUBMED_SEARCH_URL, params=params, timeout=30)  # 30 second timeout
-            response.raise_for_status()
-            
-            # Parse XML response
-            root = ET.fromstring(response.content)
-            pmids = [id_elem.text for id_elem in root.findall('.//Id')]
+            pmids = self._esearch(search_query)
             
             logger.info(f"Found {len(pmids)} articles")
             return pmids
@@ -68,34 +151,21 @@ class PubMedClient:
             logger.error(f"Error parsing PubMed response: {e}")
             return []
     
-    def search_articles_custom_date(self, journal_names: List[str], start_date: str, end_date: str) -> List[str]:
+    def search_articles_custom_date(self, journal_names: Sequence[str], start_date: str, end_date: str) -> List[str]:
         """Search for article PMIDs from specified journals within a custom date range."""
         # Format dates for PubMed query (expects YYYY/MM/DD format)
         date_range = f"{start_date}:{end_date}[pdat]"
         
         # Build journal query
-        journal_query = " OR ".join([f'"{journal}"[journal]' for journal in journal_names])
+        journal_query = _journal_query(tuple(journal_names))
         
         # Complete search query
         search_query = f"({journal_query}) AND {date_range}"
         
-        params = {
-            **self.base_params,
-            'db': 'pubmed',
-            'term': search_query,
-            'retmax': ARTICLES_PER_BATCH * 10,  # Get more to ensure we have enough
-            'retmode': 'xml'
-        }
-        
         logger.info(f"Searching PubMed with custom date query: {search_query}")
         
         try:
-            response = requests.get(PUBMED_SEARCH_URL, params=params, timeout=30)  # 30 second timeout
-            response.raise_for_status()
-            
-            # Parse XML response
-            root = ET.fromstring(response.content)
-            pmids = [id_elem.text for id_elem in root.findall('.//Id')]
+            pmids = self._esearch(search_query)
             
             logger.info(f"Found {len(pmids)} articles for date range {start_date} to {end_date}")
             return pmids
@@ -107,23 +177,115 @@ class PubMedClient:
             logger.error(f"Error parsing PubMed response: {e}")
             return []
     
-    def fetch_article_details(self, pmids: List[str]) -> List[Dict]:
-        """Fetch detailed article information for given PMIDs."""
-        articles = []
+    def _search_page(self, search_query: str, retstart: int, limiter: _RateLimiter) -> ET.Element:
+        """Fetch and parse one ESearch page of up to _SEARCH_PAGE_SIZE PMIDs."""
+        params = {
+            **self.base_params,
+            'db': 'pubmed',
+            'term': search_query,
+            'retstart': retstart,
+            'retmax': _SEARCH_PAGE_SIZE,
+            'retmode': 'xml'
+        }
+        limiter.wait()
+        response = self.session.get(PUBMED_SEARCH_URL, params=params, timeout=30)  # 30 second timeout
+        response.raise_for_status()
+        return ET.fromstring(response.content)
+    
+    def _search_page_ids(self, search_query: str, retstart: int, limiter: _RateLimiter) -> List[str]:
+        """PMIDs on one later ESearch page; a failed page is logged and yields none."""
+        try:
+            page = self._search_page(search_query, retstart, limiter)
+        except (requests.RequestException, ET.ParseError) as e:
+            logger.error(f"Error fetching PubMed search page at retstart={retstart}: {e}")
+            return []
+        return [id_elem.text for id_elem in page.findall('.//Id')]
+    
+    def _esearch(self, search_query: str) -> List[str]:
+        """All PMIDs matching a query; pages past the first are requested concurrently."""
+        limiter = _RateLimiter(self.requests_per_second)
+        root = self._search_page(search_query, 0, limiter)
+        pmids = [id_elem.text for id_elem in root.findall('.//Id')]
+        total = int(root.findtext('Count') or 0)
+        if total > _ESEARCH_MAX_RECORDS:
+            logger.warning(f"PubMed search matched {total} articles; only the first {_ESEARCH_MAX_RECORDS} "
+                           f"can be retrieved, narrow the date range to collect the rest")
         
+        # Large windows used to be cut off silently at the first page; a failed page
+        # now costs only its own PMIDs, not the pages already fetched
+        offsets = range(_SEARCH_PAGE_SIZE, min(total, _ESEARCH_MAX_RECORDS), _SEARCH_PAGE_SIZE)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=min(len(offsets), self.requests_per_second)) as executor:
+                for page_ids in executor.map(lambda retstart: self._search_page_ids(search_query, retstart, limiter),
+                                             offsets):
+                    pmids.extend(page_ids)
+        
+        # Pages can overlap if new articles are indexed mid-search
+        return list(dict.fromkeys(pmids))
+    
+    def iter_article_details(self, pmids: List[str]) -> Iterator[List[Dict]]:
+        """Yield detailed article information one ARTICLES_PER_BATCH batch at a time."""
         # Process in batches to avoid overwhelming the API
         for i in range(0, len(pmids), ARTICLES_PER_BATCH):
             batch_pmids = pmids[i:i + ARTICLES_PER_BATCH]
-            batch_articles = self._fetch_batch(batch_pmids)
-            articles.extend(batch_articles)
+            yield self._fetch_batch(batch_pmids)
             
             # Be polite to NCBI servers
             time.sleep(0.5)
-        
+    
+    def fetch_article_details(self, pmids: List[str]) -> List[Dict]:
+        """Fetch detailed article information for given PMIDs."""
+        articles = []
+        for batch_articles in self.iter_article_details(pmids):
+            articles.extend(batch_articles)
         return articles
     
+    def _afetch_chunks(self, pmids: List[str]) -> List:
+        """One coroutine per EFetch batch, sharing a rate limiter and concurrency bound."""
+        limiter = _AsyncRateLimiter(self.requests_per_second)
+        semaphore = asyncio.Semaphore(self.requests_per_second)
+        
+        async def fetch_chunk(batch_pmids: List[str]) -> List[Dict]:
+            async with semaphore:
+                await limiter.wait()
+                content = await asyncio.to_thread(self._request_batch, batch_pmids)
+            # Parse on the event loop so the filtering counters are only touched from one thread
+            return self._parse_articles_xml(content) if content is not None else []
+        
+        return [fetch_chunk(pmids[i:i + ARTICLES_PER_BATCH]) for i in range(0, len(pmids), ARTICLES_PER_BATCH)]
+    
+    async def afetch_article_details(self, pmids: List[str]) -> List[Dict]:
+        """Fetch detailed article information with the EFetch batches in flight concurrently."""
+        batches = await asyncio.gather(*self._afetch_chunks(pmids))
+        return [article for batch in batches for article in batch]
+    
+    async def aiter_article_details(self, pmids: List[str]) -> AsyncIterator[List[Dict]]:
+        """Yield EFetch batches concurrently fetched, in completion order."""
+        chunks = iter(self._afetch_chunks(pmids))
+        # Only requests_per_second batches run ahead of the consumer; the next one starts as each is taken
+        in_flight = {asyncio.ensure_future(chunk) for chunk in itertools.islice(chunks, self.requests_per_second)}
+        try:
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+                    next_chunk = next(chunks, None)
+                    if next_chunk is not None:
+                        in_flight.add(asyncio.ensure_future(next_chunk))
+        finally:
+            # Stop the remaining requests when the consumer fails or stops early
+            for task in in_flight:
+                task.cancel()
+            for chunk in chunks:
+                chunk.close()
+    
     def _fetch_batch(self, pmids: List[str]) -> List[Dict]:
         """Fetch a batch of articles."""
+        content = self._request_batch(pmids)
+        return self._parse_articles_xml(content) if content is not None else []
+    
+    def _request_batch(self, pmids: List[str]) -> Optional[bytes]:
+        """Download the EFetch XML for a batch of PMIDs; None on request errors."""
         pmid_string = ",".join(pmids)
         
         params = {
@@ -135,14 +297,14 @@ class PubMedClient:
         }
         
         try:
-            response = requests.get(PUBMED_FETCH_URL, params=params, timeout=30)  # 30 second timeout
+            response = self.session.get(PUBMED_FETCH_URL, params=params, timeout=30)  # 30 second timeout
             response.raise_for_status()
             
-            return self._parse_articles_xml(response.content)
+            return response.content
             
         except requests.RequestException as e:
             logger.error(f"Error fetching article batch: {e}")
-            return []
+            return None
     
     def _parse_articles_xml(self, xml_content: bytes) -> List[Dict]:
         """Parse article XML data into structured format."""
@@ -253,19 +415,8 @@ class PubMedClient:
             
             # Filter out non-research publication types
             if publication_type:
-                filtered_types = [
-                    'editorial', 'letter', 'comment',
-                    'news', 'biography', 'historical article', 
-                    'interview', 'personal narrative', 'portrait',
-                    'retraction', 'retraction of publication',
-                    'corrected and republished article', 'republished article',
-                    'duplicate publication', 'published erratum',
-                    'video-audio media', 'audiovisual', 'webcast',
-                    'consensus development conference', 'consensus development conference, nih',
-                    'congress', 'conference proceedings', 'meeting abstract'
-                ]
                 pub_type_lower = publication_type.lower()
-                if any(filtered_type in pub_type_lower for filtered_type in filtered_types):
+                if any(filtered_type in pub_type_lower for filtered_type in NON_RESEARCH_PUBLICATION_TYPES):
                     logger.info(f"Skipping {publication_type} article: PMID {pmid}")
                     self.non_research_filtered += 1
                     return None
@@ -421,11 +572,8 @@ def collect_recent_articles(email: str = None) -> Dict[str, any]:
     """Main function to collect recent articles from all configured journals."""
     client = PubMedClient(email=email)
     
-    # Get journal names from config
-    journal_names = list(JOURNALS.values())
-    
-    # Search for articles
-    pmids = client.search_articles(journal_names)
+    # Search for articles in all configured journals
+    pmids = client.search_articles(JOURNAL_NAMES)
     
     if not pmids:
         logger.warning("No articles found")
@@ -441,12 +589,15 @@ def collect_recent_articles(email: str = None) -> Dict[str, any]:
     filtering_stats = client.get_filtering_stats()
     
     logger.info(f"Successfully collected {len(articles)} articles")
-    if filtering_stats['ahead_of_print_filtered'] > 0:
-        logger.info(f"Filtered out {filtering_stats['ahead_of_print_filtered']} ahead-of-print articles")
-    if filtering_stats['title_filtered'] > 0:
-        logger.info(f"Filtered out {filtering_stats['title_filtered']} articles with filtered terms in title")
-    if filtering_stats['vaccine_dose_filtered'] > 0:
-        logger.info(f"Filtered out {filtering_stats['vaccine_dose_filtered']} articles with vaccine + dose/dosing in title")
+    ahead_of_print, title_terms, vaccine_dose = (
+        filtering_stats[key] for key in ('ahead_of_print_filtered', 'title_filtered', 'vaccine_dose_filtered')
+    )
+    if ahead_of_print > 0:
+        logger.info(f"Filtered out {ahead_of_print} ahead-of-print articles")
+    if title_terms > 0:
+        logger.info(f"Filtered out {title_terms} articles with filtered terms in title")
+    if vaccine_dose > 0:
+        logger.info(f"Filtered out {vaccine_dose} articles with vaccine + dose/dosing in title")
     
     return {
         'articles': articles,
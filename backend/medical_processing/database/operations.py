@@ -1,565 +1,901 @@
 import sqlite3
 import json
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+import time
+import functools
+from typing import List, Dict, Iterator, Optional, Set, Tuple
+from datetime import datetime, timedelta
 import logging
-from .schema import get_connection
+from .schema import (get_connection, get_read_connection, acquire_connection, release_connection, link_terms,
+                     drop_classification_indexes, rebuild_classification_indexes)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class JournalImpactDatabase:
-    """Database operations for managing journal impact scores."""
+# SQL text kept as module constants so sqlite3's per-connection statement
+# cache reuses the prepared statements across calls.
+_SQL_UPSERT_JOURNAL_IMPACT = '''
+    INSERT INTO journal_impact_scores (
+        journal_name, journal_abbreviation, impact_factor, h_index,
+        sjr_score, eigenfactor_score, article_influence_score,
+        year, source, notes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(journal_name) DO UPDATE SET
+        journal_abbreviation = excluded.journal_abbreviation,
+        impact_factor = excluded.impact_factor,
+        h_index = excluded.h_index,
+        sjr_score = excluded.sjr_score,
+        eigenfactor_score = excluded.eigenfactor_score,
+        article_influence_score = excluded.article_influence_score,
+        year = excluded.year,
+        source = excluded.source,
+        last_updated = CURRENT_TIMESTAMP,
+        notes = excluded.notes
+    RETURNING journal_name
+'''
+
+_SQL_SELECT_JOURNAL_IMPACT = '''
+    SELECT * FROM journal_impact_scores 
+    WHERE journal_name = ? OR journal_abbreviation = ?
+'''
+
+_SQL_SELECT_ALL_JOURNAL_IMPACTS = '''
+    SELECT * FROM journal_impact_scores 
+    ORDER BY impact_factor DESC NULLS LAST
+'''
+
+_SQL_SELECT_JOURNALS_BY_IMPACT_RANGE = '''
+    SELECT * FROM journal_impact_scores 
+    WHERE impact_factor >= ? AND impact_factor <= ?
+    ORDER BY impact_factor DESC
+'''
+
+_SQL_COUNT_JOURNALS = "SELECT COUNT(*) FROM journal_impact_scores"
+
+_SQL_AVG_IMPACT_FACTOR = "SELECT AVG(impact_factor) FROM journal_impact_scores WHERE impact_factor IS NOT NULL"
+
+_SQL_TOP_JOURNALS = '''
+    SELECT journal_name, impact_factor 
+    FROM journal_impact_scores 
+    WHERE impact_factor IS NOT NULL
+    ORDER BY impact_factor DESC 
+    LIMIT 10
+'''
+
+_SQL_JOURNALS_BY_YEAR = '''
+    SELECT year, COUNT(*) as count 
+    FROM journal_impact_scores 
+    WHERE year IS NOT NULL
+    GROUP BY year 
+    ORDER BY year DESC
+'''
+
+_SQL_SELECT_ARTICLE_ID_BY_PMID = "SELECT id FROM articles WHERE pmid = ?"
+
+_SQL_INSERT_ARTICLE = '''
+    INSERT INTO articles (
+        pmid, title, abstract, journal, authors, author_affiliations,
+        publication_date, doi, url, medical_category, article_type,
+        keywords, mesh_terms, publication_type
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(pmid) DO NOTHING
+'''
+
+_SQL_UPDATE_ARTICLE_CLASSIFICATION = '''
+    UPDATE articles 
+    SET medical_category = ?, article_type = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+_SQL_UPSERT_CLASSIFICATION_SCORES = '''
+    INSERT OR REPLACE INTO classification_scores 
+    (article_id, medical_category, article_type, category_confidence, 
+     type_confidence, classifier_version)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_UPDATE_ARTICLE_CATEGORY = '''
+    UPDATE articles 
+    SET medical_category = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+# Updates an existing row in place rather than INSERT OR REPLACE's delete + insert, which
+# rewrote every index entry for the row and reset hidden_from_dashboard and created_at
+_SQL_UPSERT_ENHANCED_CLASSIFICATION = '''
+    INSERT INTO enhanced_classifications 
+    (article_id, participants, is_relevant, reason, medical_category, 
+     clinical_bottom_line, tags, ranking_score, focus_points, type_points,
+     prevalence_points, hospitalization_points, clinical_outcome_points, impact_factor_points,
+     neurology_penalty_points, metabolic_penalty_points, screening_penalty_points, scores_penalty_points,
+     subanalysis_penalty_points, prognosis_penalty_points, classifier_version, created_at, updated_at, temporality_points)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?)
+    ON CONFLICT(article_id) DO UPDATE SET
+        participants = excluded.participants,
+        is_relevant = excluded.is_relevant,
+        reason = excluded.reason,
+        medical_category = excluded.medical_category,
+        clinical_bottom_line = excluded.clinical_bottom_line,
+        tags = excluded.tags,
+        ranking_score = excluded.ranking_score,
+        focus_points = excluded.focus_points,
+        type_points = excluded.type_points,
+        prevalence_points = excluded.prevalence_points,
+        hospitalization_points = excluded.hospitalization_points,
+        clinical_outcome_points = excluded.clinical_outcome_points,
+        impact_factor_points = excluded.impact_factor_points,
+        neurology_penalty_points = excluded.neurology_penalty_points,
+        metabolic_penalty_points = excluded.metabolic_penalty_points,
+        screening_penalty_points = excluded.screening_penalty_points,
+        scores_penalty_points = excluded.scores_penalty_points,
+        subanalysis_penalty_points = excluded.subanalysis_penalty_points,
+        prognosis_penalty_points = excluded.prognosis_penalty_points,
+        classifier_version = excluded.classifier_version,
+        temporality_points = excluded.temporality_points,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+_SQL_SELECT_UNCLASSIFIED = '''
+    SELECT id, pmid, title, abstract, journal, keywords, mesh_terms
+    FROM articles 
+    WHERE medical_category IS NULL OR article_type IS NULL
+    LIMIT ?
+'''
+
+_SQL_SELECT_BY_CATEGORY = '''
+    SELECT * FROM articles 
+    WHERE medical_category = ?
+    ORDER BY publication_date DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_RECENT = '''
+    SELECT * FROM articles 
+    WHERE created_at >= datetime('now', ?)
+    ORDER BY created_at DESC
+'''
+
+# All article statistics in one result set of (kind, key, count) rows
+_SQL_ARTICLE_STATISTICS = '''
+    SELECT 'total' AS kind, NULL AS key, COUNT(*) AS count FROM articles
+    UNION ALL
+    SELECT 'unclassified', NULL, COUNT(*) FROM articles
+    WHERE medical_category IS NULL OR article_type IS NULL
+    UNION ALL
+    SELECT 'category', medical_category, COUNT(*) FROM articles
+    WHERE medical_category IS NOT NULL
+    GROUP BY medical_category
+    UNION ALL
+    SELECT 'type', article_type, COUNT(*) FROM articles
+    WHERE article_type IS NOT NULL
+    GROUP BY article_type
+    ORDER BY count DESC
+'''
+
+_SQL_LATEST_CREATED_AT = '''
+    SELECT MAX(created_at) 
+    FROM articles 
+    WHERE created_at IS NOT NULL
+'''
+
+# Inputs for rank_articles.calculate_ranking_score; NULLs become '' for the regex scorers
+_SQL_SELECT_RELEVANT_FOR_RANKING = '''
+    SELECT a.id, a.pmid,
+           COALESCE(a.title, '') AS title,
+           COALESCE(e.clinical_bottom_line, '') AS clinical_bottom_line,
+           COALESCE(a.publication_type, '') AS publication_type,
+           COALESCE(a.journal, '') AS journal
+    FROM articles a
+    JOIN enhanced_classifications e ON e.article_id = a.id
+    WHERE e.is_relevant = 1
+'''
+
+_SQL_UPSERT_RULE_RANKING = '''
+    INSERT INTO rule_rankings (
+        article_id, ranking_score, focus_points, type_points,
+        prevalence_points, hospitalization_points, impact_factor_points
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(article_id) DO UPDATE SET
+        ranking_score = excluded.ranking_score,
+        focus_points = excluded.focus_points,
+        type_points = excluded.type_points,
+        prevalence_points = excluded.prevalence_points,
+        hospitalization_points = excluded.hospitalization_points,
+        impact_factor_points = excluded.impact_factor_points,
+        ranked_at = CURRENT_TIMESTAMP
+'''
+
+_SQL_SELECT_TOP_RULE_RANKED = '''
+    SELECT a.pmid, a.title, a.journal, r.ranking_score, r.focus_points, r.type_points,
+           r.prevalence_points, r.hospitalization_points, r.impact_factor_points
+    FROM rule_rankings r
+    JOIN articles a ON a.id = r.article_id
+    ORDER BY r.ranking_score DESC
+    LIMIT ?
+'''
+
+_SQL_RULE_RANKING_DISTRIBUTION = '''
+    SELECT ranking_score, COUNT(*) FROM rule_rankings
+    GROUP BY ranking_score
+    ORDER BY ranking_score DESC
+'''
+
+# Relevant articles published in a date window, best first; also the live fallback for exports
+_SQL_SELECT_WEEKLY_RELEVANT = '''
+    SELECT
+        a.pmid, a.title, a.abstract, a.journal, a.authors, a.publication_date,
+        a.doi, a.url, a.medical_category, a.article_type, a.keywords, a.mesh_terms,
+        a.publication_type, ec.ranking_score, ec.clinical_bottom_line,
+        CASE WHEN json_valid(ec.tags) AND json_type(ec.tags) = 'array'
+            THEN COALESCE((SELECT group_concat(value, ', ') FROM json_each(ec.tags)), '')
+            ELSE ''
+        END AS tags,
+        ec.participants, ec.reason, ec.focus_points, ec.type_points,
+        ec.prevalence_points, ec.hospitalization_points, ec.clinical_outcome_points,
+        ec.impact_factor_points, ec.temporality_points, ec.neurology_penalty_points,
+        ec.screening_penalty_points, ec.scores_penalty_points, ec.subanalysis_penalty_points
+    FROM articles a
+    JOIN enhanced_classifications ec ON a.id = ec.article_id
+    WHERE ec.is_relevant = 1
+    AND a.publication_date >= ?
+    AND a.publication_date <= ?
+    ORDER BY ec.ranking_score DESC, a.publication_date DESC
+'''
+
+# Export-ready roll-up of recent relevant articles, rebuilt after each weekly run so
+# scripts/export_relevant_articles_weekly.py reads it without a join, filter or sort
+_SQL_CREATE_WEEKLY_RELEVANT = "CREATE TABLE weekly_relevant_articles AS" + _SQL_SELECT_WEEKLY_RELEVANT
+
+# Window and build time of the current weekly_relevant_articles snapshot (a single row)
+_SQL_CREATE_WEEKLY_RELEVANT_META = '''
+    CREATE TABLE IF NOT EXISTS weekly_relevant_articles_meta (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        built_at TIMESTAMP NOT NULL
+    )
+'''
+
+_SQL_UPSERT_WEEKLY_RELEVANT_META = '''
+    INSERT OR REPLACE INTO weekly_relevant_articles_meta (id, start_date, end_date, built_at)
+    VALUES (1, ?, ?, CURRENT_TIMESTAMP)
+'''
+
+# The snapshot is usable only for the same window and if nothing was written since it was built.
+# Timestamps have one-second resolution, so a write in the build's second counts as newer
+_SQL_WEEKLY_RELEVANT_IS_CURRENT = '''
+    SELECT 1 FROM weekly_relevant_articles_meta
+    WHERE id = 1 AND start_date = ? AND end_date = ?
+    AND built_at > COALESCE((SELECT MAX(updated_at) FROM articles), '')
+    AND built_at > COALESCE((SELECT MAX(updated_at) FROM enhanced_classifications), '')
+'''
+
+# Shared compact encoder for the tags column
+_dumps = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+def _encode_tags(tags) -> str:
+    """Serialize tags for storage, passing through values that are already JSON text."""
+    if isinstance(tags, str):
+        return tags
+    return _dumps(tags if tags is not None else [])
+
+def _article_values(article_data: Dict) -> Tuple:
+    """Build the parameter tuple for _SQL_INSERT_ARTICLE."""
+    return (
+        article_data['pmid'],
+        article_data['title'],
+        article_data['abstract'],
+        article_data['journal'],
+        article_data['authors'],
+        article_data['author_affiliations'],
+        article_data['publication_date'],
+        article_data['doi'],
+        article_data['url'],
+        article_data.get('medical_category'),
+        article_data.get('article_type'),
+        article_data['keywords'],
+        article_data['mesh_terms'],
+        article_data.get('publication_type', '')
+    )
+
+def _enhanced_values(article_id: int, classification_data: Dict) -> Tuple:
+    """Build the parameter tuple for _SQL_UPSERT_ENHANCED_CLASSIFICATION."""
+    ranking_breakdown = classification_data.get('ranking_breakdown') or {}
+    return (
+        article_id,
+        classification_data.get('participants'),
+        classification_data.get('is_relevant', False),
+        classification_data.get('reason'),
+        classification_data.get('medical_category'),
+        classification_data.get('clinical_bottom_line'),
+        _encode_tags(classification_data.get('tags', [])),
+        classification_data.get('ranking_score', 0),
+        ranking_breakdown.get('focus_points', 0),
+        ranking_breakdown.get('type_points', 0),
+        ranking_breakdown.get('prevalence_points', 0),
+        ranking_breakdown.get('hospitalization_points', 0),
+        ranking_breakdown.get('clinical_outcome_points', 0),
+        ranking_breakdown.get('impact_factor_points', 0),
+        classification_data.get('neurology_penalty_points', 0),
+        classification_data.get('metabolic_penalty_points', 0),
+        classification_data.get('screening_penalty_points', 0),
+        classification_data.get('scores_penalty_points', 0),
+        classification_data.get('subanalysis_penalty_points', 0),
+        classification_data.get('prognosis_penalty_points', 0),
+        "claude-sonnet-4.5-20250929",
+        ranking_breakdown.get('temporality_points', 0)
+    )
+
+_FETCH_SIZE = 1000
+
+# Run ANALYZE after batch inserts larger than this
+_ANALYZE_THRESHOLD = 1000
+
+# Seconds a get_statistics/get_journal_statistics result may be served from cache
+_STATS_TTL = 30
+_stats_cache: Dict[str, Tuple[float, Dict]] = {}
+
+def _cached_stats(key: str) -> Optional[Dict]:
+    """Return a cached statistics dict if it is still fresh."""
+    entry = _stats_cache.get(key)
+    if entry and time.monotonic() - entry[0] < _STATS_TTL:
+        return dict(entry[1])
+    return None
+
+def _store_stats(key: str, stats: Dict) -> Dict:
+    """Remember a statistics dict for _STATS_TTL seconds."""
+    if stats:
+        _stats_cache[key] = (time.monotonic(), stats)
+    return dict(stats)
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_journal_impact(journal_name: str) -> Optional[Tuple]:
+    """Cached journal impact lookup; returns the row as (column, value) pairs."""
+    with get_read_connection() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(_SQL_SELECT_JOURNAL_IMPACT, (journal_name, journal_name)).fetchone()
+        return tuple(dict(row).items()) if row else None
+
+def invalidate_caches(journals: bool = False):
+    """Drop memoized query results after a write."""
+    _stats_cache.clear()
+    if journals:
+        _lookup_journal_impact.cache_clear()
+
+def _iter_rows(cursor, raw: bool = False) -> Iterator:
+    """Yield rows in fetchmany chunks, materialising dicts lazily."""
+    while True:
+        rows = cursor.fetchmany(_FETCH_SIZE)
+        if not rows:
+            return
+        if raw:
+            yield from rows
+        else:
+            yield from (dict(row) for row in rows)
+
+def _rows(cursor, raw: bool = False) -> List:
+    """Return fetched rows as dicts, or as sqlite3.Row objects when raw is set."""
+    return list(_iter_rows(cursor, raw))
+
+def _db_op(message: str, default=None, rollback: bool = False):
+    """Log sqlite3 errors from a database method and return a default instead."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            except sqlite3.Error as e:
+                logger.error("%s: %s", message, e)
+                if rollback and self.conn:
+                    self.conn.rollback()
+                return default() if callable(default) else default
+        return wrapper
+    return decorator
+
+class _PooledDatabase:
+    """Context manager holding a pooled write connection and a lazy read-only one."""
     
     def __init__(self):
         self.conn = None
+        self._read_conn = None
     
     def __enter__(self):
-        self.conn = get_connection()
+        self.conn = acquire_connection()
+        self.conn.row_factory = sqlite3.Row
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._read_conn:
+            release_connection(self._read_conn, readonly=True)
+            self._read_conn = None
         if self.conn:
-            self.conn.close()
+            release_connection(self.conn)
+            self.conn = None
     
-    def insert_journal_impact(self, journal_data: Dict) -> Optional[int]:
+    def _reader(self) -> sqlite3.Connection:
+        """Connection for get_* queries; falls back to the write connection."""
+        if self._read_conn is None:
+            try:
+                self._read_conn = acquire_connection(readonly=True)
+                self._read_conn.row_factory = sqlite3.Row
+            except sqlite3.Error as e:
+                logger.debug("Read-only connection unavailable, using writer: %s", e)
+                return self.conn
+        return self._read_conn
+
+class JournalImpactDatabase(_PooledDatabase):
+    """Database operations for managing journal impact scores."""
+    
+    @_db_op('Error inserting/updating journal impact', rollback=True)
+    def insert_journal_impact(self, journal_data: Dict) -> Optional[str]:
         """Insert or update journal impact score data."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Check if journal already exists
-            cursor.execute("SELECT id FROM journal_impact_scores WHERE journal_name = ?", 
-                         (journal_data['journal_name'],))
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing record
-                update_query = '''
-                    UPDATE journal_impact_scores 
-                    SET journal_abbreviation = ?, impact_factor = ?, h_index = ?,
-                        sjr_score = ?, eigenfactor_score = ?, article_influence_score = ?,
-                        year = ?, source = ?, last_updated = CURRENT_TIMESTAMP, notes = ?
-                    WHERE journal_name = ?
-                '''
-                
-                values = (
-                    journal_data.get('journal_abbreviation'),
-                    journal_data.get('impact_factor'),
-                    journal_data.get('h_index'),
-                    journal_data.get('sjr_score'),
-                    journal_data.get('eigenfactor_score'),
-                    journal_data.get('article_influence_score'),
-                    journal_data.get('year'),
-                    journal_data.get('source'),
-                    journal_data.get('notes'),
-                    journal_data['journal_name']
-                )
-                
-                cursor.execute(update_query, values)
-                journal_id = existing[0]
-                logger.info(f"Updated impact score for journal: {journal_data['journal_name']}")
-                
-            else:
-                # Insert new record
-                insert_query = '''
-                    INSERT INTO journal_impact_scores (
-                        journal_name, journal_abbreviation, impact_factor, h_index,
-                        sjr_score, eigenfactor_score, article_influence_score,
-                        year, source, notes
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                '''
-                
-                values = (
-                    journal_data['journal_name'],
-                    journal_data.get('journal_abbreviation'),
-                    journal_data.get('impact_factor'),
-                    journal_data.get('h_index'),
-                    journal_data.get('sjr_score'),
-                    journal_data.get('eigenfactor_score'),
-                    journal_data.get('article_influence_score'),
-                    journal_data.get('year'),
-                    journal_data.get('source'),
-                    journal_data.get('notes')
-                )
-                
-                cursor.execute(insert_query, values)
-                journal_id = cursor.lastrowid
-                logger.info(f"Inserted impact score for journal: {journal_data['journal_name']}")
-            
-            self.conn.commit()
-            return journal_id
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error inserting/updating journal impact: {e}")
-            self.conn.rollback()
-            return None
+        cursor = self.conn.cursor()
+        
+        # Single UPSERT keyed on the unique journal_name
+        values = (
+            journal_data['journal_name'],
+            journal_data.get('journal_abbreviation'),
+            journal_data.get('impact_factor'),
+            journal_data.get('h_index'),
+            journal_data.get('sjr_score'),
+            journal_data.get('eigenfactor_score'),
+            journal_data.get('article_influence_score'),
+            journal_data.get('year'),
+            journal_data.get('source'),
+            journal_data.get('notes')
+        )
+        
+        cursor.execute(_SQL_UPSERT_JOURNAL_IMPACT, values)
+        journal_name = cursor.fetchone()[0]
+        logger.info("Upserted impact score for journal: %s", journal_name)
+        
+        self.conn.commit()
+        invalidate_caches(journals=True)
+        return journal_name
     
+    @_db_op('Error fetching journal impact')
     def get_journal_impact(self, journal_name: str) -> Optional[Dict]:
         """Get impact score data for a specific journal."""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM journal_impact_scores 
-                WHERE journal_name = ? OR journal_abbreviation = ?
-            ''', (journal_name, journal_name))
-            
-            row = cursor.fetchone()
-            if row:
-                columns = [desc[0] for desc in cursor.description]
-                return dict(zip(columns, row))
-            return None
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching journal impact: {e}")
-            return None
+        row = _lookup_journal_impact(journal_name)
+        return dict(row) if row else None
     
-    def get_all_journal_impacts(self) -> List[Dict]:
+    @_db_op('Error fetching all journal impacts', default=list)
+    def get_all_journal_impacts(self, raw: bool = False) -> List[Dict]:
         """Get impact scores for all journals."""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM journal_impact_scores 
-                ORDER BY impact_factor DESC NULLS LAST
-            ''')
-            
-            columns = [desc[0] for desc in cursor.description]
-            journals = []
-            
-            for row in cursor.fetchall():
-                journal = dict(zip(columns, row))
-                journals.append(journal)
-            
-            return journals
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching all journal impacts: {e}")
-            return []
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_SELECT_ALL_JOURNAL_IMPACTS)
+        
+        return _rows(cursor, raw)
     
-    def get_journals_by_impact_range(self, min_impact: float, max_impact: float) -> List[Dict]:
+    @_db_op('Error fetching journals by impact range', default=list)
+    def get_journals_by_impact_range(self, min_impact: float, max_impact: float, raw: bool = False) -> List[Dict]:
         """Get journals within a specific impact factor range."""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM journal_impact_scores 
-                WHERE impact_factor >= ? AND impact_factor <= ?
-                ORDER BY impact_factor DESC
-            ''', (min_impact, max_impact))
-            
-            columns = [desc[0] for desc in cursor.description]
-            journals = []
-            
-            for row in cursor.fetchall():
-                journal = dict(zip(columns, row))
-                journals.append(journal)
-            
-            return journals
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching journals by impact range: {e}")
-            return []
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_SELECT_JOURNALS_BY_IMPACT_RANGE, (min_impact, max_impact))
+        
+        return _rows(cursor, raw)
     
+    @_db_op('Error getting journal statistics', default=dict)
     def get_journal_statistics(self) -> Dict:
         """Get statistics about journal impact scores."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Total journals
-            cursor.execute("SELECT COUNT(*) FROM journal_impact_scores")
-            total_journals = cursor.fetchone()[0]
-            
-            # Average impact factor
-            cursor.execute("SELECT AVG(impact_factor) FROM journal_impact_scores WHERE impact_factor IS NOT NULL")
-            avg_impact = cursor.fetchone()[0]
-            
-            # Top journals by impact factor
-            cursor.execute('''
-                SELECT journal_name, impact_factor 
-                FROM journal_impact_scores 
-                WHERE impact_factor IS NOT NULL
-                ORDER BY impact_factor DESC 
-                LIMIT 10
-            ''')
-            top_journals = cursor.fetchall()
-            
-            # Journals by year
-            cursor.execute('''
-                SELECT year, COUNT(*) as count 
-                FROM journal_impact_scores 
-                WHERE year IS NOT NULL
-                GROUP BY year 
-                ORDER BY year DESC
-            ''')
-            journals_by_year = dict(cursor.fetchall())
-            
-            return {
-                'total_journals': total_journals,
-                'average_impact_factor': avg_impact,
-                'top_journals': top_journals,
-                'journals_by_year': journals_by_year
-            }
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error getting journal statistics: {e}")
-            return {}
+        cached = _cached_stats('journals')
+        if cached is not None:
+            return cached
+        cursor = self._reader().cursor()
+        
+        # Total journals
+        cursor.execute(_SQL_COUNT_JOURNALS)
+        total_journals = cursor.fetchone()[0]
+        
+        # Average impact factor
+        cursor.execute(_SQL_AVG_IMPACT_FACTOR)
+        avg_impact = cursor.fetchone()[0]
+        
+        # Top journals by impact factor
+        cursor.execute(_SQL_TOP_JOURNALS)
+        top_journals = [tuple(row) for row in cursor.fetchall()]
+        
+        # Journals by year
+        cursor.execute(_SQL_JOURNALS_BY_YEAR)
+        journals_by_year = dict(cursor.fetchall())
+        
+        return _store_stats('journals', {
+            'total_journals': total_journals,
+            'average_impact_factor': avg_impact,
+            'top_journals': top_journals,
+            'journals_by_year': journals_by_year
+        })
 
-class ArticleDatabase:
+class ArticleDatabase(_PooledDatabase):
     """Database operations for managing articles."""
     
-    def __init__(self):
-        self.conn = None
-    
-    def __enter__(self):
-        self.conn = get_connection()
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.conn:
-            self.conn.close()
-    
+    @_db_op('Error inserting article', rollback=True)
     def insert_article(self, article_data: Dict) -> Optional[int]:
         """Insert a new article into the database."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Check if article already exists
-            cursor.execute("SELECT id FROM articles WHERE pmid = ?", (article_data['pmid'],))
+        cursor = self.conn.cursor()
+        
+        # Insert new article; existing PMIDs are left untouched
+        cursor.execute(_SQL_INSERT_ARTICLE, _article_values(article_data))
+        if cursor.rowcount == 0:
+            cursor.execute(_SQL_SELECT_ARTICLE_ID_BY_PMID, (article_data['pmid'],))
             existing = cursor.fetchone()
-            
-            if existing:
-                logger.info(f"Article with PMID {article_data['pmid']} already exists")
-                return existing[0]
-            
-            # Insert new article
-            insert_query = '''
-                INSERT INTO articles (
-                    pmid, title, abstract, journal, authors, author_affiliations,
-                    publication_date, doi, url, medical_category, article_type,
-                    keywords, mesh_terms, publication_type
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            
-            values = (
-                article_data['pmid'],
-                article_data['title'],
-                article_data['abstract'],
-                article_data['journal'],
-                article_data['authors'],
-                article_data['author_affiliations'],
-                article_data['publication_date'],
-                article_data['doi'],
-                article_data['url'],
-                article_data.get('medical_category'),
-                article_data.get('article_type'),
-                article_data['keywords'],
-                article_data['mesh_terms'],
-                article_data.get('publication_type', '')
-            )
-            
-            cursor.execute(insert_query, values)
-            article_id = cursor.lastrowid
-            
             self.conn.commit()
-            logger.info(f"Inserted article with PMID {article_data['pmid']}")
-            
-            return article_id
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error inserting article: {e}")
-            self.conn.rollback()
-            return None
+            logger.info("Article with PMID %s already exists", article_data['pmid'])
+            return existing[0] if existing else None
+        article_id = cursor.lastrowid
+        
+        # Keep the normalized author/MeSH/keyword tables in step with the text columns
+        for lookup in ('authors', 'mesh_terms', 'keywords'):
+            link_terms(cursor, lookup, [(article_id, article_data[lookup])])
+        
+        self.conn.commit()
+        invalidate_caches()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Inserted article with PMID %s", article_data['pmid'])
+        
+        return article_id
     
+    @_db_op('Error updating classification', default=False, rollback=True)
     def update_article_classification(self, article_id: int, medical_category: str, 
                                     article_type: str, category_confidence: float = None,
                                     type_confidence: float = None) -> bool:
         """Update article classification."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Update main article record
-            cursor.execute('''
-                UPDATE articles 
-                SET medical_category = ?, article_type = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (medical_category, article_type, article_id))
-            
-            # Insert classification scores if provided
-            if category_confidence is not None or type_confidence is not None:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO classification_scores 
-                    (article_id, medical_category, article_type, category_confidence, 
-                     type_confidence, classifier_version)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (article_id, medical_category, article_type, category_confidence,
-                      type_confidence, "v1.0"))
-            
-            self.conn.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error updating classification: {e}")
-            self.conn.rollback()
-            return False
+        cursor = self.conn.cursor()
+        
+        # Update main article record
+        cursor.execute(_SQL_UPDATE_ARTICLE_CLASSIFICATION, (medical_category, article_type, article_id))
+        
+        # Insert classification scores if provided
+        if category_confidence is not None or type_confidence is not None:
+            cursor.execute(_SQL_UPSERT_CLASSIFICATION_SCORES, (article_id, medical_category, article_type, category_confidence,
+                  type_confidence, "v1.0"))
+        
+        self.conn.commit()
+        invalidate_caches()
+        return True
     
+    @_db_op('Error updating enhanced classification', default=False, rollback=True)
     def update_enhanced_classification(self, article_id: int, classification_data: Dict) -> bool:
         """Update article with enhanced classification results from Claude."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Update main article record with basic classification
-            cursor.execute('''
-                UPDATE articles 
-                SET medical_category = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (classification_data.get('medical_category'), article_id))
-            
-            # Extract ranking breakdown
-            ranking_breakdown = classification_data.get('ranking_breakdown', {})
-            
-            # Store enhanced classification results
-            cursor.execute('''
-                INSERT OR REPLACE INTO enhanced_classifications 
-                (article_id, participants, is_relevant, reason, medical_category, 
-                 clinical_bottom_line, tags, ranking_score, focus_points, type_points,
-                 prevalence_points, hospitalization_points, clinical_outcome_points, impact_factor_points,
-                 neurology_penalty_points, metabolic_penalty_points, screening_penalty_points, scores_penalty_points,
-                 subanalysis_penalty_points, prognosis_penalty_points, classifier_version, created_at, updated_at, temporality_points)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?)
-            ''', (
-                article_id,
-                classification_data.get('participants'),
-                classification_data.get('is_relevant', False),
-                classification_data.get('reason'),
-                classification_data.get('medical_category'),
-                classification_data.get('clinical_bottom_line'),
-                json.dumps(classification_data.get('tags', [])),
-                classification_data.get('ranking_score', 0),
-                ranking_breakdown.get('focus_points', 0),
-                ranking_breakdown.get('type_points', 0),
-                ranking_breakdown.get('prevalence_points', 0),
-                ranking_breakdown.get('hospitalization_points', 0),
-                ranking_breakdown.get('clinical_outcome_points', 0),
-                ranking_breakdown.get('impact_factor_points', 0),
-                classification_data.get('neurology_penalty_points', 0),
-                classification_data.get('metabolic_penalty_points', 0),
-                classification_data.get('screening_penalty_points', 0),
-                classification_data.get('scores_penalty_points', 0),
-                classification_data.get('subanalysis_penalty_points', 0),
-                classification_data.get('prognosis_penalty_points', 0),
-                "claude-sonnet-4.5-20250929",
-                ranking_breakdown.get('temporality_points', 0)
-            ))
-                
-            self.conn.commit()
-            logger.info(f"Updated enhanced classification for article {article_id}")
+        cursor = self.conn.cursor()
+        
+        # Both writes share one transaction (single commit per article)
+        if not self.conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        
+        # Update main article record with basic classification
+        cursor.execute(_SQL_UPDATE_ARTICLE_CATEGORY, (classification_data.get('medical_category'), article_id))
+        
+        # Store enhanced classification results
+        cursor.execute(_SQL_UPSERT_ENHANCED_CLASSIFICATION, _enhanced_values(article_id, classification_data))
+        link_terms(cursor, 'tags', [(article_id, classification_data.get('tags'))])
+            
+        self.conn.commit()
+        invalidate_caches()
+        logger.info("Updated enhanced classification for article %s", article_id)
+        return True
+    
+    @_db_op('Error bulk updating enhanced classifications', default=False, rollback=True)
+    def update_enhanced_classifications_bulk(self, pairs: List[Tuple[int, Dict]], defer_indexes: bool = False) -> bool:
+        """Store many (article_id, classification_data) results in one transaction.
+        
+        With defer_indexes the enhanced_classifications secondary indexes are dropped for the
+        writes and rebuilt once before the commit; worth it when rewriting a large share of the table.
+        """
+        if not pairs:
             return True
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error updating enhanced classification: {e}")
-            self.conn.rollback()
-            return False
+        cursor = self.conn.cursor()
+        if not self.conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        dropped_indexes = drop_classification_indexes(cursor) if defer_indexes else []
+        
+        cursor.executemany(_SQL_UPDATE_ARTICLE_CATEGORY,
+                           [(data.get('medical_category'), article_id) for article_id, data in pairs])
+        cursor.executemany(_SQL_UPSERT_ENHANCED_CLASSIFICATION,
+                           [_enhanced_values(article_id, data) for article_id, data in pairs])
+        link_terms(cursor, 'tags', [(article_id, data.get('tags')) for article_id, data in pairs])
+        
+        rebuild_classification_indexes(cursor, dropped_indexes)
+        self.conn.commit()
+        invalidate_caches()
+        logger.info("Updated enhanced classification for %s articles", len(pairs))
+        return True
     
-    def get_unclassified_articles(self, limit: int = 100) -> List[Dict]:
+    @_db_op('Error fetching unclassified articles', default=list)
+    def get_unclassified_articles(self, limit: int = 100, raw: bool = False) -> List[Dict]:
         """Get articles that haven't been classified yet."""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT id, pmid, title, abstract, journal, keywords, mesh_terms
-                FROM articles 
-                WHERE medical_category IS NULL OR article_type IS NULL
-                LIMIT ?
-            ''', (limit,))
-            
-            columns = [desc[0] for desc in cursor.description]
-            articles = []
-            
-            for row in cursor.fetchall():
-                article = dict(zip(columns, row))
-                articles.append(article)
-            
-            return articles
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error fetching unclassified articles: {e}")
-            return []
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_SELECT_UNCLASSIFIED, (limit,))
+        
+        return _rows(cursor, raw)
     
-    def get_articles_by_category(self, medical_category: str, limit: int = 100) -> List[Dict]:
+    @_db_op('Error fetching articles by category', default=list)
+    def get_articles_by_category(self, medical_category: str, limit: int = 100, raw: bool = False) -> List[Dict]:
         """Get articles by medical category."""
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_SELECT_BY_CATEGORY, (medical_category, limit))
+        
+        return _rows(cursor, raw)
+    
+    @_db_op('Error fetching recent articles', default=list)
+    def get_recent_articles(self, days: int = 7, raw: bool = False) -> List[Dict]:
+        """Get articles from the last N days."""
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_SELECT_RECENT, (f'-{int(days)} days',))
+        
+        return _rows(cursor, raw)
+    
+    def iter_recent_articles(self, days: int = 7, raw: bool = False) -> Iterator[Dict]:
+        """Stream articles from the last N days without building a list."""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM articles 
-                WHERE medical_category = ?
-                ORDER BY publication_date DESC
-                LIMIT ?
-            ''', (medical_category, limit))
-            
-            columns = [desc[0] for desc in cursor.description]
-            articles = []
-            
-            for row in cursor.fetchall():
-                article = dict(zip(columns, row))
-                articles.append(article)
-            
-            return articles
+            cursor = self._reader().cursor()
+            cursor.execute(_SQL_SELECT_RECENT, (f'-{int(days)} days',))
+            yield from _iter_rows(cursor, raw)
             
         except sqlite3.Error as e:
-            logger.error(f"Error fetching articles by category: {e}")
-            return []
+            logger.error("Error streaming recent articles: %s", e)
     
-    def get_recent_articles(self, days: int = 7) -> List[Dict]:
-        """Get articles from the last N days."""
+    def iter_articles_by_category(self, medical_category: str, limit: int = -1,
+                                  raw: bool = False) -> Iterator[Dict]:
+        """Stream articles in a medical category without building a list."""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM articles 
-                WHERE created_at >= datetime('now', '-{} days')
-                ORDER BY created_at DESC
-            '''.format(days))
-            
-            columns = [desc[0] for desc in cursor.description]
-            articles = []
-            
-            for row in cursor.fetchall():
-                article = dict(zip(columns, row))
-                articles.append(article)
-            
-            return articles
+            cursor = self._reader().cursor()
+            cursor.execute(_SQL_SELECT_BY_CATEGORY, (medical_category, limit))
+            yield from _iter_rows(cursor, raw)
             
         except sqlite3.Error as e:
-            logger.error(f"Error fetching recent articles: {e}")
-            return []
+            logger.error("Error streaming articles by category: %s", e)
     
+    @_db_op('Error getting statistics', default=dict)
     def get_statistics(self) -> Dict:
         """Get database statistics."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Total articles
-            cursor.execute("SELECT COUNT(*) FROM articles")
-            total_articles = cursor.fetchone()[0]
-            
-            # Articles by category
-            cursor.execute('''
-                SELECT medical_category, COUNT(*) as count 
-                FROM articles 
-                WHERE medical_category IS NOT NULL
-                GROUP BY medical_category
-                ORDER BY count DESC
-            ''')
-            categories = dict(cursor.fetchall())
-            
-            # Articles by type
-            cursor.execute('''
-                SELECT article_type, COUNT(*) as count 
-                FROM articles 
-                WHERE article_type IS NOT NULL
-                GROUP BY article_type
-                ORDER BY count DESC
-            ''')
-            types = dict(cursor.fetchall())
-            
-            # Unclassified articles
-            cursor.execute('''
-                SELECT COUNT(*) FROM articles 
-                WHERE medical_category IS NULL OR article_type IS NULL
-            ''')
-            unclassified = cursor.fetchone()[0]
-            
-            return {
-                'total_articles': total_articles,
-                'unclassified_articles': unclassified,
-                'articles_by_category': categories,
-                'articles_by_type': types
-            }
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error getting statistics: {e}")
-            return {}
+        cached = _cached_stats('articles')
+        if cached is not None:
+            return cached
+        cursor = self._reader().cursor()
+        
+        cursor.execute(_SQL_ARTICLE_STATISTICS)
+        
+        totals = {'total': 0, 'unclassified': 0}
+        categories = {}
+        types = {}
+        for kind, key, count in cursor.fetchall():
+            if kind == 'category':
+                categories[key] = count
+            elif kind == 'type':
+                types[key] = count
+            else:
+                totals[kind] = count
+        total_articles = totals['total']
+        unclassified = totals['unclassified']
+        
+        return _store_stats('articles', {
+            'total_articles': total_articles,
+            'unclassified_articles': unclassified,
+            'articles_by_category': categories,
+            'articles_by_type': types
+        })
     
+    @_db_op('Error searching articles', default=list)
     def search_articles(self, query: str, category: str = None, 
-                       article_type: str = None, limit: int = 100) -> List[Dict]:
+                       article_type: str = None, limit: int = 100, raw: bool = False) -> List[Dict]:
         """Search articles by text query and filters."""
-        try:
-            cursor = self.conn.cursor()
-            
-            base_query = '''
-                SELECT * FROM articles 
-                WHERE (title LIKE ? OR abstract LIKE ? OR keywords LIKE ?)
-            '''
-            params = [f'%{query}%', f'%{query}%', f'%{query}%']
-            
-            if category:
-                base_query += ' AND medical_category = ?'
-                params.append(category)
-            
-            if article_type:
-                base_query += ' AND article_type = ?'
-                params.append(article_type)
-            
-            base_query += ' ORDER BY publication_date DESC LIMIT ?'
-            params.append(limit)
-            
-            cursor.execute(base_query, params)
-            
-            columns = [desc[0] for desc in cursor.description]
-            articles = []
-            
-            for row in cursor.fetchall():
-                article = dict(zip(columns, row))
-                articles.append(article)
-            
-            return articles
-            
-        except sqlite3.Error as e:
-            logger.error(f"Error searching articles: {e}")
+        cursor = self._reader().cursor()
+        
+        # Quote each term so user input can't inject FTS5 query syntax
+        match_expr = ' '.join('"' + term.replace('"', '""') + '"*' for term in query.split())
+        if not match_expr:
             return []
+        
+        base_query = '''
+            SELECT a.* FROM articles a
+            JOIN articles_fts f ON a.id = f.rowid
+            WHERE articles_fts MATCH ?
+        '''
+        params = [match_expr]
+        
+        if category:
+            base_query += ' AND a.medical_category = ?'
+            params.append(category)
+        
+        if article_type:
+            base_query += ' AND a.article_type = ?'
+            params.append(article_type)
+        
+        base_query += ' ORDER BY a.publication_date DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(base_query, params)
+        
+        return _rows(cursor, raw)
+    
+    @_db_op('Error checking stored PMIDs', default=set)
+    def filter_existing_pmids(self, pmids: List[str]) -> Set[str]:
+        """Return the subset of pmids that already have an articles row."""
+        return set(_ids_by_pmid(self._reader().cursor(), [str(pmid) for pmid in pmids]))
     
+    @_db_op('Error getting latest created_at')
     def get_latest_created_at(self) -> Optional[str]:
         """Get the latest created_at timestamp from articles in the database."""
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_LATEST_CREATED_AT)
+        result = cursor.fetchone()
+        if result and result[0]:
+            return result[0]
+        return None
+
+    def iter_relevant_articles_for_ranking(self, raw: bool = False) -> Iterator[Dict]:
+        """Stream relevant articles with the fields rule-based ranking scores."""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT MAX(created_at) 
-                FROM articles 
-                WHERE created_at IS NOT NULL
-            ''')
-            result = cursor.fetchone()
-            if result and result[0]:
-                return result[0]
-            return None
+            cursor = self._reader().cursor()
+            cursor.execute(_SQL_SELECT_RELEVANT_FOR_RANKING)
+            yield from _iter_rows(cursor, raw)
+            
         except sqlite3.Error as e:
-            logger.error(f"Error getting latest created_at: {e}")
-            return None
+            logger.error("Error streaming relevant articles for ranking: %s", e)
+    
+    @_db_op('Error storing rule rankings', default=False, rollback=True)
+    def store_rule_rankings(self, rankings: List[Tuple[int, Dict]]) -> bool:
+        """Upsert many (article_id, calculate_ranking_score result) pairs in one transaction."""
+        if not rankings:
+            return True
+        cursor = self.conn.cursor()
+        if not self.conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        
+        rows = []
+        for article_id, score in rankings:
+            breakdown = score.get('ranking_breakdown', {})
+            rows.append((article_id, score.get('ranking_score', 0),
+                         breakdown.get('focus_points', 0), breakdown.get('type_points', 0),
+                         breakdown.get('prevalence_points', 0), breakdown.get('hospitalization_points', 0),
+                         breakdown.get('impact_factor_points', 0)))
+        cursor.executemany(_SQL_UPSERT_RULE_RANKING, rows)
+        
+        self.conn.commit()
+        logger.info("Stored rule-based rankings for %s articles", len(rows))
+        return True
+    
+    @_db_op('Error refreshing weekly relevant articles', default=0, rollback=True)
+    def refresh_weekly_relevant_articles(self, days: int = 14) -> int:
+        """Rebuild weekly_relevant_articles from the last `days` days; returns its row count."""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        cursor = self.conn.cursor()
+        if not self.conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        
+        window = (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        cursor.execute("DROP TABLE IF EXISTS weekly_relevant_articles")
+        cursor.execute(_SQL_CREATE_WEEKLY_RELEVANT, window)
+        cursor.execute(_SQL_CREATE_WEEKLY_RELEVANT_META)
+        cursor.execute(_SQL_UPSERT_WEEKLY_RELEVANT_META, window)
+        cursor.execute("SELECT COUNT(*) FROM weekly_relevant_articles")
+        count = cursor.fetchone()[0]
+        
+        self.conn.commit()
+        logger.info("Refreshed weekly_relevant_articles with %s articles", count)
+        return count
+    
+    @_db_op('Error fetching top rule-ranked articles', default=list)
+    def get_top_rule_ranked(self, limit: int = 10, raw: bool = False) -> List[Dict]:
+        """Get the highest rule-ranked articles."""
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_SELECT_TOP_RULE_RANKED, (limit,))
+        
+        return _rows(cursor, raw)
+    
+    @_db_op('Error getting rule ranking distribution', default=dict)
+    def get_rule_ranking_distribution(self) -> Dict[int, int]:
+        """Get {ranking_score: article count} over all rule-ranked articles."""
+        cursor = self._reader().cursor()
+        cursor.execute(_SQL_RULE_RANKING_DISTRIBUTION)
+        return dict(cursor.fetchall())
+
+def select_weekly_relevant(cursor, start_date: str, end_date: str) -> None:
+    """Run the relevant-articles query for a window on cursor, from the weekly snapshot when it is current."""
+    try:
+        cursor.execute(_SQL_WEEKLY_RELEVANT_IS_CURRENT, (start_date, end_date))
+        current = cursor.fetchone() is not None
+    except sqlite3.OperationalError as e:
+        # No snapshot has been built yet
+        if 'no such table' not in str(e):
+            raise
+        current = False
+    if current:
+        cursor.execute("SELECT * FROM weekly_relevant_articles ORDER BY rowid")
+    else:
+        cursor.execute(_SQL_SELECT_WEEKLY_RELEVANT, (start_date, end_date))
+
+# Score components a classification result carries in its ranking_breakdown
+BREAKDOWN_FIELDS = ('focus_points', 'type_points', 'prevalence_points', 'hospitalization_points',
+                    'clinical_outcome_points', 'impact_factor_points', 'temporality_points',
+                    'screening_penalty_points', 'scores_penalty_points', 'subanalysis_penalty_points')
+
+# Article keys that carry enhanced classification results
+_ENHANCED_FIELDS = frozenset({
+    'participants', 'is_relevant', 'reason',
+    'clinical_bottom_line', 'tags', 'ranking_score', 'ranking_breakdown',
+    'neurology_penalty_points',
+    'metabolic_penalty_points', 'screening_penalty_points', 'scores_penalty_points',
+    'subanalysis_penalty_points', 'prognosis_penalty_points'
+})
+
+# SQLite's default host-parameter limit is 999 on older builds
+_IN_CHUNK = 500
+
+def _ids_by_pmid(cursor, pmids: List[str]) -> Dict[str, int]:
+    """Map PMIDs to article ids, querying in chunks of _IN_CHUNK."""
+    found = {}
+    for start in range(0, len(pmids), _IN_CHUNK):
+        chunk = pmids[start:start + _IN_CHUNK]
+        cursor.execute(
+            f"SELECT pmid, id FROM articles WHERE pmid IN ({','.join('?' * len(chunk))})", chunk
+        )
+        found.update(cursor.fetchall())
+    return found
 
 def batch_insert_articles(articles: List[Dict]) -> int:
     """Insert multiple articles in batch with enhanced classification data."""
-    inserted_count = 0
+    if not articles:
+        return 0
+    
+    pmids = [str(article['pmid']) for article in articles]
     
     with ArticleDatabase() as db:
-        for article in articles:
-            article_id = db.insert_article(article)
-            if article_id:
-                inserted_count += 1
-                
-                # Check if this article has enhanced classification data
-                enhanced_fields = ['participants', 'is_relevant', 'reason', 
-                                 'clinical_bottom_line', 'tags', 'ranking_score', 'ranking_breakdown',
-                                 'neurology_penalty_points',
-                                 'metabolic_penalty_points', 'screening_penalty_points', 'scores_penalty_points',
-                                 'subanalysis_penalty_points', 'prognosis_penalty_points']
-                
-                if any(field in article for field in enhanced_fields):
-                    # Store enhanced classification data
-                    enhanced_data = {field: article.get(field) for field in enhanced_fields}
+        cursor = db.conn.cursor()
+        try:
+            # One transaction for the whole batch: a single WAL commit instead of one per article
+            cursor.execute("BEGIN IMMEDIATE")
+            existing = _ids_by_pmid(cursor, pmids)
+            try:
+                cursor.executemany(_SQL_INSERT_ARTICLE, (_article_values(article) for article in articles))
+            except sqlite3.IntegrityError:
+                # A row broke a constraint other than the PMID conflict (e.g. a missing title); go again
+                # one row at a time so only that row is skipped. Rows inserted before it now conflict
+                for article in articles:
+                    try:
+                        cursor.execute(_SQL_INSERT_ARTICLE, _article_values(article))
+                    except sqlite3.IntegrityError as e:
+                        logger.error("Error inserting article with PMID %s: %s", article['pmid'], e)
+            article_ids = _ids_by_pmid(cursor, pmids)
+            
+            new_rows = [(article_ids[pmid], article) for pmid, article in zip(pmids, articles)
+                        if pmid in article_ids and pmid not in existing]
+            for lookup in ('authors', 'mesh_terms', 'keywords'):
+                link_terms(cursor, lookup, [(article_id, article[lookup]) for article_id, article in new_rows])
+            
+            # Articles carrying enhanced classification data
+            pairs = []
+            for pmid, article in zip(pmids, articles):
+                if pmid in article_ids and not _ENHANCED_FIELDS.isdisjoint(article):
+                    enhanced_data = {field: article[field] for field in _ENHANCED_FIELDS.intersection(article)}
                     enhanced_data['medical_category'] = article.get('medical_category')
-                    
-                    success = db.update_enhanced_classification(article_id, enhanced_data)
-                    if success:
-                        logger.debug(f"Stored enhanced classification for article {article.get('pmid', 'unknown')}")
-                    else:
-                        logger.warning(f"Failed to store enhanced classification for article {article.get('pmid', 'unknown')}")
+                    pairs.append((article_ids[pmid], enhanced_data))
+            if pairs:
+                cursor.executemany(_SQL_UPDATE_ARTICLE_CATEGORY,
+                                   [(data.get('medical_category'), article_id) for article_id, data in pairs])
+                cursor.executemany(_SQL_UPSERT_ENHANCED_CLASSIFICATION,
+                                   [_enhanced_values(article_id, data) for article_id, data in pairs])
+                link_terms(cursor, 'tags', [(article_id, data.get('tags')) for article_id, data in pairs])
+            
+            db.conn.commit()
+        except sqlite3.Error as e:
+            db.conn.rollback()
+            logger.error("Error batch inserting articles: %s", e)
+            return 0
+        
+        invalidate_caches()
+        inserted_count = sum(1 for pmid in pmids if pmid in article_ids)
+        logger.debug("Stored enhanced classification for %s articles", len(pairs))
+        
+        if len(new_rows) > _ANALYZE_THRESHOLD:
+            # Refresh planner statistics after a large ingest
+            try:
+                db.conn.execute("ANALYZE")
+            except sqlite3.Error as e:
+                logger.warning("ANALYZE after batch insert failed: %s", e)
     
-    logger.info(f"Inserted {inserted_count} out of {len(articles)} articles")
+    logger.info("Inserted %s out of %s articles", inserted_count, len(articles))
     return inserted_count
 
 if __name__ == "__main__":
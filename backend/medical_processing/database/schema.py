@@ -1,10 +1,18 @@
 import sqlite3
+import json
+import logging
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import os
+from pathlib import Path
 from ..config import DATABASE_PATH
 
-def get_database_path():
-    """Get the database path, using persistent disk if available (Render paid tier)."""
+logger = logging.getLogger(__name__)
+
+def _resolve_database_path():
+    """Resolve the database path, using persistent disk if available (Render paid tier)."""
     persistent_data_path = os.getenv('PERSISTENT_DATA_PATH')
     if persistent_data_path:
         # Use persistent disk for database - ensure absolute path
@@ -19,11 +27,148 @@ def get_database_path():
         # Use relative path (default)
         return DATABASE_PATH
 
+# Resolved once at import: PERSISTENT_DATA_PATH must be set (e.g. .env loaded) before this module
+# is first imported; changing it afterwards does not move the database
+_DB_PATH = _resolve_database_path()
+
+def get_database_path():
+    """Get the database path resolved at import time."""
+    return _DB_PATH
+
+_INDEXES = [
+    ('idx_articles_created_at',
+     'CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles(created_at)'),
+    ('idx_articles_category_pubdate',
+     'CREATE INDEX IF NOT EXISTS idx_articles_category_pubdate ON articles(medical_category, publication_date)'),
+    ('idx_articles_unclassified',
+     'CREATE INDEX IF NOT EXISTS idx_articles_unclassified ON articles(id) '
+     'WHERE medical_category IS NULL OR article_type IS NULL'),
+    ('idx_articles_journal',
+     'CREATE INDEX IF NOT EXISTS idx_articles_journal ON articles(journal)'),
+    ('idx_articles_pubdate',
+     'CREATE INDEX IF NOT EXISTS idx_articles_pubdate ON articles(publication_date DESC)'),
+]
+
+# Lookup table keyed by journal_name; WITHOUT ROWID makes the primary key the table itself
+_JOURNAL_IMPACT_DDL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        journal_name TEXT PRIMARY KEY NOT NULL,
+        journal_abbreviation TEXT,
+        impact_factor REAL,
+        h_index INTEGER,
+        sjr_score REAL,
+        eigenfactor_score REAL,
+        article_influence_score REAL,
+        year INTEGER,
+        source TEXT,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        notes TEXT
+    ) WITHOUT ROWID
+'''
+
+# Rule-based scores from rank_articles.py, kept apart from the classifier's own ranking columns
+_RULE_RANKINGS_DDL = (
+    '''
+    CREATE TABLE IF NOT EXISTS rule_rankings (
+        article_id INTEGER PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE,
+        ranking_score INTEGER NOT NULL DEFAULT 0,
+        focus_points INTEGER DEFAULT 0,
+        type_points INTEGER DEFAULT 0,
+        prevalence_points INTEGER DEFAULT 0,
+        hospitalization_points INTEGER DEFAULT 0,
+        impact_factor_points INTEGER DEFAULT 0,
+        ranked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_rule_rankings_score ON rule_rankings(ranking_score DESC)',
+)
+
+# Near-duplicate lookup for classification_cache: normalized-title hash -> exact cache key
+_CLASSIFICATION_TITLES_DDL = '''
+    CREATE TABLE IF NOT EXISTS classification_cache_titles (
+        title_key TEXT PRIMARY KEY,
+        key TEXT NOT NULL
+    ) WITHOUT ROWID
+'''
+
+# Normalized term tables: lookup table -> (link table, link term column,
+# source table, source article id column, source text column)
+_TERM_TABLES = {
+    'authors': ('article_authors', 'author_id', 'articles', 'id', 'authors'),
+    'mesh_terms': ('article_mesh', 'term_id', 'articles', 'id', 'mesh_terms'),
+    'keywords': ('article_keywords', 'keyword_id', 'articles', 'id', 'keywords'),
+    'tags': ('article_tags', 'tag_id', 'enhanced_classifications', 'article_id', 'tags'),
+}
+
+def split_terms(value):
+    """Split a stored '; '-separated or JSON-list text column into distinct terms."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        if value.lstrip().startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = value.split(';')
+        else:
+            value = value.split(';')
+    terms = (str(term).strip() for term in value if term is not None)
+    return list(dict.fromkeys(term for term in terms if term))
+
+def _create_term_tables(cursor):
+    """Create the lookup and article link tables for authors, MeSH terms, keywords and tags."""
+    for lookup, (link, term_col, *_) in _TERM_TABLES.items():
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {lookup} (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {link} (
+                article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+                {term_col} INTEGER NOT NULL,
+                PRIMARY KEY (article_id, {term_col})
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{link}_term ON {link}({term_col}, article_id)")
+
+def link_terms(cursor, lookup, rows):
+    """Replace the normalized links for (article_id, text) rows of one term table."""
+    link, term_col = _TERM_TABLES[lookup][:2]
+    pairs = [(article_id, term) for article_id, value in rows for term in split_terms(value)]
+    
+    cursor.executemany(f"DELETE FROM {link} WHERE article_id = ?", [(article_id,) for article_id, _ in rows])
+    cursor.executemany(f"INSERT OR IGNORE INTO {lookup} (name) VALUES (?)", [(term,) for _, term in pairs])
+    cursor.executemany(
+        f"INSERT OR IGNORE INTO {link} (article_id, {term_col}) SELECT ?, id FROM {lookup} WHERE name = ?",
+        pairs
+    )
+
+# Larger pages keep multi-kilobyte abstracts off overflow pages
+_PAGE_SIZE = 8192
+
 def create_database():
     """Create the database and tables for storing articles."""
     conn = sqlite3.connect(get_database_path())
     cursor = conn.cursor()
     
+    # Page size only takes effect before the first table is written, or on VACUUM
+    cursor.execute(f"PRAGMA page_size={_PAGE_SIZE}")
+    cursor.execute("PRAGMA page_size")
+    if cursor.fetchone()[0] != _PAGE_SIZE:
+        try:
+            # VACUUM cannot change the page size of a WAL database
+            cursor.execute("PRAGMA journal_mode=DELETE")
+            cursor.execute("VACUUM")
+        except sqlite3.OperationalError as e:
+            logger.warning("Could not convert database to %s-byte pages: %s", _PAGE_SIZE, e)
+    
+    # journal_mode and wal_autocheckpoint persist in the database file
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA wal_autocheckpoint=1000")
+    _apply_pragmas(conn)
+    
     # Articles table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS articles (
@@ -47,23 +192,8 @@ def create_database():
         )
     ''')
     
-    # Journal impact scores table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS journal_impact_scores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            journal_name TEXT UNIQUE NOT NULL,
-            journal_abbreviation TEXT,
-            impact_factor REAL,
-            h_index INTEGER,
-            sjr_score REAL,
-            eigenfactor_score REAL,
-            article_influence_score REAL,
-            year INTEGER,
-            source TEXT,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            notes TEXT
-        )
-    ''')
+    # Journal impact scores table, clustered on journal_name
+    cursor.execute(_JOURNAL_IMPACT_DDL.format(table='journal_impact_scores'))
     
     
     # Enhanced classification results table
@@ -100,25 +230,133 @@ def create_database():
         )
     ''')
     
+    _create_term_tables(cursor)
+    
+    # Classifier results keyed by a hash of provider + normalized title/abstract
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS classification_cache (
+            key TEXT PRIMARY KEY,
+            classification_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    ''')
+    
+    cursor.execute(_CLASSIFICATION_TITLES_DDL)
+    
+    for ddl in _RULE_RANKINGS_DDL:
+        cursor.execute(ddl)
+    
+    # Secondary indexes; pmid, journal_name and article_id are already UNIQUE
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    existing_indexes = {row[0] for row in cursor.fetchall()}
+    missing_indexes = [(name, ddl) for name, ddl in _INDEXES if name not in existing_indexes]
+    for name, ddl in missing_indexes:
+        cursor.execute(ddl)
+    if missing_indexes:
+        # Collect planner statistics once so the new indexes get used
+        cursor.execute('ANALYZE')
+    
     conn.commit()
     conn.close()
 
-def migrate_database():
-    """Migrate existing database to remove disease_prevalence and practice_changing_potential columns."""
+@contextmanager
+def _bulk_migration_pragmas(cursor):
+    """Relax durability while a migration copies data; restore WAL/NORMAL afterwards."""
+    cursor.execute("PRAGMA synchronous=OFF")
+    # Migration connections are short-lived, so the larger cache is not restored
+    cursor.execute("PRAGMA cache_size=-131072")
+    try:
+        # Only possible when no other connection has the database open
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+    except sqlite3.OperationalError:
+        pass
+    try:
+        yield
+    finally:
+        if cursor.connection.in_transaction:
+            cursor.execute("ROLLBACK")
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            pass
+        cursor.execute("PRAGMA synchronous=NORMAL")
+
+def _run_migration(step, error_message):
+    """Run a single migration step on its own connection and transaction."""
     conn = sqlite3.connect(get_database_path())
+    conn.isolation_level = None
     cursor = conn.cursor()
     
     try:
-        # Check if the columns exist in the enhanced_classifications table
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        columns_to_remove = ['disease_prevalence', 'practice_changing_potential']
-        columns_exist = [col for col in columns_to_remove if col in columns]
+        with _bulk_migration_pragmas(cursor):
+            cursor.execute("BEGIN IMMEDIATE")
+            step(cursor)
+            cursor.execute("COMMIT")
+    except sqlite3.Error as e:
+        logger.error("%s: %s", error_message, e)
+    finally:
+        conn.close()
+
+def _copy_common_columns(cursor, source, target, renames=None):
+    """Copy rows from source into target using the columns both tables share."""
+    renames = renames or {}
+    cursor.execute(f"PRAGMA table_info({source})")
+    source_cols = [column[1] for column in cursor.fetchall()]
+    cursor.execute(f"PRAGMA table_info({target})")
+    target_cols = {column[1] for column in cursor.fetchall()}
+    
+    pairs = []
+    for col in source_cols:
+        dest = renames.get(col, col)
+        if dest != col and dest in source_cols:
+            # Both the old and new name exist; keep the new one as-is
+            continue
+        if dest in target_cols:
+            pairs.append((col, dest))
+    
+    cursor.execute(
+        f"INSERT INTO {target} ({', '.join(dest for _, dest in pairs)}) "
+        f"SELECT {', '.join(col for col, _ in pairs)} FROM {source}"
+    )
+
+def _swap_rebuilt_classifications(cursor, renames=None):
+    """Fill enhanced_classifications_new, swap it in, then rebuild the old table's indexes."""
+    # Secondary indexes are created only after the bulk copy, not maintained row by row
+    cursor.execute(
+        "SELECT sql FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = 'enhanced_classifications' AND sql IS NOT NULL"
+    )
+    index_ddl = [row[0] for row in cursor.fetchall()]
+    
+    _copy_common_columns(cursor, 'enhanced_classifications', 'enhanced_classifications_new', renames=renames)
+    
+    # Drop the old table and rename the new one
+    cursor.execute('DROP TABLE enhanced_classifications')
+    cursor.execute('ALTER TABLE enhanced_classifications_new RENAME TO enhanced_classifications')
+    
+    for ddl in index_ddl:
+        cursor.execute(ddl)
+
+def migrate_database(cursor=None):
+    """Migrate existing database to remove disease_prevalence and practice_changing_potential columns."""
+    if cursor is None:
+        return _run_migration(migrate_database, "Error during migration")
+    
+    # Check if the columns exist in the enhanced_classifications table
+    cursor.execute("PRAGMA table_info(enhanced_classifications)")
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    columns_to_remove = ['disease_prevalence', 'practice_changing_potential']
+    columns_exist = [col for col in columns_to_remove if col in columns]
+    
+    if columns_exist:
+        logger.debug("Found columns to remove: %s", columns_exist)
         
-        if columns_exist:
-            print(f"Found columns to remove: {columns_exist}")
-            
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            # Native DROP COLUMN rewrites only the schema, not every row
+            for col in columns_exist:
+                cursor.execute(f'ALTER TABLE enhanced_classifications DROP COLUMN {col}')
+        else:
             # Create a new table without the unwanted columns
             cursor.execute('''
                 CREATE TABLE enhanced_classifications_new (
@@ -145,123 +383,67 @@ def migrate_database():
                     FOREIGN KEY (article_id) REFERENCES articles (id)
                 )
             ''')
-            
-            # Copy data from old table to new table (excluding the removed columns)
-            cursor.execute('''
-                INSERT INTO enhanced_classifications_new 
-                (id, article_id, participants, is_relevant, reason, medical_category, 
-                 clinical_bottom_line, tags, ranking_score, focus_points, 
-                 type_points, prevalence_points, hospitalization_points, impact_factor_points, 
-                 guidelines_points, neurology_penalty_points, classifier_version, created_at, updated_at)
-                SELECT id, article_id, participants, is_relevant, rejection_reason, medical_category,
-                       clinical_bottom_line, tags, ranking_score, focus_points,
-                       type_points, prevalence_points, hospitalization_points, impact_factor_points,
-                       0, 0, classifier_version, created_at, updated_at
-                FROM enhanced_classifications
-            ''')
-            
-            # Drop the old table and rename the new one
-            cursor.execute('DROP TABLE enhanced_classifications')
-            cursor.execute('ALTER TABLE enhanced_classifications_new RENAME TO enhanced_classifications')
-            
-            conn.commit()
-            print("SUCCESS: Successfully migrated database - removed disease_prevalence and practice_changing_potential columns")
-        else:
-            print("SUCCESS: No migration needed - columns don't exist")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error during migration: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
-
-def add_rule_based_scoring_columns():
-    """Add new rule-based scoring columns to existing enhanced_classifications table."""
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
-    
-    try:
-        # Check if the new columns already exist
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
         
-        columns_to_add = ['guidelines_points', 'neurology_penalty_points']
-        missing_columns = [col for col in columns_to_add if col not in columns]
+            # Copy data from old table to new table (excluding the removed columns)
+            _swap_rebuilt_classifications(cursor, renames={'rejection_reason': 'reason'})
         
-        if missing_columns:
-            print(f"Adding missing columns: {missing_columns}")
-            
-            for column in missing_columns:
-                if column == 'guidelines_points':
-                    cursor.execute('ALTER TABLE enhanced_classifications ADD COLUMN guidelines_points INTEGER DEFAULT 0')
-                elif column == 'neurology_penalty_points':
-                    cursor.execute('ALTER TABLE enhanced_classifications ADD COLUMN neurology_penalty_points INTEGER DEFAULT 0')
-            
-            conn.commit()
-            print("SUCCESS: Successfully added rule-based scoring columns")
-        else:
-            print("SUCCESS: Rule-based scoring columns already exist")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error adding rule-based scoring columns: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        logger.info("Successfully migrated database - removed disease_prevalence and practice_changing_potential columns")
+    else:
+        logger.debug("No migration needed - columns don't exist")
 
-def add_new_penalty_scoring_columns():
-    """Add new penalty and bonus scoring columns to existing enhanced_classifications table."""
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
+# Columns enhanced_classifications must have; older databases gain any that are missing
+DESIRED_COLUMNS = {
+    'neurology_penalty_points': 'INTEGER DEFAULT 0',
+    'clinical_outcome_points': 'INTEGER DEFAULT 0',
+    'metabolic_penalty_points': 'INTEGER DEFAULT 0',
+    'screening_penalty_points': 'INTEGER DEFAULT 0',
+    'scores_penalty_points': 'INTEGER DEFAULT 0',
+    'subanalysis_penalty_points': 'INTEGER DEFAULT 0',
+    'prognosis_penalty_points': 'INTEGER DEFAULT 0',
+    'temporality_points': 'INTEGER DEFAULT 0',
+    'hidden_from_dashboard': 'BOOLEAN DEFAULT 0',
+}
+
+def add_missing_columns(cursor=None):
+    """Add any DESIRED_COLUMNS missing from the enhanced_classifications table."""
+    if cursor is None:
+        return _run_migration(add_missing_columns, "Error adding missing columns")
     
-    try:
-        # Check if the new columns already exist
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
+    cursor.execute("PRAGMA table_info(enhanced_classifications)")
+    existing = {column[1] for column in cursor.fetchall()}
+    missing_columns = [col for col in DESIRED_COLUMNS if col not in existing]
+    
+    if missing_columns:
+        logger.debug("Adding missing columns: %s", missing_columns)
         
-        columns_to_add = [
-            'clinical_outcome_points',
-            'guideline_bonus_points',
-            'metabolic_penalty_points',
-            'screening_penalty_points',
-            'scores_penalty_points',
-            'subanalysis_penalty_points',
-            'prognosis_penalty_points'
-        ]
-        missing_columns = [col for col in columns_to_add if col not in columns]
+        # ADD COLUMN is metadata-only; all of them land in the caller's single transaction
+        for column in missing_columns:
+            cursor.execute(f'ALTER TABLE enhanced_classifications ADD COLUMN {column} {DESIRED_COLUMNS[column]}')
         
-        if missing_columns:
-            print(f"Adding missing columns: {missing_columns}")
-            
-            for column in missing_columns:
-                cursor.execute(f'ALTER TABLE enhanced_classifications ADD COLUMN {column} INTEGER DEFAULT 0')
-            
-            conn.commit()
-            print("SUCCESS: Successfully added new penalty and bonus scoring columns")
-        else:
-            print("SUCCESS: New penalty and bonus scoring columns already exist")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error adding new penalty and bonus scoring columns: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        logger.info("Successfully added missing columns")
+    else:
+        logger.debug("All enhanced_classifications columns already exist")
 
-def remove_guideline_scoring_columns():
-    """Remove guideline scoring columns from enhanced_classifications table."""
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
+def remove_guideline_scoring_columns(cursor=None):
+    """Remove guideline scoring columns from enhanced_classifications table (contract step)."""
+    if cursor is None:
+        return _run_migration(remove_guideline_scoring_columns, "Error during migration")
     
-    try:
-        # Check if the columns exist in the enhanced_classifications table
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        columns_to_remove = ['guideline_bonus_points', 'guidelines_points']
-        columns_exist = [col for col in columns_to_remove if col in columns]
+    # Check if the columns exist in the enhanced_classifications table
+    cursor.execute("PRAGMA table_info(enhanced_classifications)")
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    columns_to_remove = ['guideline_bonus_points', 'guidelines_points']
+    columns_exist = [col for col in columns_to_remove if col in columns]
+    
+    if columns_exist:
+        logger.debug("Found guideline scoring columns to remove: %s", columns_exist)
         
-        if columns_exist:
-            print(f"Found guideline scoring columns to remove: {columns_exist}")
-            
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            # Native DROP COLUMN rewrites only the schema, not every row
+            for col in columns_exist:
+                cursor.execute(f'ALTER TABLE enhanced_classifications DROP COLUMN {col}')
+        else:
             # Create a new table without the guideline scoring columns
             cursor.execute('''
                 CREATE TABLE enhanced_classifications_new (
@@ -292,60 +474,31 @@ def remove_guideline_scoring_columns():
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
-            
+        
             # Copy data from old table to new table (excluding the removed columns)
-            cursor.execute('''
-                INSERT INTO enhanced_classifications_new 
-                (id, article_id, participants, is_relevant, reason, medical_category, 
-                 article_type, clinical_bottom_line, tags, ranking_score, focus_points, 
-                 type_points, prevalence_points, hospitalization_points, clinical_outcome_points,
-                 impact_factor_points, neurology_penalty_points, metabolic_penalty_points,
-                 screening_penalty_points, scores_penalty_points, subanalysis_penalty_points,
-                 prognosis_penalty_points, classifier_version, created_at, updated_at)
-                SELECT id, article_id, participants, is_relevant, reason, medical_category,
-                       article_type, clinical_bottom_line, tags, ranking_score, focus_points,
-                       type_points, prevalence_points, hospitalization_points, clinical_outcome_points,
-                       impact_factor_points, neurology_penalty_points, metabolic_penalty_points,
-                       screening_penalty_points, scores_penalty_points, subanalysis_penalty_points,
-                       prognosis_penalty_points, classifier_version, created_at, updated_at
-                FROM enhanced_classifications
-            ''')
-            
-            # Drop the old table and rename the new one
-            cursor.execute('DROP TABLE enhanced_classifications')
-            cursor.execute('ALTER TABLE enhanced_classifications_new RENAME TO enhanced_classifications')
-            
-            conn.commit()
-            print("SUCCESS: Successfully migrated database - removed guideline scoring columns")
-        else:
-            print("SUCCESS: No migration needed - guideline scoring columns don't exist")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error during migration: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+            _swap_rebuilt_classifications(cursor)
+        
+        logger.info("Successfully migrated database - removed guideline scoring columns")
+    else:
+        logger.debug("No migration needed - guideline scoring columns don't exist")
 
-def rename_rejection_reason_to_reason():
+def rename_rejection_reason_to_reason(cursor=None):
     """Rename rejection_reason column to reason in enhanced_classifications table."""
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
+    if cursor is None:
+        return _run_migration(rename_rejection_reason_to_reason, "Error renaming column")
     
-    try:
-        # Check if the column rejection_reason exists
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = {column[1]: column for column in cursor.fetchall()}
+    # Check if the column rejection_reason exists
+    cursor.execute("PRAGMA table_info(enhanced_classifications)")
+    columns = {column[1]: column for column in cursor.fetchall()}
+    
+    if 'rejection_reason' in columns and 'reason' not in columns:
+        logger.debug("Renaming 'rejection_reason' to 'reason'...")
         
-        if 'rejection_reason' in columns and 'reason' not in columns:
-            print("Renaming 'rejection_reason' to 'reason'...")
-            
-            # SQLite doesn't support ALTER COLUMN RENAME directly
-            # We need to create a new table and copy data
-            
-            # Get all existing columns except the one we're renaming
-            existing_cols = list(columns.keys())
-            
-            # Create new table with 'reason' instead of 'rejection_reason'
+        if sqlite3.sqlite_version_info >= (3, 25, 0):
+            # Native RENAME COLUMN only touches sqlite_schema
+            cursor.execute('ALTER TABLE enhanced_classifications RENAME COLUMN rejection_reason TO reason')
+        else:
+            # Older SQLite: rebuild the table with 'reason' instead of 'rejection_reason'
             cursor.execute('''
                 CREATE TABLE enhanced_classifications_new (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -379,149 +532,459 @@ def rename_rejection_reason_to_reason():
                 )
             ''')
             
-            # Copy data from old table to new table
-            cursor.execute('''
-                INSERT INTO enhanced_classifications_new 
-                SELECT id, article_id, participants, is_relevant, rejection_reason, 
-                       medical_category, article_type, clinical_bottom_line, tags, 
-                       ranking_score, focus_points, type_points, prevalence_points, 
-                       hospitalization_points, clinical_outcome_points, impact_factor_points, 
-                       guidelines_points, guideline_bonus_points, neurology_penalty_points,
-                       metabolic_penalty_points, screening_penalty_points, scores_penalty_points,
-                       subanalysis_penalty_points, prognosis_penalty_points,
-                       classifier_version, created_at, updated_at
-                FROM enhanced_classifications
-            ''')
-            
-            # Drop the old table and rename the new one
-            cursor.execute('DROP TABLE enhanced_classifications')
-            cursor.execute('ALTER TABLE enhanced_classifications_new RENAME TO enhanced_classifications')
-            
-            conn.commit()
-            print("SUCCESS: Successfully renamed 'rejection_reason' to 'reason'")
-        elif 'reason' in columns:
-            print("SUCCESS: Column already renamed to 'reason'")
-        else:
-            print("WARNING: Neither 'rejection_reason' nor 'reason' column found")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error renaming column: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
-
-def add_temporality_points_column():
-    """Add temporality_points column to existing enhanced_classifications table."""
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
-    
-    try:
-        # Check if the new column already exists
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
+            _swap_rebuilt_classifications(cursor, renames={'rejection_reason': 'reason'})
         
-        if 'temporality_points' not in columns:
-            print("Adding temporality_points column...")
-            cursor.execute('ALTER TABLE enhanced_classifications ADD COLUMN temporality_points INTEGER DEFAULT 0')
-            conn.commit()
-            print("SUCCESS: Successfully added temporality_points column")
-        else:
-            print("SUCCESS: temporality_points column already exists")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error adding temporality_points column: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        logger.info("Successfully renamed 'rejection_reason' to 'reason'")
+    elif 'reason' in columns:
+        logger.debug("Column already renamed to 'reason'")
+    else:
+        logger.warning("Neither 'rejection_reason' nor 'reason' column found")
 
-def migrate_penalty_scoring_columns():
+def migrate_penalty_scoring_columns(cursor=None):
     """
     Migrate penalty scoring columns from old names to new names.
     """
-    conn = sqlite3.connect(get_database_path())
-    cursor = conn.cursor()
+    if cursor is None:
+        return _run_migration(migrate_penalty_scoring_columns, "Error migrating penalty scoring columns")
     
-    try:
-        # Check if the old columns exist
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
+    # Check if the old columns exist
+    cursor.execute("PRAGMA table_info(enhanced_classifications)")
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    # Check if migration is needed
+    old_cols = ['prevention_penalty_points', 'biologic_penalty_points']
+    
+    # New columns may already exist via add_missing_columns; the copy is guarded and idempotent
+    needs_migration = any(col in columns for col in old_cols)
+    
+    if needs_migration:
+        logger.debug("Migrating penalty scoring columns...")
         
-        # Check if migration is needed
-        old_cols = ['prevention_penalty_points', 'biologic_penalty_points']
-        new_cols = ['screening_penalty_points', 'scores_penalty_points', 'subanalysis_penalty_points']
+        # Add new columns if they don't exist
+        add_missing_columns(cursor)
         
-        needs_migration = any(col in columns for col in old_cols) and not all(col in columns for col in new_cols)
+        # Copy data from old columns to new columns if they exist
+        if 'prevention_penalty_points' in columns:
+            cursor.execute('''
+                UPDATE enhanced_classifications 
+                SET screening_penalty_points = prevention_penalty_points
+                WHERE screening_penalty_points = 0 AND prevention_penalty_points != 0
+            ''')
         
-        if needs_migration:
-            print("Migrating penalty scoring columns...")
-            
-            # Add new columns if they don't exist
-            for col in new_cols:
-                if col not in columns:
-                    cursor.execute(f'ALTER TABLE enhanced_classifications ADD COLUMN {col} INTEGER DEFAULT 0')
-            
-            # Copy data from old columns to new columns if they exist
-            if 'prevention_penalty_points' in columns:
-                cursor.execute('''
-                    UPDATE enhanced_classifications 
-                    SET screening_penalty_points = prevention_penalty_points
-                    WHERE screening_penalty_points = 0 AND prevention_penalty_points != 0
-                ''')
-            
-            if 'biologic_penalty_points' in columns:
-                cursor.execute('''
-                    UPDATE enhanced_classifications 
-                    SET scores_penalty_points = biologic_penalty_points
-                    WHERE scores_penalty_points = 0 AND biologic_penalty_points != 0
-                ''')
-            
-            conn.commit()
-            print("SUCCESS: Successfully migrated penalty scoring columns")
-        else:
-            print("SUCCESS: No migration needed - penalty scoring columns are up to date")
-            
-    except sqlite3.Error as e:
-        print(f"ERROR: Error migrating penalty scoring columns: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        if 'biologic_penalty_points' in columns:
+            cursor.execute('''
+                UPDATE enhanced_classifications 
+                SET scores_penalty_points = biologic_penalty_points
+                WHERE scores_penalty_points = 0 AND biologic_penalty_points != 0
+            ''')
+        
+        logger.info("Successfully migrated penalty scoring columns")
+    else:
+        logger.debug("No migration needed - penalty scoring columns are up to date")
+
+def add_articles_fts(cursor=None):
+    """Create the articles_fts full-text index and keep it in sync with triggers."""
+    if cursor is None:
+        return _run_migration(add_articles_fts, "Error creating articles_fts index")
+    
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='articles_fts'")
+    if cursor.fetchone() is None:
+        logger.debug("Creating articles_fts full-text index...")
+        cursor.execute('''
+            CREATE VIRTUAL TABLE articles_fts USING fts5(
+                title, abstract, keywords,
+                content='articles', content_rowid='id',
+                tokenize='porter unicode61'
+            )
+        ''')
+        cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+        logger.info("Successfully created articles_fts index")
+    else:
+        logger.debug("articles_fts index already exists")
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts(rowid, title, abstract, keywords)
+            VALUES (new.id, new.title, new.abstract, new.keywords);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts(articles_fts, rowid, title, abstract, keywords)
+            VALUES ('delete', old.id, old.title, old.abstract, old.keywords);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, abstract, keywords ON articles BEGIN
+            INSERT INTO articles_fts(articles_fts, rowid, title, abstract, keywords)
+            VALUES ('delete', old.id, old.title, old.abstract, old.keywords);
+            INSERT INTO articles_fts(rowid, title, abstract, keywords)
+            VALUES (new.id, new.title, new.abstract, new.keywords);
+        END
+    ''')
+
+def add_dashboard_index(cursor=None):
+    """Index enhanced_classifications for the dashboard's relevance/visibility/score queries."""
+    if cursor is None:
+        return _run_migration(add_dashboard_index, "Error creating dashboard index")
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ec_dashboard
+        ON enhanced_classifications(is_relevant, hidden_from_dashboard, ranking_score DESC)
+    ''')
+    logger.debug("Dashboard index is in place")
+
+def convert_journal_impact_without_rowid(cursor=None):
+    """Rebuild journal_impact_scores as a WITHOUT ROWID table keyed by journal_name."""
+    if cursor is None:
+        return _run_migration(convert_journal_impact_without_rowid, "Error converting journal_impact_scores")
+    
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'journal_impact_scores'")
+    row = cursor.fetchone()
+    
+    if row and 'WITHOUT ROWID' not in row[0].upper():
+        logger.debug("Rebuilding journal_impact_scores without rowid...")
+        cursor.execute(_JOURNAL_IMPACT_DDL.format(table='journal_impact_scores_new'))
+        _copy_common_columns(cursor, 'journal_impact_scores', 'journal_impact_scores_new')
+        cursor.execute('DROP TABLE journal_impact_scores')
+        cursor.execute('ALTER TABLE journal_impact_scores_new RENAME TO journal_impact_scores')
+        logger.info("Successfully rebuilt journal_impact_scores")
+    else:
+        logger.debug("journal_impact_scores is already keyed by journal_name")
+
+def backfill_term_tables(cursor=None):
+    """Populate the normalized author/MeSH/keyword/tag tables from the text columns."""
+    if cursor is None:
+        return _run_migration(backfill_term_tables, "Error backfilling term tables")
+    
+    _create_term_tables(cursor)
+    for lookup, (_, _, source, id_col, text_col) in _TERM_TABLES.items():
+        cursor.execute(f"SELECT {id_col}, {text_col} FROM {source} WHERE {text_col} IS NOT NULL AND {text_col} != ''")
+        rows = cursor.fetchall()
+        link_terms(cursor, lookup, rows)
+        logger.debug("Linked %s for %s rows", lookup, len(rows))
+    logger.info("Successfully backfilled normalized term tables")
 
-def add_hidden_from_dashboard_column():
-    """Add hidden_from_dashboard column to enhanced_classifications table."""
+def add_visible_ranked_index(cursor=None):
+    """Partial index over just the rows the dashboard shows, ordered by score."""
+    if cursor is None:
+        return _run_migration(add_visible_ranked_index, "Error creating visible ranked index")
+    
+    # Queries must repeat this exact WHERE clause for the planner to pick the index
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ec_visible_ranked
+        ON enhanced_classifications(ranking_score DESC)
+        WHERE is_relevant = 1 AND COALESCE(hidden_from_dashboard, 0) = 0
+    ''')
+    logger.debug("Visible ranked index is in place")
+
+def add_article_views(cursor=None):
+    """Create the canonical articles/enhanced_classifications join views."""
+    if cursor is None:
+        return _run_migration(add_article_views, "Error creating article views")
+    
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS relevant_classifications AS
+        SELECT e.*, a.pmid, a.title, a.journal, a.publication_date, a.article_type
+        FROM enhanced_classifications e
+        JOIN articles a ON a.id = e.article_id
+        WHERE e.is_relevant = 1
+    ''')
+    # Same predicate as idx_ec_visible_ranked so queries on the view can use it
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS dashboard_articles AS
+        SELECT a.*, e.ranking_score, e.clinical_bottom_line, e.tags, e.participants
+        FROM articles a
+        JOIN enhanced_classifications e ON e.article_id = a.id
+        WHERE e.is_relevant = 1 AND COALESCE(e.hidden_from_dashboard, 0) = 0
+    ''')
+    logger.debug("Article views are in place")
+
+def add_rule_rankings(cursor=None):
+    """Create the table rank_articles.py persists rule-based scores into."""
+    if cursor is None:
+        return _run_migration(add_rule_rankings, "Error creating rule rankings table")
+    
+    for ddl in _RULE_RANKINGS_DDL:
+        cursor.execute(ddl)
+    logger.debug("Rule rankings table is in place")
+
+def add_classification_cache_titles(cursor=None):
+    """Create the normalized-title index the classification cache falls back to."""
+    if cursor is None:
+        return _run_migration(add_classification_cache_titles, "Error creating classification cache titles table")
+    
+    cursor.execute(_CLASSIFICATION_TITLES_DDL)
+    logger.debug("Classification cache titles table is in place")
+
+def add_relevant_articles_index(cursor=None):
+    """Partial index over relevant classifications for the weekly export's join."""
+    if cursor is None:
+        return _run_migration(add_relevant_articles_index, "Error creating relevant articles index")
+    
+    # Most classifications are not relevant, so indexing only is_relevant = 1 rows keeps it small
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ec_relevant
+        ON enhanced_classifications(article_id, ranking_score DESC)
+        WHERE is_relevant = 1
+    ''')
+    logger.debug("Relevant articles index is in place")
+
+def add_relevant_covering_index(cursor=None):
+    """Covering index so reclassification reads relevant classifications without touching the table."""
+    if cursor is None:
+        return _run_migration(add_relevant_covering_index, "Error creating relevant covering index")
+    
+    # Leads with is_relevant so the filter is one range, in article_id order for the join; the
+    # trailing columns are the ones the reclassify script reads
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ec_rel_aid
+        ON enhanced_classifications(is_relevant, article_id, ranking_score, clinical_bottom_line)
+    ''')
+    logger.debug("Relevant covering index is in place")
+
+def drop_title_prefilter_rejections(cursor=None):
+    """Forget cached rejections the classifier's former title keyword rules could have made."""
+    if cursor is None:
+        return _run_migration(drop_title_prefilter_rejections, "Error dropping cached title prefilter rejections")
+    
+    # Those rules rejected adult studies without a model call and the results were cached.
+    # The model uses the same reason labels, so this also drops some genuine rejections;
+    # they cost one filtering call each to rebuild
+    cursor.execute('''
+        DELETE FROM classification_cache
+        WHERE json_extract(classification_json, '$.is_relevant') = 0
+        AND json_extract(classification_json, '$.reason')
+            IN ('Basic science focus', 'Pediatric focus', 'Obstetric focus', 'Transplant focus')
+    ''')
+    logger.debug("Dropped %s cached title prefilter rejections", cursor.rowcount)
+    cursor.execute("DELETE FROM classification_cache_titles WHERE key NOT IN (SELECT key FROM classification_cache)")
+
+# Secondary indexes on enhanced_classifications and the migration that builds each one
+_CLASSIFICATION_INDEXES = [
+    ('idx_ec_dashboard', add_dashboard_index),
+    ('idx_ec_visible_ranked', add_visible_ranked_index),
+    ('idx_ec_relevant', add_relevant_articles_index),
+    ('idx_ec_rel_aid', add_relevant_covering_index),
+]
+
+def drop_classification_indexes(cursor):
+    """Drop the enhanced_classifications secondary indexes; returns the names that existed."""
+    # Bulk rewrites rebuild each index once instead of maintaining it row by row; call inside
+    # the write transaction so readers never see the table without them
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'enhanced_classifications'")
+    existing = {row[0] for row in cursor.fetchall()}
+    dropped = [name for name, _ in _CLASSIFICATION_INDEXES if name in existing]
+    for name in dropped:
+        cursor.execute(f"DROP INDEX {name}")
+    return dropped
+
+def rebuild_classification_indexes(cursor, names):
+    """Recreate indexes dropped by drop_classification_indexes."""
+    for name, create in _CLASSIFICATION_INDEXES:
+        if name in names:
+            create(cursor)
+
+# Ordered schema migrations; versions are recorded in schema_version once applied.
+# Versions 2, 3, 6 and 8 used to add columns one migration at a time; they all
+# converge on DESIRED_COLUMNS so a database stamped at any of them ends up complete
+MIGRATIONS = [
+    (1, migrate_database),
+    (2, add_missing_columns),
+    (3, add_missing_columns),
+    (4, rename_rejection_reason_to_reason),
+    (5, remove_guideline_scoring_columns),
+    (6, add_missing_columns),
+    (7, migrate_penalty_scoring_columns),
+    (8, add_missing_columns),
+    (9, add_articles_fts),
+    (10, add_dashboard_index),
+    (11, convert_journal_impact_without_rowid),
+    (12, backfill_term_tables),
+    (13, add_visible_ranked_index),
+    (14, add_article_views),
+    (15, add_rule_rankings),
+    (16, add_classification_cache_titles),
+    (17, add_relevant_articles_index),
+    (18, add_relevant_covering_index),
+    (19, drop_title_prefilter_rejections),
+]
+
+def migrate(target_version=None):
+    """Apply pending migrations up to target_version on one connection in a single transaction."""
+    # Expand/contract deploys can hold the schema below a destructive step
+    # (e.g. TARGET_SCHEMA_VERSION=4 keeps the guideline columns) until no
+    # running code reads the old columns
+    if target_version is None:
+        target_version = int(os.getenv('TARGET_SCHEMA_VERSION') or MIGRATIONS[-1][0])
+    
     conn = sqlite3.connect(get_database_path())
+    conn.isolation_level = None
     cursor = conn.cursor()
     
     try:
-        # Check if the new column already exists
-        cursor.execute("PRAGMA table_info(enhanced_classifications)")
-        columns = [column[1] for column in cursor.fetchall()]
+        cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY)")
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current_version = cursor.fetchone()[0]
+        
+        pending = [(version, step) for version, step in MIGRATIONS
+                   if current_version < version <= target_version]
+        if not pending:
+            logger.info("Schema is up to date (version %s)", current_version)
+            return current_version
+        
+        with _bulk_migration_pragmas(cursor):
+            cursor.execute("BEGIN IMMEDIATE")
+            # Another worker may have migrated while this one waited for the write lock
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            locked_version = cursor.fetchone()[0]
+            if locked_version != current_version:
+                cursor.execute("ROLLBACK")
+                logger.info("Schema already migrated to version %s by another process", locked_version)
+                return locked_version
+            for version, step in pending:
+                step(cursor)
+                cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+            cursor.execute("COMMIT")
+        
+        # Rebuilt tables and new indexes leave planner statistics stale
+        try:
+            cursor.execute("ANALYZE")
+            cursor.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning("Refreshing planner statistics after migration failed: %s", e)
+        
+        logger.info("Migrated schema from version %s to %s", current_version, pending[-1][0])
+        return pending[-1][0]
         
-        if 'hidden_from_dashboard' not in columns:
-            print("Adding hidden_from_dashboard column...")
-            cursor.execute('ALTER TABLE enhanced_classifications ADD COLUMN hidden_from_dashboard BOOLEAN DEFAULT 0')
-            conn.commit()
-            print("SUCCESS: Successfully added hidden_from_dashboard column")
-        else:
-            print("SUCCESS: hidden_from_dashboard column already exists")
-            
     except sqlite3.Error as e:
-        print(f"ERROR: Error adding hidden_from_dashboard column: {e}")
-        conn.rollback()
+        logger.error("Error running migrations: %s", e)
+        return None
     finally:
         conn.close()
 
-def get_connection():
-    """Get database connection."""
-    return sqlite3.connect(get_database_path())
+# Size of sqlite3's per-connection prepared statement cache
+_CACHED_STATEMENTS = 256
+
+# Page cache per connection (KiB when negative, per SQLite convention); one-shot batch jobs
+# raise it by setting SQLITE_CACHE_SIZE before importing this module
+_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', '-64000'))
+
+# Session-level PRAGMAs; these reset on every new connection
+_SESSION_PRAGMAS = (
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    f"cache_size={_CACHE_SIZE}",
+    "mmap_size=268435456",
+    "foreign_keys=ON",
+    # Concurrent writers queue on the WAL write lock instead of failing fast
+    "busy_timeout=5000",
+)
+
+def _apply_pragmas(conn):
+    """Apply per-connection tuning PRAGMAs."""
+    for pragma in _SESSION_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+
+def get_connection(db_path=None):
+    """Get a tuned database connection, to the app database unless db_path is given."""
+    conn = sqlite3.connect(db_path or _DB_PATH, cached_statements=_CACHED_STATEMENTS)
+    # Persists in the file; a no-op once set, but scripts may open databases create_database never touched
+    conn.execute("PRAGMA journal_mode=WAL")
+    _apply_pragmas(conn)
+    return conn
+
+
+class _ConnectionPool:
+    """Small LIFO pool of reusable SQLite connections."""
+
+    def __init__(self, max_size=8, readonly=False):
+        self.max_size = max_size
+        self.readonly = readonly
+        self._idle = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+
+    def _connect(self, db_path):
+        if self.readonly:
+            # Read-only handle: never takes the writer lock, reads from the WAL snapshot
+            uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                   cached_statements=_CACHED_STATEMENTS)
+            conn.execute("PRAGMA query_only=1")
+        else:
+            conn = sqlite3.connect(db_path, check_same_thread=False,
+                                   cached_statements=_CACHED_STATEMENTS)
+            conn.execute("PRAGMA journal_mode=WAL")
+        _apply_pragmas(conn)
+        return conn
+
+    def _drain(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def acquire(self):
+        """Get a connection from the pool, opening a new one if none are idle."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect(_DB_PATH)
+
+    def release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full."""
+        if conn.in_transaction:
+            conn.rollback()
+        # Borrowers may switch to sqlite3.Row; the next one expects plain tuples
+        conn.row_factory = None
+        if not self.readonly:
+            try:
+                # Cheap; only re-analyzes tables whose stats have drifted
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        """Close every idle connection."""
+        with self._lock:
+            self._drain()
+
+_WRITE_POOL = _ConnectionPool()
+_READ_POOL = _ConnectionPool(readonly=True)
+
+def acquire_connection(readonly=False):
+    """Borrow a pooled database connection (read-only if requested)."""
+    return (_READ_POOL if readonly else _WRITE_POOL).acquire()
+
+def release_connection(conn, readonly=False):
+    """Return a borrowed connection to the pool it came from."""
+    (_READ_POOL if readonly else _WRITE_POOL).release(conn)
+
+@contextmanager
+def get_write_connection():
+    """Borrow a pooled read-write connection for the duration of a with block."""
+    conn = acquire_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+@contextmanager
+def get_read_connection():
+    """Borrow a pooled read-only connection for the duration of a with block."""
+    conn = acquire_connection(readonly=True)
+    try:
+        yield conn
+    finally:
+        release_connection(conn, readonly=True)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     create_database()
-    migrate_database()
-    add_rule_based_scoring_columns()
-    add_new_penalty_scoring_columns()
-    rename_rejection_reason_to_reason()
-    remove_guideline_scoring_columns()
-    add_temporality_points_column()
-    migrate_penalty_scoring_columns()
-    add_hidden_from_dashboard_column()
-    print("Database created and migrated successfully!")
\ No newline at end of file
+    migrate()
+    logger.info("Database created and migrated successfully!")
@@ -4,21 +4,23 @@ Script to fetch articles from a specified date range using PubMed client and cla
 Stores all data in the database.
 """
 
+import asyncio
 import logging
 import sys
 import os
 import argparse
-from datetime import datetime, timedelta
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
 from typing import List, Dict
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from medical_processing.data_collection.pubmed_client import PubMedClient
-from medical_processing.classification.classifier import classify_articles_batch
+from medical_processing.data_collection.pubmed_client import JOURNAL_NAMES, PubMedClient
+from medical_processing.classification.classifier import classify_articles_batch_async
 from medical_processing.database.operations import batch_insert_articles
-from medical_processing.database.schema import create_database, migrate_database
-from config import JOURNALS
+from medical_processing.database.schema import create_database, migrate
 
 # Configure logging
 logging.basicConfig(
@@ -31,65 +33,94 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def collect_articles_by_date_range(start_date: str, end_date: str, email: str = None) -> Dict[str, any]:
-    """Collect articles from a specific date range."""
+# YYYY/MM/DD as strptime('%Y/%m/%d') accepts it (month and day may be unpadded)
+_DATE_RE = re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})')
+
+async def collect_and_classify_by_date_range(start_date: str, end_date: str, email: str = None,
+                                            model_provider: str = 'claude', concurrency: int = 16) -> Dict[str, any]:
+    """Collect articles from a specific date range, classifying each PubMed batch while the next downloads."""
     client = PubMedClient(email=email)
     
-    # Get journal names from config
-    journal_names = list(JOURNALS.values())
-    
     # Search for articles in the specified date range
-    pmids = client.search_articles_custom_date(journal_names, start_date, end_date)
+    pmids = await asyncio.to_thread(client.search_articles_custom_date, JOURNAL_NAMES, start_date, end_date)
     
     if not pmids:
         logger.warning(f"No articles found for date range {start_date} to {end_date}")
         return {
             'articles': [],
+            'classified_articles': [],
             'filtering_stats': client.get_filtering_stats()
         }
     
-    # Fetch article details
-    articles = client.fetch_article_details(pmids)
+    # Producer: efetch batches run in a worker thread and queue up (bounded) for classification
+    queue = asyncio.Queue(maxsize=4)
+    batches = client.iter_article_details(pmids)
+    
+    async def produce():
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            await queue.put(batch)
+        # Not in a finally: a cancelled producer would block on the full queue with no consumer left
+        await queue.put(None)
+    
+    # Consumer: classify each batch as soon as it arrives
+    articles, classified_articles = [], []
+    
+    async def consume():
+        while (batch := await queue.get()) is not None:
+            articles.extend(batch)
+            if batch:
+                classified_articles.extend(
+                    await classify_articles_batch_async(batch, model_provider=model_provider, concurrency=concurrency)
+                )
+    
+    stages = [asyncio.ensure_future(produce()), asyncio.ensure_future(consume())]
+    try:
+        await asyncio.gather(*stages)
+    except BaseException:
+        # If one side fails the other would wait forever on the queue
+        for stage in stages:
+            stage.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
+        raise
     
     # Get filtering statistics
     filtering_stats = client.get_filtering_stats()
     
     logger.info(f"Successfully collected {len(articles)} articles for date range {start_date} to {end_date}")
-    if filtering_stats['ahead_of_print_filtered'] > 0:
-        logger.info(f"Filtered out {filtering_stats['ahead_of_print_filtered']} ahead-of-print articles")
-    if filtering_stats['title_filtered'] > 0:
-        logger.info(f"Filtered out {filtering_stats['title_filtered']} articles with filtered terms in title")
-    if filtering_stats['vaccine_dose_filtered'] > 0:
-        logger.info(f"Filtered out {filtering_stats['vaccine_dose_filtered']} articles with vaccine + dose/dosing in title")
+    ahead_of_print, title_terms, vaccine_dose = (
+        filtering_stats[key] for key in ('ahead_of_print_filtered', 'title_filtered', 'vaccine_dose_filtered')
+    )
+    if ahead_of_print > 0:
+        logger.info(f"Filtered out {ahead_of_print} ahead-of-print articles")
+    if title_terms > 0:
+        logger.info(f"Filtered out {title_terms} articles with filtered terms in title")
+    if vaccine_dose > 0:
+        logger.info(f"Filtered out {vaccine_dose} articles with vaccine + dose/dosing in title")
     
     return {
         'articles': articles,
+        'classified_articles': classified_articles,
         'filtering_stats': filtering_stats
     }
 
-def main():
-    """Main function to fetch and classify articles from a specified date range."""
-    parser = argparse.ArgumentParser(description='Fetch and classify medical articles from a specified date range')
-    parser.add_argument('start_date', help='Start date in YYYY/MM/DD format (e.g., 2025/01/01)')
-    parser.add_argument('end_date', help='End date in YYYY/MM/DD format (e.g., 2025/01/07)')
-    parser.add_argument('--email', help='Email address for PubMed API (optional but recommended)')
-    parser.add_argument('--model', choices=['claude', 'gemini'], default='claude', 
-                       help='AI model to use for classification (default: claude)')
-    
-    args = parser.parse_args()
-    
-    # Validate date format
+def _parse_date(value: str) -> date:
+    """Parse a YYYY/MM/DD date; raises ValueError for anything else."""
+    match = _DATE_RE.fullmatch(value)
+    if not match:
+        raise ValueError(f"Invalid date: {value}")
+    return date(*map(int, match.groups()))
+
+def run(start_date: str, end_date: str, email: str = None, model: str = 'claude', concurrency: int = 16):
+    """Fetch, classify and store articles from a date range given as YYYY/MM/DD strings."""
+    # Validate date format, parsing each date once
     try:
-        datetime.strptime(args.start_date, '%Y/%m/%d')
-        datetime.strptime(args.end_date, '%Y/%m/%d')
+        start_dt = _parse_date(start_date)
+        end_dt = _parse_date(end_date)
     except ValueError:
         logger.error("ERROR: Invalid date format. Please use YYYY/MM/DD format (e.g., 2025/01/01)")
         return
     
     # Validate date range
-    start_dt = datetime.strptime(args.start_date, '%Y/%m/%d')
-    end_dt = datetime.strptime(args.end_date, '%Y/%m/%d')
-    
     if start_dt > end_dt:
         logger.error("ERROR: Start date must be before or equal to end date")
         return
@@ -100,89 +131,97 @@ def main():
     logger.info("="*60)
     logger.info("STARTING ARTICLE FETCH AND CLASSIFICATION BY DATE RANGE")
     logger.info("="*60)
-    logger.info(f"Date Range: {args.start_date} to {args.end_date}")
-    logger.info(f"AI Model: {args.model.upper()}")
+    logger.info(f"Date Range: {start_date} to {end_date}")
+    logger.info(f"AI Model: {model.upper()}")
     logger.info("="*60)
     
     # Initialize database
     logger.info("Initializing database...")
     create_database()
-    migrate_database()
+    migrate()
     logger.info("SUCCESS: Database initialized successfully")
     
-    # Step 1: Fetch articles from specified date range
+    # Step 1: Fetch articles from specified date range, classifying batches as they arrive
     logger.info("\n" + "="*40)
-    logger.info("STEP 1: FETCHING ARTICLES FROM DATE RANGE")
+    logger.info("STEP 1: FETCHING AND CLASSIFYING ARTICLES FROM DATE RANGE")
     logger.info("="*40)
     
+    model_name = "Claude Sonnet 4.5" if model == "claude" else "Gemini 2.5 Pro"
+    logger.info(f"Classifying with {model_name} while fetching...")
+    
     try:
-        # Collect articles from the specified date range
-        result = collect_articles_by_date_range(args.start_date, args.end_date, args.email)
+        # Collect and classify articles from the specified date range
+        result = asyncio.run(collect_and_classify_by_date_range(
+            start_date, end_date, email,
+            model_provider=model, concurrency=concurrency
+        ))
         articles = result['articles']
+        classified_articles = result['classified_articles']
+        # One snapshot of the client's counters, unpacked once
         filtering_stats = result['filtering_stats']
+        ahead_of_print, title_terms, vaccine_dose, non_research, no_abstract = (
+            filtering_stats[key] for key in ('ahead_of_print_filtered', 'title_filtered', 'vaccine_dose_filtered',
+                                             'non_research_filtered', 'no_abstract_filtered')
+        )
         
         logger.info(f"Collection Results:")
         logger.info(f"   - Articles collected: {len(articles)}")
-        logger.info(f"   - Ahead of print filtered: {filtering_stats['ahead_of_print_filtered']}")
-        logger.info(f"   - Non-research filtered: {filtering_stats['non_research_filtered']}")
-        logger.info(f"   - No abstract filtered: {filtering_stats['no_abstract_filtered']}")
-        logger.info(f"   - Title terms filtered: {filtering_stats['title_filtered']}")
-        logger.info(f"   - Vaccine + dose/dosing filtered: {filtering_stats['vaccine_dose_filtered']}")
+        logger.info(f"   - Ahead of print filtered: {ahead_of_print}")
+        logger.info(f"   - Non-research filtered: {non_research}")
+        logger.info(f"   - No abstract filtered: {no_abstract}")
+        logger.info(f"   - Title terms filtered: {title_terms}")
+        logger.info(f"   - Vaccine + dose/dosing filtered: {vaccine_dose}")
         
         if not articles:
             logger.warning("WARNING: No articles found for the specified date range. Exiting.")
             return
             
     except Exception as e:
-        logger.error(f"ERROR: Error fetching articles: {e}")
+        logger.error(f"ERROR: Error fetching or classifying articles: {e}")
         return
     
-    # Step 2: Classify articles
+    # Step 2: Summarize classification
     logger.info("\n" + "="*40)
-    logger.info("STEP 2: CLASSIFYING ARTICLES")
+    logger.info("STEP 2: CLASSIFICATION RESULTS")
     logger.info("="*40)
     
     try:
-        # Use specified AI model for classification
-        model_name = "Claude Sonnet 4.5" if args.model == "claude" else "Gemini 2.5 Pro"
-        logger.info(f"Starting classification with {model_name}...")
-        classified_articles = classify_articles_batch(articles, model_provider=args.model)
-        
-        # Analyze classification results
-        relevant_count = sum(1 for article in classified_articles if article.get('is_relevant', False))
+        # Analyze classification results in a single pass; the per-category/reason
+        # breakdowns and samples only feed INFO logs, so skip them when INFO is off
+        verbose = logger.isEnabledFor(logging.INFO)
+        category_counts, reasons = Counter(), Counter()
+        relevant_count = 0
+        relevant_articles = []  # First few relevant articles, shown as samples at the end
+        for article in classified_articles:
+            if article.get('is_relevant', False):
+                relevant_count += 1
+                if verbose:
+                    category_counts[article.get('medical_category', 'Unknown')] += 1
+                    if len(relevant_articles) < 3:
+                        relevant_articles.append(article)
+            elif verbose:
+                reasons[article.get('reason', 'Unknown')] += 1
         irrelevant_count = len(classified_articles) - relevant_count
         
-        logger.info(f"Classification Results:")
-        logger.info(f"   - Total articles processed: {len(classified_articles)}")
-        logger.info(f"   - Relevant articles: {relevant_count}")
-        logger.info(f"   - Irrelevant articles: {irrelevant_count}")
+        logger.info("Classification Results:")
+        logger.info("   - Total articles processed: %d", len(classified_articles))
+        logger.info("   - Relevant articles: %d", relevant_count)
+        logger.info("   - Irrelevant articles: %d", irrelevant_count)
         
         # Show breakdown by medical category for relevant articles
-        relevant_articles = [a for a in classified_articles if a.get('is_relevant', False)]
-        if relevant_articles:
-            category_counts = {}
-            for article in relevant_articles:
-                category = article.get('medical_category', 'Unknown')
-                category_counts[category] = category_counts.get(category, 0) + 1
-            
-            logger.info(f"Relevant articles by category:")
-            for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True):
-                logger.info(f"   - {category}: {count}")
+        if category_counts:
+            logger.info("Relevant articles by category:")
+            for category, count in category_counts.most_common():
+                logger.info("   - %s: %d", category, count)
         
         # Show rejection reasons for irrelevant articles
-        irrelevant_articles = [a for a in classified_articles if not a.get('is_relevant', False)]
-        if irrelevant_articles:
-            reasons = {}
-            for article in irrelevant_articles:
-                reason = article.get('reason', 'Unknown')
-                reasons[reason] = reasons.get(reason, 0) + 1
-            
-            logger.info(f"Rejection reasons:")
-            for reason, count in sorted(reasons.items(), key=lambda x: x[1], reverse=True):
-                logger.info(f"   - {reason}: {count}")
+        if reasons:
+            logger.info("Rejection reasons:")
+            for reason, count in reasons.most_common():
+                logger.info("   - %s: %d", reason, count)
         
     except Exception as e:
-        logger.error(f"ERROR: Error classifying articles: {e}")
+        logger.error(f"ERROR: Error summarizing classification results: {e}")
         return
     
     # Step 3: Store in database
@@ -208,7 +247,7 @@ def main():
     logger.info("DATE RANGE FETCH AND CLASSIFICATION COMPLETED")
     logger.info("="*60)
     logger.info(f"Final Summary:")
-    logger.info(f"   - Date range: {args.start_date} to {args.end_date}")
+    logger.info(f"   - Date range: {start_date} to {end_date}")
     logger.info(f"   - Articles fetched: {len(articles)}")
     logger.info(f"   - Articles classified: {len(classified_articles)}")
     logger.info(f"   - Articles stored: {inserted_count}")
@@ -219,12 +258,26 @@ def main():
     
     # Show some examples of relevant articles
     if relevant_articles:
-        logger.info(f"\nSample relevant articles:")
-        for i, article in enumerate(relevant_articles[:3]):  # Show first 3
-            logger.info(f"   {i+1}. {article.get('title', 'No title')[:80]}...")
-            logger.info(f"      Category: {article.get('medical_category', 'Unknown')}")
-            logger.info(f"      Score: {article.get('ranking_score', 0)}/13")
-            logger.info(f"      Journal: {article.get('journal', 'Unknown')}")
+        logger.info("\nSample relevant articles:")
+        for i, article in enumerate(relevant_articles, 1):  # Show first 3
+            logger.info("   %d. %.80s...", i, article.get('title', 'No title'))
+            logger.info("      Category: %s", article.get('medical_category', 'Unknown'))
+            logger.info("      Score: %s/13", article.get('ranking_score', 0))
+            logger.info("      Journal: %s", article.get('journal', 'Unknown'))
+
+def main():
+    """Main function to fetch and classify articles from a specified date range."""
+    parser = argparse.ArgumentParser(description='Fetch and classify medical articles from a specified date range')
+    parser.add_argument('start_date', help='Start date in YYYY/MM/DD format (e.g., 2025/01/01)')
+    parser.add_argument('end_date', help='End date in YYYY/MM/DD format (e.g., 2025/01/07)')
+    parser.add_argument('--email', help='Email address for PubMed API (optional but recommended)')
+    parser.add_argument('--model', choices=['claude', 'gemini'], default='claude', 
+                       help='AI model to use for classification (default: claude)')
+    parser.add_argument('--concurrency', type=int, default=16,
+                       help='Number of articles classified in parallel (default: 16)')
+    
+    args = parser.parse_args()
+    run(args.start_date, args.end_date, email=args.email, model=args.model, concurrency=args.concurrency)
 
 if __name__ == "__main__":
     main()
@@ -32,8 +32,8 @@ try:
 except Exception:
     pass
 
-# Import the main date-based script
-from fetch_and_classify_by_date import main as date_main
+# Import the date-based pipeline
+from fetch_and_classify_by_date import run as date_run
 
 def main():
     """Main function to fetch and classify articles from the last 7 days."""
@@ -61,11 +61,8 @@ def main():
         else:
             model = 'claude'  # default; will error clearly if key missing
 
-    # Set up command line arguments for the date-based script
-    sys.argv = ['fetch_and_classify_by_date.py', start_date_str, end_date_str, '--model', model]
-    
-    # Call the main function from the date-based script
-    date_main()
+    # Run the date-based pipeline directly
+    date_run(start_date_str, end_date_str, model=model)
 
 if __name__ == "__main__":
     main()
@@ -3,74 +3,153 @@
 Script to rank relevant articles from the CSV file using the new ranking system.
 """
 
+import argparse
 import csv
+import heapq
 import json
+import re
 from classification.classifier import MedicalArticleClassifier
 from datetime import datetime
+from typing import NamedTuple
+from medical_processing.database.operations import ArticleDatabase
+from medical_processing.database.schema import create_database, migrate
 
-def extract_relevant_articles(csv_file):
-    """Extract articles marked as relevant from the CSV file."""
-    relevant_articles = []
+try:
+    import pandas as pd
+except ImportError:  # Optional; rank_articles() scores row by row without it
+    pd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional; only the CSV export is written without it
+    pa = pq = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional; content buckets fall back to one regex search each
+    ahocorasick = None
+
+def _keyword_re(keywords):
+    """Compile a case-insensitive alternation matching any keyword as a substring."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+INTERVENTION_KEYWORDS = ['treatment', 'therapy', 'medication', 'drug', 'intervention', 'procedure', 'surgery', 'trial', 'randomized', 'rct']
+DIAGNOSTIC_KEYWORDS = ['diagnostic', 'diagnosis', 'test', 'screening', 'biomarker', 'imaging']
+HIGH_PREV_KEYWORDS = ['hypertension', 'diabetes', 'heart failure', 'copd', 'pneumonia', 'sepsis', 'stroke', 'myocardial infarction', 'atrial fibrillation']
+MED_PREV_KEYWORDS = ['pancreatitis', 'dka', 'asthma', 'chronic kidney disease', 'liver disease']
+HOSP_KEYWORDS = ['hospitalization', 'hospital', 'inpatient', 'acute', 'critical', 'icu', 'emergency', 'admission']
+
+# Keyword buckets, each compiled once into a single-pass alternation
+INTERVENTION_RE = _keyword_re(INTERVENTION_KEYWORDS)
+DIAGNOSTIC_RE = _keyword_re(DIAGNOSTIC_KEYWORDS)
+HIGH_PREV_RE = _keyword_re(HIGH_PREV_KEYWORDS)
+MED_PREV_RE = _keyword_re(MED_PREV_KEYWORDS)
+HOSP_RE = _keyword_re(HOSP_KEYWORDS)
+HIGH_IMPACT_RE = _keyword_re(['new england journal of medicine', 'nejm', 'lancet', 'jama', 'circulation', 'european heart journal'])
+RCT_TYPE_RE = _keyword_re(['randomized controlled trial', 'rct'])
+REVIEW_TYPE_RE = _keyword_re(['meta-analysis', 'systematic review'])
+
+# (bucket, points, keywords) scored from title + bottom line; the highest tier hit wins per bucket
+CONTENT_BUCKETS = [
+    ('focus', 2, INTERVENTION_KEYWORDS),
+    ('focus', 1, DIAGNOSTIC_KEYWORDS),
+    ('prevalence', 2, HIGH_PREV_KEYWORDS),
+    ('prevalence', 1, MED_PREV_KEYWORDS),
+    ('hospitalization', 1, HOSP_KEYWORDS),
+]
+
+def _build_keyword_automaton():
+    """Build one Aho-Corasick automaton over every content keyword, or None without pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for bucket, points, keywords in CONTENT_BUCKETS:
+        for keyword in keywords:
+            automaton.add_word(keyword, (bucket, points))
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+def _content_bucket_points(content):
+    """Return {bucket: points} for the title + bottom line text."""
+    if KEYWORD_AUTOMATON is not None:
+        # All buckets in one C-level pass over the text
+        hits = {}
+        for _, (bucket, points) in KEYWORD_AUTOMATON.iter(content.lower()):
+            if points > hits.get(bucket, 0):
+                hits[bucket] = points
+        return hits
     
+    hits = {}
+    # Check for intervention studies (treatments, medications, procedures), then diagnostic tests
+    if INTERVENTION_RE.search(content):
+        hits['focus'] = 2
+    elif DIAGNOSTIC_RE.search(content):
+        hits['focus'] = 1
+    # Check for common diseases that indicate high prevalence
+    if HIGH_PREV_RE.search(content):
+        hits['prevalence'] = 2
+    elif MED_PREV_RE.search(content):
+        hits['prevalence'] = 1
+    # Check if content suggests hospitalization relevance
+    if HOSP_RE.search(content):
+        hits['hospitalization'] = 1
+    return hits
+
+def iter_relevant_articles(csv_file):
+    """Yield articles marked as relevant, streaming the CSV file row by row."""
     with open(csv_file, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
+        for row in csv.DictReader(file):
             # Check if article is marked as relevant
             if row.get('is_relevant', '').lower() == 'true':
-                relevant_articles.append(row)
+                yield row
+
+def extract_relevant_articles(csv_file):
+    """Extract articles marked as relevant from the CSV file."""
+    return list(iter_relevant_articles(csv_file))
+
+class ArticleView(NamedTuple):
+    """The fields calculate_ranking_score reads, gathered once per article."""
+    title: str
+    clinical_bottom_line: str
+    publication_type: str
+    journal: str
     
-    return relevant_articles
+    @classmethod
+    def from_article(cls, article):
+        return cls(article.get('title', ''), article.get('clinical_bottom_line', ''),
+                   article.get('publication_type', ''), article.get('journal', ''))
 
 def calculate_ranking_score(article):
-    """Calculate ranking score based on the ranking criteria."""
+    """Calculate ranking score based on the ranking criteria (article dict or ArticleView)."""
+    view = article if isinstance(article, ArticleView) else ArticleView.from_article(article)
     
     # Initialize scores
-    focus_points = 0
     type_points = 0
-    prevalence_points = 0
-    hospitalization_points = 0
     impact_factor_points = 0
     
-    # 1. Focus of Paper (0-2 points)
-    title = article.get('title', '').lower()
-    abstract = article.get('clinical_bottom_line', '').lower()
-    content = f"{title} {abstract}"
+    content = f"{view.title} {view.clinical_bottom_line}"
+    hits = _content_bucket_points(content)
     
-    # Check for intervention studies (treatments, medications, procedures)
-    intervention_keywords = ['treatment', 'therapy', 'medication', 'drug', 'intervention', 'procedure', 'surgery', 'trial', 'randomized', 'rct']
-    if any(keyword in content for keyword in intervention_keywords):
-        focus_points = 2
-    # Check for diagnostic tests
-    elif any(keyword in content for keyword in ['diagnostic', 'diagnosis', 'test', 'screening', 'biomarker', 'imaging']):
-        focus_points = 1
+    # 1. Focus of Paper (0-2 points): interventions 2, diagnostic tests 1
+    focus_points = hits.get('focus', 0)
     
     # 2. Type of Paper (0-2 points)
-    publication_type = article.get('publication_type', '').lower()
-    if 'randomized controlled trial' in publication_type or 'rct' in publication_type:
+    if RCT_TYPE_RE.search(view.publication_type):
         type_points = 2
-    elif 'meta-analysis' in publication_type or 'systematic review' in publication_type:
+    elif REVIEW_TYPE_RE.search(view.publication_type):
         type_points = 1
     
     # 3. Disease Prevalence (0-2 points) - now calculated from content analysis
-    # Check for common diseases that indicate high prevalence
-    high_prevalence_keywords = ['hypertension', 'diabetes', 'heart failure', 'copd', 'pneumonia', 'sepsis', 'stroke', 'myocardial infarction', 'atrial fibrillation']
-    medium_prevalence_keywords = ['pancreatitis', 'dka', 'asthma', 'chronic kidney disease', 'liver disease']
-    
-    if any(keyword in content for keyword in high_prevalence_keywords):
-        prevalence_points = 2
-    elif any(keyword in content for keyword in medium_prevalence_keywords):
-        prevalence_points = 1
+    prevalence_points = hits.get('prevalence', 0)
     
     # 4. Hospitalization Relevance (0-1 point)
-    # Check if content suggests hospitalization relevance
-    hospitalization_keywords = ['hospitalization', 'hospital', 'inpatient', 'acute', 'critical', 'icu', 'emergency', 'admission']
-    if any(keyword in content for keyword in hospitalization_keywords):
-        hospitalization_points = 1
+    hospitalization_points = hits.get('hospitalization', 0)
     
     # 5. Impact Factor (0-1 point)
-    journal = article.get('journal', '').lower()
-    high_impact_journals = ['new england journal of medicine', 'nejm', 'lancet', 'jama', 'circulation', 'european heart journal']
-    if any(high_journal in journal for high_journal in high_impact_journals):
+    if HIGH_IMPACT_RE.search(view.journal):
         impact_factor_points = 1
     
     # Calculate total score
@@ -87,116 +166,176 @@ def calculate_ranking_score(article):
         }
     }
 
-def rank_articles(articles):
-    """Rank articles by their calculated scores."""
-    ranked_articles = []
-    
-    for article in articles:
-        ranking_data = calculate_ranking_score(article)
-        article_with_ranking = {**article, **ranking_data}
-        ranked_articles.append(article_with_ranking)
+def rank_articles(articles, top_k=None):
+    """Rank articles by their calculated scores, optionally keeping only the top_k."""
+    # Score lazily so any iterable (e.g. iter_relevant_articles) is consumed in one pass
+    scored = ({**article, **calculate_ranking_score(article)} for article in articles)
     
     # Sort by ranking score (descending)
-    ranked_articles.sort(key=lambda x: x['ranking_score'], reverse=True)
+    if top_k is not None:
+        return heapq.nlargest(top_k, scored, key=lambda x: x['ranking_score'])
+    return sorted(scored, key=lambda x: x['ranking_score'], reverse=True)
+
+_BREAKDOWN_FIELDS = ['focus_points', 'type_points', 'prevalence_points',
+                     'hospitalization_points', 'impact_factor_points']
+
+def rank_articles_vectorized(csv_file):
+    """Score relevant articles with pandas column-wise matching; same output as rank_articles()."""
+    df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+    
+    def column(name):
+        return df[name] if name in df.columns else pd.Series('', index=df.index)
+    
+    df = df[column('is_relevant').str.lower() == 'true']
+    content = column('title') + ' ' + column('clinical_bottom_line')
+    publication_type = column('publication_type')
     
+    intervention = content.str.contains(INTERVENTION_RE)
+    diagnostic = content.str.contains(DIAGNOSTIC_RE)
+    rct = publication_type.str.contains(RCT_TYPE_RE)
+    review = publication_type.str.contains(REVIEW_TYPE_RE)
+    high_prevalence = content.str.contains(HIGH_PREV_RE)
+    medium_prevalence = content.str.contains(MED_PREV_RE)
+    
+    # Same tiering as calculate_ranking_score: the higher bucket wins
+    df = df.assign(
+        focus_points=2 * intervention + (diagnostic & ~intervention),
+        type_points=2 * rct + (review & ~rct),
+        prevalence_points=2 * high_prevalence + (medium_prevalence & ~high_prevalence),
+        hospitalization_points=content.str.contains(HOSP_RE).astype(int),
+        impact_factor_points=column('journal').str.contains(HIGH_IMPACT_RE).astype(int),
+    )
+    df['ranking_score'] = df[_BREAKDOWN_FIELDS].sum(axis=1)
+    df = df.sort_values('ranking_score', ascending=False, kind='stable')
+    
+    ranked_articles = df.to_dict('records')
+    for article in ranked_articles:
+        article['ranking_breakdown'] = {field: article.pop(field) for field in _BREAKDOWN_FIELDS}
     return ranked_articles
 
+# Article columns exported ahead of the ranking columns
+_EXPORT_FIELDS = [
+    'pmid', 'title', 'journal', 'authors', 'publication_date', 'doi', 'url',
+    'medical_category', 'is_relevant', 'reason', 'participants',
+    'clinical_bottom_line', 'tags', 'keywords', 'mesh_terms', 'publication_type'
+]
+
+def _csv_row(article):
+    """Flatten a ranked article into an export_to_csv row tuple."""
+    breakdown = article.get('ranking_breakdown', {})
+    return (*[article.get(field, '') for field in _EXPORT_FIELDS],
+            article.get('ranking_score', 0),
+            *[breakdown.get(field, 0) for field in _BREAKDOWN_FIELDS])
+
+# Header row: article fields followed by the ranking fields
+_EXPORT_COLUMNS = _EXPORT_FIELDS + ['ranking_score'] + _BREAKDOWN_FIELDS
+
 def export_to_csv(ranked_articles, output_file):
     """Export ranked articles to CSV file."""
-    
-    # Define fieldnames including ranking fields
-    fieldnames = [
-        'pmid', 'title', 'journal', 'authors', 'publication_date', 'doi', 'url',
-        'medical_category', 'is_relevant', 'reason', 'participants',
-        'clinical_bottom_line', 'tags', 'keywords', 'mesh_terms', 'publication_type',
-        'ranking_score', 'focus_points', 'type_points', 'prevalence_points',
-        'hospitalization_points', 'impact_factor_points'
-    ]
-    
     with open(output_file, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
+        writer = csv.writer(file)
+        writer.writerow(_EXPORT_COLUMNS)
         
-        for article in ranked_articles:
-            # Prepare row data
-            row_data = {
-                'pmid': article.get('pmid', ''),
-                'title': article.get('title', ''),
-                'journal': article.get('journal', ''),
-                'authors': article.get('authors', ''),
-                'publication_date': article.get('publication_date', ''),
-                'doi': article.get('doi', ''),
-                'url': article.get('url', ''),
-                'medical_category': article.get('medical_category', ''),
-                'is_relevant': article.get('is_relevant', ''),
-                'reason': article.get('reason', ''),
-                'participants': article.get('participants', ''),
-                'clinical_bottom_line': article.get('clinical_bottom_line', ''),
-                'tags': article.get('tags', ''),
-                'keywords': article.get('keywords', ''),
-                'mesh_terms': article.get('mesh_terms', ''),
-                'publication_type': article.get('publication_type', ''),
-                'ranking_score': article.get('ranking_score', 0),
-                'focus_points': article.get('ranking_breakdown', {}).get('focus_points', 0),
-                'type_points': article.get('ranking_breakdown', {}).get('type_points', 0),
-                'prevalence_points': article.get('ranking_breakdown', {}).get('prevalence_points', 0),
-                'hospitalization_points': article.get('ranking_breakdown', {}).get('hospitalization_points', 0),
-                'impact_factor_points': article.get('ranking_breakdown', {}).get('impact_factor_points', 0)
-            }
-            writer.writerow(row_data)
+        writer.writerows(_csv_row(article) for article in ranked_articles)
+
+def export_to_parquet(ranked_articles, output_file):
+    """Export ranked articles to a zstd-compressed Parquet file with typed score columns."""
+    rows = [_csv_row(article) for article in ranked_articles]
+    columns = list(zip(*rows)) if rows else [()] * len(_EXPORT_COLUMNS)
+    score_columns = {'ranking_score', *_BREAKDOWN_FIELDS}
+    table = pa.table({
+        name: (pa.array(values, type=pa.int64()) if name in score_columns
+               else pa.array([None if value is None else str(value) for value in values], type=pa.string()))
+        for name, values in zip(_EXPORT_COLUMNS, columns)
+    })
+    pq.write_table(table, output_file, compression='zstd')
+
+def rank_articles_in_db(top_k=10):
+    """Score relevant articles stored in SQLite, persist the scores, and return (top_k, distribution)."""
+    with ArticleDatabase() as db:
+        # Raw rows are (id, pmid, title, clinical_bottom_line, publication_type, journal)
+        rankings = [(row[0], calculate_ranking_score(ArticleView(*row[2:])))
+                    for row in db.iter_relevant_articles_for_ranking(raw=True)]
+        db.store_rule_rankings(rankings)
+        top_articles = db.get_top_rule_ranked(top_k)
+        distribution = db.get_rule_ranking_distribution()
+    
+    for article in top_articles:
+        article['ranking_breakdown'] = {field: article.pop(field) for field in _BREAKDOWN_FIELDS}
+    return top_articles, distribution
 
 def main():
     """Main function to process and rank articles."""
-    
-    input_file = 'classified_articles_20250911_222035.csv'
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_file = f'ranked_articles_{timestamp}.csv'
+    parser = argparse.ArgumentParser(description='Rank relevant articles with the rule-based ranking system')
+    parser.add_argument('--csv', dest='input_file',
+                        help='Rank a classified articles CSV and export a ranked CSV instead of using the database')
+    args = parser.parse_args()
     
     print("=" * 80)
     print("RANKING RELEVANT ARTICLES")
     print("=" * 80)
     
-    # Extract relevant articles
-    print("1. Extracting relevant articles...")
-    relevant_articles = extract_relevant_articles(input_file)
-    print(f"   Found {len(relevant_articles)} relevant articles")
+    output_file = None
+    if args.input_file:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = f'ranked_articles_{timestamp}.csv'
+        
+        # Extract and rank relevant articles in a single pass over the CSV
+        print("1. Extracting relevant articles...")
+        print("2. Calculating ranking scores...")
+        if pd is not None:
+            ranked_articles = rank_articles_vectorized(args.input_file)
+        else:
+            ranked_articles = rank_articles(iter_relevant_articles(args.input_file))
+        top_articles = ranked_articles[:10]
+        score_distribution = {}
+        for article in ranked_articles:
+            score = article['ranking_score']
+            score_distribution[score] = score_distribution.get(score, 0) + 1
+    else:
+        # Score straight from the database and keep the results in rule_rankings
+        print("1. Reading relevant articles from the database...")
+        print("2. Calculating and storing ranking scores...")
+        create_database()
+        migrate()
+        top_articles, score_distribution = rank_articles_in_db(top_k=10)
+    
+    total_ranked = sum(score_distribution.values())
+    print(f"   Found {total_ranked} relevant articles")
     
-    if not relevant_articles:
+    if not total_ranked:
         print("No relevant articles found!")
         return
     
-    # Rank articles
-    print("2. Calculating ranking scores...")
-    ranked_articles = rank_articles(relevant_articles)
-    
     # Display top 10 articles
     print("\n3. TOP 10 RANKED ARTICLES:")
     print("-" * 80)
-    for i, article in enumerate(ranked_articles[:10], 1):
+    for i, article in enumerate(top_articles, 1):
         breakdown = article.get('ranking_breakdown', {})
         print(f"{i:2d}. Score: {article['ranking_score']}/10 - {article['title'][:60]}...")
         print(f"    Journal: {article['journal']}")
         print(f"    Breakdown: Focus({breakdown.get('focus_points', 0)}) + Type({breakdown.get('type_points', 0)}) + Prevalence({breakdown.get('prevalence_points', 0)}) + Hospital({breakdown.get('hospitalization_points', 0)}) + Impact({breakdown.get('impact_factor_points', 0)})")
         print()
     
-    # Export to CSV
-    print("4. Exporting to CSV...")
-    export_to_csv(ranked_articles, output_file)
-    print(f"   ✅ Exported {len(ranked_articles)} ranked articles to {output_file}")
+    if output_file:
+        # Export to CSV
+        print("4. Exporting to CSV...")
+        export_to_csv(ranked_articles, output_file)
+        print(f"   ✅ Exported {len(ranked_articles)} ranked articles to {output_file}")
+        if pa is not None:
+            parquet_file = output_file[:-len('.csv')] + '.parquet'
+            export_to_parquet(ranked_articles, parquet_file)
+            print(f"   ✅ Exported {len(ranked_articles)} ranked articles to {parquet_file}")
     
     # Summary statistics
     print("\n5. RANKING SUMMARY:")
     print("-" * 40)
-    score_distribution = {}
-    for article in ranked_articles:
-        score = article['ranking_score']
-        score_distribution[score] = score_distribution.get(score, 0) + 1
-    
     for score in sorted(score_distribution.keys(), reverse=True):
         count = score_distribution[score]
         print(f"   Score {score}/10: {count} articles")
     
-    print(f"\n✅ Ranking complete! Results saved to {output_file}")
+    destination = output_file or 'the rule_rankings table'
+    print(f"\n✅ Ranking complete! Results saved to {destination}")
 
 if __name__ == "__main__":
     main()
@@ -5,57 +5,235 @@ This service provides high-level functions for processing medical articles
 that can be called from the Flask backend endpoints.
 """
 
+import asyncio
+import heapq
 import logging
 import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .data_collection.pubmed_client import PubMedClient
-# Lazy import classification to avoid hard dependency at startup on optional AI SDKs
-from .database.operations import batch_insert_articles
-from .database.schema import (
-    create_database, 
-    migrate_database, 
-    add_hidden_from_dashboard_column,
-    add_new_penalty_scoring_columns,
-    add_temporality_points_column,
-    migrate_penalty_scoring_columns
-)
-from .config import JOURNALS
+from .data_collection.pubmed_client import JOURNAL_NAMES, PubMedClient
+from .database.operations import ArticleDatabase, batch_insert_articles
+from .database.schema import create_database, migrate
 
 logger = logging.getLogger(__name__)
 
+# Articles classified in parallel by the service workflows
+CLASSIFY_CONCURRENCY = int(os.getenv('CLASSIFY_CONCURRENCY', '8'))
+
+# Classified articles written to the database per batch_insert_articles call
+STORE_BATCH_SIZE = 500
+
+# A bare PMID, or a PubMed article URL with optional trailing slash, query or fragment
+_PMID_RE = re.compile(r'(?:https?://)?(?:www\.)?(?:pubmed\.ncbi\.nlm\.nih\.gov/)?([0-9]+)/?(?:[?#].*)?')
+
+# Set once create_database/migrate succeed; later initialize_database calls in this process are no-ops
+_INIT_DONE = False
+_INIT_LOCK = threading.Lock()
+
+# Classification is imported lazily to avoid a hard dependency at startup on optional AI SDKs
+_classifier_module = None
+_CLASSIFIER_LOCK = threading.Lock()
+
+def _load_classifier():
+    """Import the classification module on first use and reuse it afterwards."""
+    global _classifier_module
+    if _classifier_module is None:
+        with _CLASSIFIER_LOCK:
+            if _classifier_module is None:
+                from .classification import classifier
+                _classifier_module = classifier
+    return _classifier_module
+
+def _unstored_pmids(pmids: List[str]) -> List[str]:
+    """Drop PMIDs already in the database so overlapping runs don't classify them again."""
+    if not pmids:
+        return pmids
+    with ArticleDatabase() as db:
+        existing = db.filter_existing_pmids(pmids)
+    if existing:
+        logger.info("Skipping %d already stored articles", len(existing))
+    return [pmid for pmid in pmids if str(pmid) not in existing]
+
+# Single-article requests arriving within this window (seconds) share one EFetch call
+SINGLE_FETCH_WINDOW = 0.05
+SINGLE_FETCH_MAX_BATCH = 16
+
+class _FetchCoalescer:
+    """Serve single-PMID lookups that arrive close together from one EFetch request."""
+    
+    def __init__(self, window: float, max_batch: int):
+        self._window = window
+        self._max_batch = max_batch
+        self._lock = threading.Lock()
+        # email -> {pmid: Future} for the batch still accepting PMIDs
+        self._pending: Dict[Optional[str], Dict[str, Future]] = {}
+    
+    def fetch(self, pmid: str, email: str = None) -> Optional[Dict]:
+        """Article details for one PMID, or None if PubMed returned nothing for it."""
+        with self._lock:
+            batch = self._pending.get(email)
+            # The caller that opens a batch waits out the window and then fetches it;
+            # no background thread is left holding requests at shutdown
+            leader = batch is None or len(batch) >= self._max_batch
+            if leader:
+                batch = self._pending[email] = {}
+            future = batch.setdefault(pmid, Future())
+        
+        if leader:
+            try:
+                time.sleep(self._window)
+                self._close_batch(batch, email)
+                self._fetch_batch(batch, email)
+            except BaseException as e:
+                # Followers only hear back through their futures, so a leader dying mid-fetch
+                # (e.g. SystemExit at worker shutdown) must fail them rather than leave them waiting
+                self._close_batch(batch, email)
+                for waiting in batch.values():
+                    if not waiting.done():
+                        waiting.set_exception(e)
+                raise
+        
+        article = future.result()
+        return dict(article) if article is not None else None
+    
+    def _close_batch(self, batch: Dict[str, Future], email: Optional[str]):
+        """Stop a batch accepting PMIDs, if it still is."""
+        with self._lock:
+            if self._pending.get(email) is batch:
+                del self._pending[email]
+    
+    def _fetch_batch(self, batch: Dict[str, Future], email: Optional[str]):
+        """Resolve every future in a closed batch from a single EFetch call."""
+        try:
+            articles = PubMedClient(email=email).fetch_article_details(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+        if len(batch) > 1:
+            logger.info("Fetched %d single-article requests in one EFetch call", len(batch))
+        by_pmid = {article['pmid']: article for article in articles}
+        for pmid, future in batch.items():
+            future.set_result(by_pmid.get(pmid))
+
+_single_fetches = _FetchCoalescer(SINGLE_FETCH_WINDOW, SINGLE_FETCH_MAX_BATCH)
+
+# (pmid, provider) -> Future of the in-flight process_single_article result
+_inflight_single: Dict[Tuple[str, str], Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def _last_week_range() -> Tuple[str, str]:
+    """(start, end) PubMed dates covering the last 7 days."""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=7)
+    return start_date.strftime('%Y/%m/%d'), end_date.strftime('%Y/%m/%d')
+
+class _ArticleStats:
+    """Running score, category and top-5 statistics over classified articles fed in batches."""
+    
+    def __init__(self):
+        self.count = 0
+        self._scored = 0
+        self._score_sum = 0.0
+        self._score_8_plus = 0
+        self._categories = Counter()
+        # Min-heap of (score, -arrival, article) holding the best 5; ties keep the earlier article
+        self._top = []
+    
+    def add(self, classified_articles: Iterable[Dict]):
+        """Fold a batch of classified articles into the running totals."""
+        for article in classified_articles:
+            arrival = self.count
+            self.count += 1
+            self._categories[article.get('medical_category', 'Uncategorized')] += 1
+            
+            ranking_score = article.get('ranking_score') or 0
+            if ranking_score > 0:
+                self._scored += 1
+                self._score_sum += float(ranking_score)
+                if ranking_score >= 8:
+                    self._score_8_plus += 1
+                entry = (ranking_score, -arrival, article)
+                if len(self._top) < 5:
+                    heapq.heappush(self._top, entry)
+                else:
+                    heapq.heappushpop(self._top, entry)
+    
+    def as_dict(self) -> Dict:
+        """Statistics in the shape returned by the processing workflows."""
+        if not self.count:
+            return {
+                'avg_ranking_score': 0,
+                'articles_score_8_plus': 0,
+                'category_breakdown': {},
+                'top_articles': []
+            }
+        
+        avg_score = self._score_sum / self._scored if self._scored else 0
+        
+        # Format top articles for email (title and score only)
+        top_articles_formatted = [
+            {
+                'title': article.get('title', 'Untitled')[:80] + ('...' if len(article.get('title', '')) > 80 else ''),
+                'score': article.get('ranking_score', 0),
+                'journal': article.get('journal', 'Unknown')
+            }
+            for _, _, article in sorted(self._top, reverse=True)
+        ]
+        
+        return {
+            'avg_ranking_score': round(avg_score, 2),
+            'articles_score_8_plus': self._score_8_plus,
+            'category_breakdown': dict(self._categories),
+            'top_articles': top_articles_formatted
+        }
+
 class MedicalArticlesService:
     """Service class for medical articles processing operations."""
     
     def __init__(self):
         """Initialize the service."""
-        self.pubmed_client = PubMedClient()
-        self.classifier = None  # Will be initialized when needed
-        
+        self._pubmed_client = None  # Built on first use, not at import
+    
+    @property
+    def pubmed_client(self) -> PubMedClient:
+        """Default PubMed client, created the first time it is needed."""
+        if self._pubmed_client is None:
+            self._pubmed_client = PubMedClient()
+        return self._pubmed_client
+    
     def initialize_database(self):
-        """Initialize and migrate the database."""
-        try:
-            create_database()
-            migrate_database()
-            add_new_penalty_scoring_columns()  # Adds metabolic_penalty_points and other columns
-            add_temporality_points_column()
-            migrate_penalty_scoring_columns()
-            add_hidden_from_dashboard_column()
-            logger.info("✅ Database initialized and migrated successfully")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Error initializing database: {e}")
-            return False
+        """Initialize and migrate the database once per process."""
+        global _INIT_DONE
+        with _INIT_LOCK:
+            if _INIT_DONE:
+                return True
+            try:
+                create_database()
+                if migrate() is None:
+                    logger.error("❌ Database migration failed")
+                    return False
+                _INIT_DONE = True
+                logger.info("✅ Database initialized and migrated successfully")
+                return True
+            except Exception as e:
+                logger.error(f"❌ Error initializing database: {e}")
+                return False
     
     def collect_articles_by_date_range(self, start_date: str, end_date: str, email: str = None) -> Dict:
         """Collect articles from a specific date range."""
         try:
             client = PubMedClient(email=email)
-            journal_names = list(JOURNALS.values())
             
             # Search for articles in the specified date range
-            pmids = client.search_articles_custom_date(journal_names, start_date, end_date)
+            pmids = client.search_articles_custom_date(JOURNAL_NAMES, start_date, end_date)
             
             if not pmids:
                 logger.warning(f"No articles found for date range {start_date} to {end_date}")
@@ -65,8 +243,8 @@ class MedicalArticlesService:
                     'success': True
                 }
             
-            # Fetch article details
-            articles = client.fetch_article_details(pmids)
+            # Fetch article details, EFetch batches concurrently within NCBI's rate limit
+            articles = asyncio.run(client.afetch_article_details(pmids))
             filtering_stats = client.get_filtering_stats()
             
             logger.info(f"Successfully collected {len(articles)} articles for date range {start_date} to {end_date}")
@@ -88,11 +266,7 @@ class MedicalArticlesService:
     
     def collect_weekly_articles(self, email: str = None) -> Dict:
         """Collect articles from the last 7 days."""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        
-        start_date_str = start_date.strftime('%Y/%m/%d')
-        end_date_str = end_date.strftime('%Y/%m/%d')
+        start_date_str, end_date_str = _last_week_range()
         
         logger.info(f"Collecting weekly articles from {start_date_str} to {end_date_str}")
         
@@ -100,6 +274,11 @@ class MedicalArticlesService:
     
     def classify_articles(self, articles: List[Dict], model_provider: str = "claude") -> Dict:
         """Classify a batch of articles using AI."""
+        return asyncio.run(self.aclassify_articles(articles, model_provider))
+    
+    async def aclassify_articles(self, articles: List[Dict], model_provider: str = "claude",
+                                 concurrency: int = CLASSIFY_CONCURRENCY) -> Dict:
+        """Classify a batch of articles with up to `concurrency` LLM calls in flight."""
         try:
             if not articles:
                 return {
@@ -108,13 +287,14 @@ class MedicalArticlesService:
                     'message': 'No articles to classify'
                 }
             
-            # Initialize classifier if needed (lazy import to avoid startup errors)
-            from .classification.classifier import MedicalArticleClassifier, classify_articles_batch
-            if not self.classifier or self.classifier.model_provider != model_provider:
-                self.classifier = MedicalArticleClassifier(model_provider=model_provider)
+            # Build (or reuse) the provider's classifier up front so a bad provider or missing key fails here
+            classifier = _load_classifier()
+            classifier.get_classifier(model_provider)
             
-            # Classify articles
-            classified_articles = classify_articles_batch(articles, model_provider=model_provider)
+            # Classify articles concurrently
+            classified_articles = await classifier.classify_articles_batch_async(
+                articles, model_provider=model_provider, concurrency=concurrency
+            )
             
             logger.info(f"Successfully classified {len(classified_articles)} articles")
             
@@ -131,10 +311,13 @@ class MedicalArticlesService:
                 'error': str(e)
             }
     
-    def store_articles(self, articles: List[Dict]) -> Dict:
-        """Store classified articles in the database."""
+    def store_articles(self, articles: Iterable[Dict]) -> Dict:
+        """Store classified articles in the database, STORE_BATCH_SIZE at a time."""
         try:
-            if not articles:
+            # Any iterable works; only one chunk is held in memory at a time
+            remaining = iter(articles)
+            chunk = list(islice(remaining, STORE_BATCH_SIZE))
+            if not chunk:
                 return {
                     'stored_count': 0,
                     'success': True,
@@ -142,7 +325,10 @@ class MedicalArticlesService:
                 }
             
             # Store articles in database
-            stored_count = batch_insert_articles(articles)
+            stored_count = 0
+            while chunk:
+                stored_count += batch_insert_articles(chunk)
+                chunk = list(islice(remaining, STORE_BATCH_SIZE))
             
             logger.info(f"Successfully stored {stored_count} articles in database")
             
@@ -164,13 +350,19 @@ class MedicalArticlesService:
         try:
             logger.info("Starting weekly article processing workflow")
             
-            # Step 1: Collect articles
-            collection_result = self.collect_weekly_articles(email)
-            if not collection_result['success']:
-                return collection_result
+            start_date_str, end_date_str = _last_week_range()
+            logger.info(f"Processing weekly articles from {start_date_str} to {end_date_str}")
             
-            articles = collection_result['articles']
-            if not articles:
+            # Collect, classify and store batch by batch through the date-range pipeline
+            pipeline_result = asyncio.run(
+                self._apipeline_date_range(start_date_str, end_date_str, email, model_provider)
+            )
+            
+            # The export window slides even when nothing new arrived, so rebuild the roll-up every run
+            with ArticleDatabase() as db:
+                db.refresh_weekly_relevant_articles()
+            
+            if not pipeline_result['articles_collected']:
                 return {
                     'success': True,
                     'message': 'No new articles found for the week',
@@ -179,26 +371,14 @@ class MedicalArticlesService:
                     'articles_stored': 0
                 }
             
-            # Step 2: Classify articles
-            classification_result = self.classify_articles(articles, model_provider)
-            if not classification_result['success']:
-                return classification_result
-            
-            classified_articles = classification_result['classified_articles']
-            
-            # Step 3: Store articles
-            storage_result = self.store_articles(classified_articles)
-            if not storage_result['success']:
-                return storage_result
-            
             logger.info("✅ Weekly article processing completed successfully")
             
             return {
                 'success': True,
-                'articles_collected': len(articles),
-                'articles_classified': len(classified_articles),
-                'articles_stored': storage_result['stored_count'],
-                'filtering_stats': collection_result['filtering_stats']
+                'articles_collected': pipeline_result['articles_collected'],
+                'articles_classified': pipeline_result['articles_classified'],
+                'articles_stored': pipeline_result['stored_count'],
+                'filtering_stats': pipeline_result['filtering_stats']
             }
             
         except Exception as e:
@@ -208,22 +388,95 @@ class MedicalArticlesService:
                 'error': str(e)
             }
     
+    async def _apipeline_date_range(self, start_date: str, end_date: str, email: str = None,
+                                    model_provider: str = "claude",
+                                    concurrency: int = CLASSIFY_CONCURRENCY) -> Dict:
+        """Fetch, classify and store a date range as overlapping stages joined by queues."""
+        classify_articles_batch_async = _load_classifier().classify_articles_batch_async
+        
+        client = PubMedClient(email=email)
+        pmids = await asyncio.to_thread(client.search_articles_custom_date, JOURNAL_NAMES, start_date, end_date)
+        pmids = await asyncio.to_thread(_unstored_pmids, pmids)
+        
+        # Only counts and running statistics outlive each batch, and the bounded fetch queue and
+        # EFetch window limit how far fetching runs ahead, so memory stays flat over long ranges
+        collected = 0
+        stats = _ArticleStats()
+        stored_count = 0
+        # Bounded so fetching can't run far ahead of classification; the store queue is
+        # unbounded so a failing writer can never leave the classifier blocked on put()
+        fetch_queue = asyncio.Queue(maxsize=4)
+        store_queue = asyncio.Queue()
+        
+        async def fetch_stage():
+            batches = client.aiter_article_details(pmids)
+            try:
+                async for batch in batches:
+                    await fetch_queue.put(batch)
+            finally:
+                await batches.aclose()
+            # Not in the finally: a cancelled stage would block on the full queue with no consumer left
+            await fetch_queue.put(None)
+        
+        async def classify_stage():
+            nonlocal collected
+            try:
+                while (batch := await fetch_queue.get()) is not None:
+                    collected += len(batch)
+                    if batch:
+                        classified = await classify_articles_batch_async(
+                            batch, model_provider=model_provider, concurrency=concurrency
+                        )
+                        stats.add(classified)
+                        store_queue.put_nowait(classified)
+            finally:
+                store_queue.put_nowait(None)
+        
+        async def store_stage():
+            nonlocal stored_count
+            pending = []
+            while (classified := await store_queue.get()) is not None:
+                pending.extend(classified)
+                if len(pending) >= STORE_BATCH_SIZE:
+                    stored_count += await asyncio.to_thread(batch_insert_articles, pending)
+                    pending = []
+            if pending:
+                stored_count += await asyncio.to_thread(batch_insert_articles, pending)
+        
+        if pmids:
+            stages = [asyncio.ensure_future(stage()) for stage in (fetch_stage, classify_stage, store_stage)]
+            try:
+                await asyncio.gather(*stages)
+            except BaseException:
+                # The stages still running would otherwise wait forever on their queues
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+                raise
+        else:
+            logger.warning(f"No new articles found for date range {start_date} to {end_date}")
+        
+        return {
+            'articles_collected': collected,
+            'articles_classified': stats.count,
+            'stored_count': stored_count,
+            'statistics': stats.as_dict(),
+            'filtering_stats': client.get_filtering_stats()
+        }
+    
     def process_articles_by_date_range(self, start_date: str, end_date: str, 
                                      email: str = None, model_provider: str = "claude") -> Dict:
         """Complete processing workflow for a specific date range."""
         try:
-            from datetime import datetime
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             
             logger.info(f"Starting article processing for date range {start_date} to {end_date}")
             
-            # Step 1: Collect articles
-            collection_result = self.collect_articles_by_date_range(start_date, end_date, email)
-            if not collection_result['success']:
-                return collection_result
+            # Collect, classify and store as a pipeline: classification starts with the
+            # first EFetch batch and storage with the first classified batch
+            pipeline_result = asyncio.run(self._apipeline_date_range(start_date, end_date, email, model_provider))
             
-            articles = collection_result['articles']
-            if not articles:
+            if not pipeline_result['articles_collected']:
                 return {
                     'success': True,
                     'message': f'No new articles found for date range {start_date} to {end_date}',
@@ -233,34 +486,19 @@ class MedicalArticlesService:
                     'processing_time_seconds': 0
                 }
             
-            # Step 2: Classify articles
-            classification_result = self.classify_articles(articles, model_provider)
-            if not classification_result['success']:
-                return classification_result
-            
-            classified_articles = classification_result['classified_articles']
-            
-            # Calculate statistics from classified articles
-            stats = self._calculate_article_statistics(classified_articles)
-            
-            # Step 3: Store articles
-            storage_result = self.store_articles(classified_articles)
-            if not storage_result['success']:
-                return storage_result
-            
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             
+            logger.info(f"Successfully stored {pipeline_result['stored_count']} articles in database")
             logger.info("✅ Date range article processing completed successfully")
             
             return {
                 'success': True,
-                'articles_collected': len(articles),
-                'articles_classified': len(classified_articles),
-                'articles_stored': storage_result['stored_count'],
-                'filtering_stats': collection_result['filtering_stats'],
+                'articles_collected': pipeline_result['articles_collected'],
+                'articles_classified': pipeline_result['articles_classified'],
+                'articles_stored': pipeline_result['stored_count'],
+                'filtering_stats': pipeline_result['filtering_stats'],
                 'processing_time_seconds': processing_time,
-                'statistics': stats
+                'statistics': pipeline_result['statistics']
             }
             
         except Exception as e:
@@ -273,10 +511,6 @@ class MedicalArticlesService:
     def process_articles_from_last_update(self, email: str = None, model_provider: str = "claude") -> Dict:
         """Process articles from the last created_at timestamp to today."""
         try:
-            from datetime import datetime, timedelta
-            from .database.operations import ArticleDatabase
-            from .database.schema import get_connection
-            
             logger.info("Starting article processing from last update (created_at)")
             
             # Get the latest created_at timestamp from the database
@@ -297,16 +531,11 @@ class MedicalArticlesService:
                     # SQLite timestamps can be in format: 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DDTHH:MM:SS'
                     latest_created_at_str = latest_created_at_str.replace('T', ' ')
                     
-                    # Try parsing with microseconds
+                    # fromisoformat covers both, with or without microseconds; fall back to the date part
                     try:
-                        latest_timestamp = datetime.strptime(latest_created_at_str, '%Y-%m-%d %H:%M:%S.%f')
+                        latest_timestamp = datetime.fromisoformat(latest_created_at_str)
                     except ValueError:
-                        # Try without microseconds
-                        try:
-                            latest_timestamp = datetime.strptime(latest_created_at_str, '%Y-%m-%d %H:%M:%S')
-                        except ValueError:
-                            # Try just date format
-                            latest_timestamp = datetime.strptime(latest_created_at_str.split()[0], '%Y-%m-%d')
+                        latest_timestamp = datetime.fromisoformat(latest_created_at_str.split()[0])
                     
                     # Extract the date from the timestamp and add one day to avoid duplicates
                     latest_date = latest_timestamp.date()
@@ -347,36 +576,51 @@ class MedicalArticlesService:
         """Process a single article by PMID or URL."""
         try:
             # Extract PMID
-            pmid = pmid_or_url.strip()
-            if "pubmed.ncbi.nlm.nih.gov" in pmid:
-                 # Simple extraction: split by / and find the number
-                 # e.g. https://pubmed.ncbi.nlm.nih.gov/12345678/ or https://pubmed.ncbi.nlm.nih.gov/12345678
-                 parts = pmid.split('/')
-                 for part in parts:
-                     if part.isdigit():
-                         pmid = part
-                         break
-            
-            if not pmid.isdigit():
+            # e.g. 12345678, https://pubmed.ncbi.nlm.nih.gov/12345678/ or https://pubmed.ncbi.nlm.nih.gov/12345678
+            match = _PMID_RE.fullmatch(pmid_or_url.strip())
+            if not match:
                  return {'success': False, 'error': 'Invalid PubMed ID or URL'}
-
-            # Fetch details
-            client = PubMedClient(email=email)
-            articles = client.fetch_article_details([pmid])
+            pmid = match.group(1)
+        except Exception as e:
+            logger.error(f"Error processing single article: {e}")
+            return {'success': False, 'error': str(e)}
+        
+        # Concurrent requests for the same article wait for the first one instead of
+        # paying for another fetch and LLM call
+        key = (pmid, model_provider)
+        with _INFLIGHT_LOCK:
+            future = _inflight_single.get(key)
+            owner = future is None
+            if owner:
+                future = _inflight_single[key] = Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            result = self._process_single_pmid(pmid, email, model_provider)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _INFLIGHT_LOCK:
+                del _inflight_single[key]
+    
+    def _process_single_pmid(self, pmid: str, email: str = None, model_provider: str = "claude") -> Dict:
+        """Fetch, classify (forced relevant) and store one PMID."""
+        try:
+            # Fetch details, sharing an EFetch call with other requests arriving in the same window
+            article = _single_fetches.fetch(pmid, email)
             
-            if not articles:
+            if not article:
                 return {'success': False, 'error': 'Article not found on PubMed'}
             
-            article = articles[0]
-            
-            # Classify (force relevant)
-            # Initialize classifier if needed
-            from .classification.classifier import MedicalArticleClassifier
-            if not self.classifier or self.classifier.model_provider != model_provider:
-                self.classifier = MedicalArticleClassifier(model_provider=model_provider)
+            # Classify (force relevant) with the provider's shared classifier
+            classifier = _load_classifier().get_classifier(model_provider)
             
             # Use force_relevant=True to skip filtering
-            result = self.classifier.classify_article_enhanced(article, force_relevant=True)
+            result = classifier.classify_article_enhanced(article, force_relevant=True)
             
             article.update(result)
             
@@ -395,57 +639,23 @@ class MedicalArticlesService:
             logger.error(f"Error processing single article: {e}")
             return {'success': False, 'error': str(e)}
 
-    def _calculate_article_statistics(self, classified_articles: List[Dict]) -> Dict:
-        """Calculate statistics from classified articles."""
-        if not classified_articles:
-            return {
-                'avg_ranking_score': 0,
-                'articles_score_8_plus': 0,
-                'category_breakdown': {},
-                'top_articles': []
-            }
-        
-        # Calculate average ranking score and count high-scoring articles
-        scores = []
-        articles_score_8_plus = 0
-        category_breakdown = {}
-        
-        for article in classified_articles:
-            ranking_score = article.get('ranking_score', 0)
-            if ranking_score is not None and ranking_score > 0:
-                scores.append(float(ranking_score))
-                if ranking_score >= 8:
-                    articles_score_8_plus += 1
-            
-            # Category breakdown
-            category = article.get('medical_category', 'Uncategorized')
-            category_breakdown[category] = category_breakdown.get(category, 0) + 1
-        
-        avg_score = sum(scores) / len(scores) if scores else 0
-        
-        # Get top 5 articles by ranking score (only articles with score > 0)
-        top_articles = sorted(
-            [a for a in classified_articles if a.get('ranking_score') is not None and a.get('ranking_score', 0) > 0],
-            key=lambda x: x.get('ranking_score', 0),
-            reverse=True
-        )[:5]
-        
-        # Format top articles for email (title and score only)
-        top_articles_formatted = [
-            {
-                'title': article.get('title', 'Untitled')[:80] + ('...' if len(article.get('title', '')) > 80 else ''),
-                'score': article.get('ranking_score', 0),
-                'journal': article.get('journal', 'Unknown')
-            }
-            for article in top_articles
-        ]
-        
-        return {
-            'avg_ranking_score': round(avg_score, 2),
-            'articles_score_8_plus': articles_score_8_plus,
-            'category_breakdown': category_breakdown,
-            'top_articles': top_articles_formatted
-        }
+_service = None
+_SERVICE_LOCK = threading.Lock()
+
+def get_medical_articles_service() -> MedicalArticlesService:
+    """The process-wide service, constructed on first use."""
+    global _service
+    if _service is None:
+        with _SERVICE_LOCK:
+            if _service is None:
+                _service = MedicalArticlesService()
+    return _service
+
+class _LazyService:
+    """Stand-in for the service singleton that builds it on first attribute access."""
+    
+    def __getattr__(self, name):
+        return getattr(get_medical_articles_service(), name)
 
-# Global service instance
-medical_articles_service = MedicalArticlesService()
+# Global service instance; importing this module no longer constructs anything
+medical_articles_service = _LazyService()
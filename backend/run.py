@@ -5,16 +5,18 @@ Development server runner for the medical dashboard backend
 
 import os
 import sys
-from app import app, db
 
 def create_tables():
     """Create database tables"""
+    # Imported here so importing this module doesn't build the Flask app
+    from app import app, db
     with app.app_context():
         db.create_all()
         print("Database tables created successfully")
 
 def run_server():
     """Run the Flask development server"""
+    from app import app
     port = int(os.environ.get('PORT', 5001))  # Changed from 5000 to 5001
     debug = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     
@@ -24,10 +24,19 @@ if BACKEND_DIR not in sys.path:
 
 from medical_processing.database.schema import get_connection
 
+# Ids of the articles a cutoff date selects, for deleting their enhanced_classifications
+_ARTICLE_IDS_SINCE = "SELECT id FROM articles WHERE publication_date >= ?"
 
-def get_articles_by_date(cutoff_date: str) -> List[Dict]:
-    """Get all articles published on or after the cutoff date."""
+# One delete batch of those ids; each batch commits before the next starts
+_DELETE_BATCH = 10000
+_ARTICLE_BATCH_SINCE = _ARTICLE_IDS_SINCE + " ORDER BY id LIMIT ?"
+
+
+def get_articles_preview(cutoff_date: str, limit: int = 10) -> List[sqlite3.Row]:
+    """Get the most recent `limit` articles published on or after the cutoff date."""
     conn = get_connection()
+    # Rows are read by column name without building a dict per article
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -35,15 +44,22 @@ def get_articles_by_date(cutoff_date: str) -> List[Dict]:
             FROM articles
             WHERE publication_date >= ?
             ORDER BY publication_date DESC
-        """, (cutoff_date,))
-        
-        columns = [desc[0] for desc in cursor.description]
-        articles = []
-        for row in cursor.fetchall():
-            article = dict(zip(columns, row))
-            articles.append(article)
+            LIMIT ?
+        """, (cutoff_date, limit))
         
-        return articles
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def get_articles_count(cutoff_date: str) -> int:
+    """Count the articles published on or after the cutoff date."""
+    conn = get_connection()
+    try:
+        cursor = conn.execute(
+            "SELECT COUNT(*) FROM articles WHERE publication_date >= ?", (cutoff_date,)
+        )
+        return cursor.fetchone()[0]
     finally:
         conn.close()
 
@@ -63,55 +79,75 @@ def delete_articles_by_date(cutoff_date: str, dry_run: bool = False) -> Dict:
     cursor = conn.cursor()
     
     try:
-        # First, get the article IDs that will be deleted
-        cursor.execute("""
-            SELECT id FROM articles
-            WHERE publication_date >= ?
-        """, (cutoff_date,))
-        
-        article_ids = [row[0] for row in cursor.fetchall()]
-        
-        if not article_ids:
-            return {
-                'articles_deleted': 0,
-                'classifications_deleted': 0,
-                'message': f'No articles found with publication_date >= {cutoff_date}'
-            }
-        
-        # Count enhanced_classifications that will be deleted
-        placeholders = ','.join('?' for _ in article_ids)
-        cursor.execute(f"""
-            SELECT COUNT(*) FROM enhanced_classifications
-            WHERE article_id IN ({placeholders})
-        """, article_ids)
-        classifications_count = cursor.fetchone()[0]
+        no_articles = {
+            'articles_deleted': 0,
+            'classifications_deleted': 0,
+            'message': f'No articles found with publication_date >= {cutoff_date}'
+        }
         
+        # Everything is keyed off the date predicate, so no per-article parameters are bound
         if dry_run:
+            cursor.execute("""
+                SELECT COUNT(*) FROM articles
+                WHERE publication_date >= ?
+            """, (cutoff_date,))
+            articles_count = cursor.fetchone()[0]
+            if not articles_count:
+                return no_articles
+            
+            # Count enhanced_classifications that will be deleted
+            cursor.execute(f"""
+                SELECT COUNT(*) FROM enhanced_classifications
+                WHERE article_id IN ({_ARTICLE_IDS_SINCE})
+            """, (cutoff_date,))
+            classifications_count = cursor.fetchone()[0]
+            
             return {
-                'articles_to_delete': len(article_ids),
+                'articles_to_delete': articles_count,
                 'classifications_to_delete': classifications_count,
-                'message': f'DRY RUN: Would delete {len(article_ids)} articles and {classifications_count} classifications'
+                'message': f'DRY RUN: Would delete {articles_count} articles and {classifications_count} classifications'
             }
         
-        # Delete enhanced_classifications first (foreign key constraint)
-        if classifications_count > 0:
+        # Delete in batches, each its own short BEGIN IMMEDIATE transaction, so a huge cutoff
+        # never holds the write lock for the whole run and the WAL can checkpoint in between.
+        # rowcount gives the counts, so nothing is pre-counted
+        classifications_deleted = articles_deleted = 0
+        while True:
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            # Delete enhanced_classifications first (foreign key constraint without ON DELETE CASCADE)
             cursor.execute(f"""
                 DELETE FROM enhanced_classifications
-                WHERE article_id IN ({placeholders})
-            """, article_ids)
-            classifications_deleted = cursor.rowcount
-        else:
-            classifications_deleted = 0
+                WHERE article_id IN ({_ARTICLE_BATCH_SINCE})
+            """, (cutoff_date, _DELETE_BATCH))
+            classifications_deleted += cursor.rowcount
+            
+            # Delete the same batch of articles; ORDER BY id keeps both subqueries on the same ids
+            cursor.execute(f"""
+                DELETE FROM articles
+                WHERE id IN ({_ARTICLE_BATCH_SINCE})
+            """, (cutoff_date, _DELETE_BATCH))
+            batch_deleted = cursor.rowcount
+            conn.commit()
+            
+            if not batch_deleted:
+                break
+            articles_deleted += batch_deleted
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
         
-        # Delete articles
-        cursor.execute("""
-            DELETE FROM articles
-            WHERE publication_date >= ?
-        """, (cutoff_date,))
-        articles_deleted = cursor.rowcount
+        if not articles_deleted:
+            return no_articles
         
+        # Deletes leave no updated_at behind, so retire the weekly export snapshot explicitly
+        conn.execute("DROP TABLE IF EXISTS weekly_relevant_articles_meta")
         conn.commit()
         
+        # A bulk delete can shift row counts enough to change query plans
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        
         return {
             'articles_deleted': articles_deleted,
             'classifications_deleted': classifications_deleted,
@@ -122,6 +158,9 @@ def delete_articles_by_date(cutoff_date: str, dry_run: bool = False) -> Dict:
         conn.rollback()
         raise Exception(f"Database error: {e}")
     finally:
+        # An interrupted batch (e.g. KeyboardInterrupt) can leave its transaction open
+        if conn.in_transaction:
+            conn.rollback()
         conn.close()
 
 
@@ -151,22 +190,22 @@ def main():
     # Show preview of articles to be deleted
     print("Preview of articles to be deleted:")
     print("-" * 60)
-    articles = get_articles_by_date(cutoff_date)
+    total = get_articles_count(cutoff_date)
     
-    if not articles:
+    if not total:
         print("No articles found with publication_date >= " + cutoff_date)
         sys.exit(0)
     
-    for i, article in enumerate(articles[:10], 1):  # Show first 10
-        print(f"{i}. PMID: {article.get('pmid', 'N/A')} | "
-              f"Date: {article.get('publication_date', 'N/A')} | "
-              f"Journal: {article.get('journal', 'N/A')[:30]}")
-        print(f"   Title: {article.get('title', 'N/A')[:70]}...")
+    for i, article in enumerate(get_articles_preview(cutoff_date), 1):
+        print(f"{i}. PMID: {article['pmid'] or 'N/A'} | "
+              f"Date: {article['publication_date'] or 'N/A'} | "
+              f"Journal: {(article['journal'] or 'N/A')[:30]}")
+        print(f"   Title: {(article['title'] or 'N/A')[:70]}...")
     
-    if len(articles) > 10:
-        print(f"\n... and {len(articles) - 10} more articles")
+    if total > 10:
+        print(f"\n... and {total - 10} more articles")
     
-    print(f"\nTotal articles to delete: {len(articles)}")
+    print(f"\nTotal articles to delete: {total}")
     
     if dry_run:
         result = delete_articles_by_date(cutoff_date, dry_run=True)
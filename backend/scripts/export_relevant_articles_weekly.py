@@ -8,13 +8,23 @@ import os
 import sqlite3
 import csv
 from datetime import datetime, timedelta
-import json
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from medical_processing.database.operations import select_weekly_relevant
+from medical_processing.database.schema import get_connection
+
+# Large write buffer so long exports reach the disk in few, big writes
+_WRITE_BUFFER = 1 << 20
+
 def get_database_path():
     """Get the path to the medical articles database."""
+    # Same override the app uses for its persistent disk; skips discovery entirely
+    persistent_data_path = os.getenv('PERSISTENT_DATA_PATH')
+    if persistent_data_path:
+        return os.path.abspath(os.path.join(persistent_data_path, 'medical_articles.db'))
+    
     # Try to find the database in the backend directory
     backend_dir = os.path.dirname(os.path.dirname(__file__))
     db_path = os.path.join(backend_dir, 'medical_articles.db')
@@ -27,10 +37,13 @@ def get_database_path():
     
     return db_path
 
-def get_relevant_articles_from_last_week():
-    """Get all relevant articles published in the last 14 days (2 weeks)."""
+def export_relevant_articles_from_last_week():
+    """Stream relevant articles published in the last 14 days (2 weeks) straight into a CSV file.
+    
+    Returns (filename, article count): (None, 0) when nothing matched, (None, None) on error.
+    """
     db_path = get_database_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     try:
@@ -44,146 +57,63 @@ def get_relevant_articles_from_last_week():
         
         print(f"📅 Fetching relevant articles from {start_date_str} to {end_date_str} (last 2 weeks)")
         
-        # Query for relevant articles from the last 2 weeks
-        # Join articles with enhanced_classifications to get is_relevant flag
-        query = """
-            SELECT 
-                a.pmid,
-                a.title,
-                a.abstract,
-                a.journal,
-                a.authors,
-                a.publication_date,
-                a.doi,
-                a.url,
-                a.medical_category,
-                a.article_type,
-                a.keywords,
-                a.mesh_terms,
-                a.publication_type,
-                ec.ranking_score,
-                ec.clinical_bottom_line,
-                ec.tags,
-                ec.participants,
-                ec.reason,
-                ec.focus_points,
-                ec.type_points,
-                ec.prevalence_points,
-                ec.hospitalization_points,
-                ec.clinical_outcome_points,
-                ec.impact_factor_points,
-                ec.temporality_points,
-                ec.neurology_penalty_points,
-                ec.prevention_penalty_points,
-                ec.biologic_penalty_points,
-                ec.screening_penalty_points,
-                ec.scores_penalty_points,
-                ec.subanalysis_penalty_points
-            FROM articles a
-            JOIN enhanced_classifications ec ON a.id = ec.article_id
-            WHERE ec.is_relevant = 1
-            AND a.publication_date >= ?
-            AND a.publication_date <= ?
-            ORDER BY ec.ranking_score DESC, a.publication_date DESC
-        """
+        # The pre-joined snapshot process_weekly_articles builds when it covers this exact window and
+        # is newer than the last write; otherwise the same query runs live
+        select_weekly_relevant(cursor, start_date_str, end_date_str)
         
-        cursor.execute(query, (start_date_str, end_date_str))
-        rows = cursor.fetchall()
+        # Only create the file once there is something to put in it
+        first_row = cursor.fetchone()
+        if first_row is None:
+            print("⚠️  No articles to export")
+            return None, 0
         
-        # Get column names
         columns = [description[0] for description in cursor.description]
         
-        # Convert rows to dictionaries
-        articles = []
-        for row in rows:
-            article = dict(zip(columns, row))
-            # Parse tags JSON if it exists
-            if article.get('tags'):
-                try:
-                    article['tags'] = json.loads(article['tags'])
-                except (json.JSONDecodeError, TypeError):
-                    article['tags'] = []
-            else:
-                article['tags'] = []
-            articles.append(article)
+        # Create filename with date range
+        filename = f"relevant_articles_{start_date_str}_to_{end_date_str}.csv"
         
-        print(f"✅ Found {len(articles)} relevant articles from the last 2 weeks")
+        # Rows go from the cursor to the file one at a time; memory stays flat however many match.
+        # csv.writer already writes None as '', so rows go out exactly as SQLite returns them.
+        count = 1
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(columns)
+            writer.writerow(first_row)
+            for row in cursor:
+                writer.writerow(row)
+                count += 1
         
-        return articles, start_date_str, end_date_str
+        print(f"✅ Exported {count} articles to {filename}")
+        print(f"📁 File location: {os.path.abspath(filename)}")
+        return filename, count
         
     except sqlite3.Error as e:
         print(f"❌ Error querying database: {e}")
-        return [], None, None
+        return None, None
+    except OSError as e:
+        print(f"❌ Error writing CSV file: {e}")
+        return None, None
     finally:
         conn.close()
 
-def export_to_csv(articles, start_date, end_date):
-    """Export articles to CSV file."""
-    if not articles:
-        print("⚠️  No articles to export")
-        return None
-    
-    # Create filename with date range
-    filename = f"relevant_articles_{start_date}_to_{end_date}.csv"
-    
-    # Flatten the data for CSV export
-    # Handle tags as comma-separated string
-    flattened_articles = []
-    for article in articles:
-        flat_article = article.copy()
-        # Convert tags list to comma-separated string
-        if isinstance(flat_article.get('tags'), list):
-            flat_article['tags'] = ', '.join(flat_article['tags'])
-        elif flat_article.get('tags') is None:
-            flat_article['tags'] = ''
-        
-        # Ensure all fields are strings (handle None values)
-        for key, value in flat_article.items():
-            if value is None:
-                flat_article[key] = ''
-            elif not isinstance(value, str):
-                flat_article[key] = str(value)
-        
-        flattened_articles.append(flat_article)
-    
-    # Write to CSV
-    try:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            if flattened_articles:
-                fieldnames = list(flattened_articles[0].keys())
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(flattened_articles)
-        
-        print(f"✅ Exported {len(articles)} articles to {filename}")
-        print(f"📁 File location: {os.path.abspath(filename)}")
-        return filename
-        
-    except Exception as e:
-        print(f"❌ Error writing CSV file: {e}")
-        return None
-
 def main():
     """Main function."""
     print("="*60)
     print("EXPORT RELEVANT ARTICLES FROM LAST 2 WEEKS")
     print("="*60)
     
-    # Get relevant articles
-    articles, start_date, end_date = get_relevant_articles_from_last_week()
+    # Query and export in one pass
+    filename, count = export_relevant_articles_from_last_week()
     
-    if not articles:
+    if count == 0:
         print("⚠️  No relevant articles found from the last 2 weeks")
         return
     
-    # Export to CSV
-    filename = export_to_csv(articles, start_date, end_date)
-    
     if filename:
         print("\n" + "="*60)
         print(f"✅ Export completed successfully!")
         print(f"📄 File: {filename}")
-        print(f"📊 Articles: {len(articles)}")
+        print(f"📊 Articles: {count}")
         print("="*60)
     else:
         print("\n❌ Export failed")
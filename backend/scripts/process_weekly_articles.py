@@ -20,6 +20,12 @@ try:
 except Exception:
     pass
 
+# Page cache for this one-shot job (KiB, negative per SQLite convention): 256 MB. Every pooled
+# connection picks it up when opened, so it has to be set before medical_processing is imported;
+# a value from the environment or .env wins
+WEEKLY_CACHE_SIZE = -262144
+os.environ.setdefault("SQLITE_CACHE_SIZE", str(WEEKLY_CACHE_SIZE))
+
 from medical_processing.service import medical_articles_service  # type: ignore
 
 
@@ -3,230 +3,408 @@
 
 import sys
 import os
+import copy
+import hashlib
+import heapq
+import queue
 import sqlite3
-import time
 import logging
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add the medical_processing module to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from medical_processing.classification.classifier import MedicalArticleClassifier
-from medical_processing.database.operations import ArticleDatabase, get_connection
+from medical_processing.classification import cache as classification_cache
+from medical_processing.classification.classifier import _is_cacheable, get_classifier, prefilter_hits
+from medical_processing.database.operations import BREAKDOWN_FIELDS, ArticleDatabase
+from medical_processing.database.schema import get_connection, get_read_connection
 from medical_processing.config import DATABASE_PATH
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_relevant_articles_with_data():
-    """Get all relevant articles with their full data."""
-    db_path = os.path.join(os.path.dirname(__file__), 'medical_articles.db')
-    conn = sqlite3.connect(db_path)
+# Articles classified concurrently; keep within the account's requests-per-minute budget
+RECLASSIFY_WORKERS = 8
+
+# Classification updates per write transaction; a failed chunk is rolled back as a whole
+UPDATE_CHUNK = 500
+
+# Above this many updates, write everything in one transaction with the classification
+# indexes dropped and rebuilt once, rather than maintaining them row by row
+DEFER_INDEX_THRESHOLD = 2000
+
+# SDK-level retries for rate-limited (429) requests during the bulk run
+RATE_LIMIT_RETRIES = 5
+
+# Rows fetched from SQLite per round trip; also the unit of cache lookup and classification work
+FETCH_CHUNK = 256
+
+# Classified chunks waiting for the background writer before the classifier blocks
+WRITE_QUEUE_CHUNKS = 4
+
+_SQL_RELEVANT_FILTER = """
+    FROM articles a
+    JOIN enhanced_classifications ec ON a.id = ec.article_id
+    WHERE ec.is_relevant = 1
+"""
+
+def count_relevant_articles():
+    """Return (number of relevant articles, their average abstract length)."""
+    conn = get_connection()
+    try:
+        cursor = conn.execute(
+            "SELECT COUNT(*), COALESCE(AVG(LENGTH(COALESCE(a.abstract, ''))), 0)" + _SQL_RELEVANT_FILTER
+        )
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+def iter_relevant_articles_with_data():
+    """Stream all relevant articles as sqlite3.Row objects with the fields reclassification needs."""
+    # Same database (and session PRAGMAs) ArticleDatabase writes the new classifications to
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
     try:
-        # Get all relevant articles with their article data
+        # Only the columns the classifier reads, plus the ID and current score; ordering by
+        # ec.article_id (equal to a.id) follows idx_ec_rel_aid, so rows stream without a temp sort
         query = """
             SELECT 
                 a.id,
                 a.pmid,
                 a.title,
-                a.abstract,
-                a.journal,
-                a.authors,
-                a.publication_date,
-                a.doi,
-                a.url,
-                a.medical_category,
-                a.article_type,
-                a.keywords,
-                a.mesh_terms,
-                a.publication_type,
-                ec.ranking_score as current_ranking_score,
-                ec.clinical_bottom_line as current_clinical_bottom_line
-            FROM articles a
-            JOIN enhanced_classifications ec ON a.id = ec.article_id
-            WHERE ec.is_relevant = 1
-            ORDER BY a.id
+                COALESCE(a.abstract, '') as abstract,
+                COALESCE(a.journal, '') as journal,
+                COALESCE(a.mesh_terms, '') as mesh_terms,
+                COALESCE(a.publication_type, '') as publication_type,
+                ec.ranking_score as current_ranking_score
+        """ + _SQL_RELEVANT_FILTER + """
+            ORDER BY ec.article_id
         """
         
+        cursor.arraysize = FETCH_CHUNK
         cursor.execute(query)
-        rows = cursor.fetchall()
-        
-        articles = []
-        for row in rows:
-            article = {
-                'id': row[0],
-                'pmid': row[1],
-                'title': row[2],
-                'abstract': row[3] or '',
-                'journal': row[4] or '',
-                'authors': row[5] or '',
-                'publication_date': row[6],
-                'doi': row[7] or '',
-                'url': row[8] or '',
-                'medical_category': row[9],
-                'article_type': row[10] or '',
-                'keywords': row[11] or '',
-                'mesh_terms': row[12] or '',
-                'publication_type': row[13] or '',
-                'current_ranking_score': row[14],
-                'current_clinical_bottom_line': row[15]
-            }
-            articles.append(article)
-        
-        return articles
+        while rows := cursor.fetchmany(FETCH_CHUNK):
+            yield from rows
         
     finally:
         conn.close()
 
-def reclassify_articles(articles, model_provider="claude"):
-    """Reclassify articles using Claude Sonnet 4.5."""
-    classifier = MedicalArticleClassifier(model_provider=model_provider)
+def _classification_input(article):
+    """The fields the classifier reads, which are also what the classification cache keys on."""
+    return {
+        'pmid': article['pmid'],
+        'title': article['title'],
+        'abstract': article['abstract'],
+        'journal': article['journal'],
+        'mesh_terms': article['mesh_terms'],
+        'publication_type': article['publication_type']
+    }
+
+def _payload_key(article_data):
+    """Digest of everything the classifier reads except the PMID; equal digests get the same classification."""
+    payload = '\x1f'.join(str(article_data[field] or '')
+                          for field in ('title', 'abstract', 'journal', 'mesh_terms', 'publication_type'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+def _reclassify_one(classifier, article_data):
+    """Run the two-step classification for one article."""
+    # Classify using inclusion-based method (same as regular classification)
+    result = classifier.classify_article_enhanced(article_data)
+    if not _is_cacheable(result):
+        # The classifier swallows API errors and returns defaults; never write those over a real score
+        raise RuntimeError(result.get('reason') or 'Classification failed')
+    return result
+
+def _tag_result(result, article):
+    """A classification result tagged with its article's ID, PMID and the score it replaces."""
+    return dict(result, article_id=article['id'], pmid=article['pmid'],
+                previous_ranking_score=article['current_ranking_score'])
+
+def reclassify_articles(articles, model_provider="claude", max_workers=RECLASSIFY_WORKERS, use_cache=True, total=None,
+                        on_chunk=None):
+    """Reclassify articles using Claude Sonnet 4.5, up to max_workers at a time.
+    
+    articles may be any iterable (e.g. iter_relevant_articles_with_data()); it is consumed
+    FETCH_CHUNK articles at a time so only one chunk of abstracts is held in memory.
+    Articles whose title and abstract were already classified with the current prompt version
+    come from the classification cache unless use_cache is False; fresh results are always cached.
+    Articles with identical classifier input are classified once per run and share the result.
+    Each chunk's results are also passed to on_chunk, if given, as soon as the chunk is done.
+    """
+    classifier = get_classifier(model_provider)
+    if model_provider == "claude":
+        # 429s back off inside the SDK (exponential, honours retry-after) instead of failing the article.
+        # Set on a copy so the process-wide classifier keeps its defaults; with_options shares the HTTP pool
+        classifier = copy.copy(classifier)
+        classifier.client = classifier.client.with_options(max_retries=RATE_LIMIT_RETRIES)
     
     reclassified = []
     errors = []
+    cached_count = 0
+    duplicate_count = 0
+    done = 0
+    progress_total = f"/{total}" if total else ""
+    articles = iter(articles)
+    # Payload digest -> result for everything classified this run (16 bytes per key, not the abstract)
+    classified_payloads = {}
     
-    for i, article in enumerate(articles):
-        try:
-            logger.info(f"Reclassifying article {i+1}/{len(articles)}: PMID {article['pmid']}")
-            logger.info(f"  Title: {article['title'][:80]}...")
-            logger.info(f"  Current ranking score: {article.get('current_ranking_score', 'N/A')}")
-            logger.info(f"  Abstract length: {len(article['abstract'])} characters")
-            
-            # Prepare article data for classification
-            article_data = {
-                'pmid': article['pmid'],
-                'title': article['title'],
-                'abstract': article['abstract'],
-                'journal': article['journal'],
-                'mesh_terms': article['mesh_terms'],
-                'publication_type': article['publication_type']
-            }
-            
-            # Classify using inclusion-based method (same as regular classification)
-            result = classifier.classify_article_enhanced_inclusion_based(article_data)
-            
-            # Add article ID for database update
-            result['article_id'] = article['id']
-            result['pmid'] = article['pmid']
+    # Each article is two sequential API calls (filtering + classification); the wall time is
+    # network round trips, so the SDK client (thread-safe) is shared across worker threads
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while chunk := list(islice(articles, FETCH_CHUNK)):
+            inputs = [_classification_input(article) for article in chunk]
+            if use_cache:
+                results = classification_cache.lookup(inputs, model_provider)
+            else:
+                results = [None] * len(chunk)
+            misses = [i for i, result in enumerate(results) if result is None]
+            cached_count += len(chunk) - len(misses)
+            done += len(chunk) - len(misses)
+            fresh_results = []
             
-            # Log changes
-            old_score = article.get('current_ranking_score', 'N/A')
-            new_score = result.get('ranking_score', 'N/A')
-            logger.info(f"  ✅ Reclassified - Old score: {old_score}, New score: {new_score}")
+            # One API run per distinct payload; duplicates (e.g. the same paper under two IDs)
+            # take the representative's result
+            pending = {}
+            for i in misses:
+                payload_key = _payload_key(inputs[i])
+                if payload_key in classified_payloads:
+                    results[i] = classified_payloads[payload_key]
+                    duplicate_count += 1
+                    done += 1
+                else:
+                    pending.setdefault(payload_key, []).append(i)
             
-            reclassified.append(result)
+            futures = {executor.submit(_reclassify_one, classifier, inputs[group[0]]): payload_key
+                       for payload_key, group in pending.items()}
+            for future in as_completed(futures):
+                payload_key = futures[future]
+                group = pending[payload_key]
+                done += len(group)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    for i in group:
+                        article = chunk[i]
+                        logger.error("  ❌ [%d%s] Error reclassifying PMID %s: %s", done, progress_total, article['pmid'], e)
+                        errors.append({
+                            'pmid': article['pmid'] or 'unknown',
+                            'error': str(e)
+                        })
+                    continue
+                
+                classified_payloads[payload_key] = result
+                duplicate_count += len(group) - 1
+                fresh_results.append((inputs[group[0]], result))
+                for i in group:
+                    article = chunk[i]
+                    # Per-article changes at DEBUG; the INFO log gets one progress line per chunk
+                    logger.debug("  ✅ [%d%s] Reclassified PMID %s - Old score: %s, New score: %s",
+                                 done, progress_total, article['pmid'],
+                                 article['current_ranking_score'], result.get('ranking_score', 'N/A'))
+                    results[i] = result
             
-            # Rate limiting - be respectful to Claude API
-            # Two API calls per article (filtering + classification)
-            time.sleep(1)
+            classification_cache.store(fresh_results, model_provider)
+            logger.info("  [%d%s] Reclassified %d (%d API runs), %d from cache, %d errors so far",
+                        done, progress_total, sum(results[i] is not None for i in misses), len(fresh_results),
+                        len(chunk) - len(misses), len(errors))
             
-        except Exception as e:
-            logger.error(f"  ❌ Error reclassifying PMID {article['pmid']}: {e}")
-            errors.append({
-                'pmid': article.get('pmid', 'unknown'),
-                'error': str(e)
-            })
+            # Keep the input order for the database update and the summary; only the result, its
+            # article ID and the previous score are kept, not the article data
+            chunk_results = [_tag_result(result, article)
+                             for article, result in zip(chunk, results) if result is not None]
+            reclassified.extend(chunk_results)
+            if on_chunk is not None:
+                on_chunk(chunk_results)
+    
+    if cached_count:
+        logger.info("%d articles served from the classification cache", cached_count)
+    if duplicate_count:
+        logger.info("%d articles shared the classification of an identical article", duplicate_count)
+    if prefilter_hits:
+        saved = sum(prefilter_hits.values())
+        logger.info("Pre-filter rejected %d articles without a filtering call: %s", saved, dict(prefilter_hits))
     
     return reclassified, errors
 
-def verify_update(db_conn, article_id, expected_score):
-    """Verify that an update was actually saved to the database."""
-    try:
-        # Need to commit any pending changes first
-        db_conn.commit()
-        
-        cursor = db_conn.cursor()
-        cursor.execute('''
-            SELECT ranking_score 
-            FROM enhanced_classifications 
-            WHERE article_id = ?
-        ''', (article_id,))
-        result = cursor.fetchone()
-        if result:
-            actual_score = result[0]
-            # Check if score matches
-            if actual_score == expected_score:
-                return True, actual_score
-            else:
-                return False, f"Score mismatch: expected {expected_score}, got {actual_score}"
+def reclassify_articles_batch(articles, model_provider="claude", use_cache=True):
+    """Reclassify articles through Claude Message Batches: half the API cost, results within 24 hours.
+    
+    Same inputs and return value as reclassify_articles. Every cache miss is submitted in one
+    pair of batches, so their classifier inputs are held in memory until the batches end.
+    """
+    classifier = get_classifier(model_provider)
+    reclassified = []
+    cached_count = 0
+    # Payload digest -> classifier input, and -> the articles sharing that payload
+    inputs = {}
+    pending = {}
+    
+    articles = iter(articles)
+    while chunk := list(islice(articles, FETCH_CHUNK)):
+        chunk_inputs = [_classification_input(article) for article in chunk]
+        results = classification_cache.lookup(chunk_inputs, model_provider) if use_cache else [None] * len(chunk)
+        for article, article_input, result in zip(chunk, chunk_inputs, results):
+            if result is not None:
+                cached_count += 1
+                reclassified.append(_tag_result(result, article))
+                continue
+            payload_key = _payload_key(article_input)
+            inputs.setdefault(payload_key, article_input)
+            pending.setdefault(payload_key, []).append(
+                {field: article[field] for field in ('id', 'pmid', 'current_ranking_score')})
+    
+    if cached_count:
+        logger.info("%d articles served from the classification cache", cached_count)
+    logger.info("Submitting %d distinct articles as message batches", len(inputs))
+    payload_keys = list(inputs)
+    results = classifier.classify_articles_via_batch([inputs[payload_key] for payload_key in payload_keys])
+    
+    errors = []
+    fresh_results = []
+    for payload_key, result in zip(payload_keys, results):
+        if _is_cacheable(result):
+            fresh_results.append((inputs[payload_key], result))
+            reclassified.extend(_tag_result(result, article) for article in pending[payload_key])
         else:
-            return False, "No classification found"
-    except Exception as e:
-        return False, f"Verification error: {e}"
+            # Failed, expired or unparseable requests come back as default responses; never store those
+            errors.extend({'pmid': article['pmid'] or 'unknown', 'error': result.get('reason') or 'Classification failed'}
+                          for article in pending[payload_key])
+    classification_cache.store(fresh_results, model_provider)
+    
+    return reclassified, errors
+
+def _classification_data(result):
+    """Classification fields to store for one reclassified article."""
+    classification_data = {
+        'participants': result.get('participants'),
+        'medical_category': result.get('medical_category'),
+        'clinical_bottom_line': result.get('clinical_bottom_line'),
+        'tags': result.get('tags'),
+        'ranking_score': result.get('ranking_score', 0),
+        'ranking_breakdown': result.get('ranking_breakdown', {}),
+        'is_relevant': result.get('is_relevant', True),
+        'reason': result.get('reason')
+    }
+    
+    # Extract individual points from ranking_breakdown
+    breakdown = classification_data.get('ranking_breakdown', {})
+    for field in BREAKDOWN_FIELDS:
+        classification_data[field] = breakdown.get(field, 0)
+    return classification_data
+
+def verify_updates(expected_scores):
+    """Check stored ranking scores against {article_id: expected_score}; returns (article_id, problem) pairs."""
+    problems = []
+    article_ids = list(expected_scores)
+    try:
+        with get_read_connection() as conn:
+            stored = {}
+            for start in range(0, len(article_ids), UPDATE_CHUNK):
+                chunk = article_ids[start:start + UPDATE_CHUNK]
+                stored.update(conn.execute(
+                    f"SELECT article_id, ranking_score FROM enhanced_classifications "
+                    f"WHERE article_id IN ({','.join('?' * len(chunk))})", chunk
+                ))
+    except sqlite3.Error as e:
+        return [(article_id, f"Verification error: {e}") for article_id in article_ids]
+    
+    for article_id, expected_score in expected_scores.items():
+        if article_id not in stored:
+            problems.append((article_id, "No classification found"))
+        elif stored[article_id] != expected_score:
+            problems.append((article_id, f"Score mismatch: expected {expected_score}, got {stored[article_id]}"))
+    return problems
+
+def _store_chunk(db, chunk, expected_scores, failed_articles, defer_indexes=False):
+    """Write one chunk of results in a single transaction, recording what to verify or what failed."""
+    pairs = [(result['article_id'], _classification_data(result)) for result in chunk]
+    if db.update_enhanced_classifications_bulk(pairs, defer_indexes=defer_indexes):
+        for result in chunk:
+            expected_scores[result['article_id']] = result.get('ranking_score', 0)
+        return True
+    # The chunk was rolled back as a whole
+    failed_articles.extend({'pmid': result.get('pmid', 'unknown'), 'id': result['article_id'],
+                            'error': 'Database update failed'} for result in chunk)
+    return False
+
+def _verify(expected_scores):
+    """Verify in one read pass after everything is committed."""
+    for article_id, problem in verify_updates(expected_scores):
+        # If verification fails but update said success, log warning but don't double-count
+        logger.warning("  ⚠️  Verification issue for article ID %s: %s", article_id, problem)
 
 def update_classifications(reclassified_articles):
-    """Update database with new classifications and verify each update."""
+    """Update database with new classifications, UPDATE_CHUNK articles per transaction, then verify them.
+    
+    Runs larger than DEFER_INDEX_THRESHOLD go in a single transaction with index maintenance deferred.
+    """
     updated_count = 0
-    failed_count = 0
     failed_articles = []
+    expected_scores = {}
+    total = len(reclassified_articles)
+    defer_indexes = total > DEFER_INDEX_THRESHOLD
+    chunk_size = total if defer_indexes else UPDATE_CHUNK
     
-    db_path = os.path.join(os.path.dirname(__file__), 'medical_articles.db')
-    conn = sqlite3.connect(db_path)
+    # One pooled connection and one commit per chunk instead of one of each per article
+    with ArticleDatabase() as db:
+        for start in range(0, total, chunk_size):
+            chunk = reclassified_articles[start:start + chunk_size]
+            if _store_chunk(db, chunk, expected_scores, failed_articles, defer_indexes):
+                updated_count += len(chunk)
+                logger.info("  ✅ [%d/%d] Updated %d articles", start + len(chunk), total, len(chunk))
+            else:
+                logger.error("  ❌ [%d/%d] Failed to update %d articles", start + len(chunk), total, len(chunk))
     
-    try:
-        for i, result in enumerate(reclassified_articles):
-            article_id = result['article_id']
-            pmid = result.get('pmid', 'unknown')
-            expected_score = result.get('ranking_score', 0)
-            
-            try:
-                # Prepare classification data
-                classification_data = {
-                    'participants': result.get('participants'),
-                    'medical_category': result.get('medical_category'),
-                    'clinical_bottom_line': result.get('clinical_bottom_line'),
-                    'tags': result.get('tags'),
-                    'ranking_score': expected_score,
-                    'ranking_breakdown': result.get('ranking_breakdown', {}),
-                    'is_relevant': result.get('is_relevant', True),
-                    'reason': result.get('reason')
-                }
-                
-                # Extract individual points from ranking_breakdown
-                breakdown = classification_data.get('ranking_breakdown', {})
-                classification_data['focus_points'] = breakdown.get('focus_points', 0)
-                classification_data['type_points'] = breakdown.get('type_points', 0)
-                classification_data['prevalence_points'] = breakdown.get('prevalence_points', 0)
-                classification_data['hospitalization_points'] = breakdown.get('hospitalization_points', 0)
-                classification_data['clinical_outcome_points'] = breakdown.get('clinical_outcome_points', 0)
-                classification_data['impact_factor_points'] = breakdown.get('impact_factor_points', 0)
-                classification_data['temporality_points'] = breakdown.get('temporality_points', 0)
-                classification_data['prevention_penalty_points'] = breakdown.get('prevention_penalty_points', 0)
-                classification_data['biologic_penalty_points'] = breakdown.get('biologic_penalty_points', 0)
-                classification_data['screening_penalty_points'] = breakdown.get('screening_penalty_points', 0)
-                classification_data['scores_penalty_points'] = breakdown.get('scores_penalty_points', 0)
-                classification_data['subanalysis_penalty_points'] = breakdown.get('subanalysis_penalty_points', 0)
-                
-                # Use ArticleDatabase context manager for proper transaction handling
-                with ArticleDatabase() as db:
-                    # Update the classification
-                    success = db.update_enhanced_classification(article_id, classification_data)
-                    
-                    if success:
-                        updated_count += 1
-                        logger.info(f"  ✅ [{i+1}/{len(reclassified_articles)}] Updated article ID {article_id} (PMID {pmid}) - Score: {expected_score}")
-                    else:
-                        failed_count += 1
-                        failed_articles.append({'pmid': pmid, 'id': article_id, 'error': 'Database update returned False'})
-                        logger.error(f"  ❌ [{i+1}/{len(reclassified_articles)}] Failed to update article ID {article_id} (PMID {pmid})")
-                
-                # Verify the update after the context manager commits
-                is_valid, verification_result = verify_update(conn, article_id, expected_score)
-                if not is_valid:
-                    # If verification fails but update said success, log warning but don't double-count
-                    logger.warning(f"  ⚠️  Verification issue for article ID {article_id} (PMID {pmid}): {verification_result}")
-                
-            except Exception as e:
-                failed_count += 1
-                failed_articles.append({'pmid': pmid, 'id': article_id, 'error': str(e)})
-                logger.error(f"  ❌ [{i+1}/{len(reclassified_articles)}] Exception updating article ID {article_id} (PMID {pmid}): {e}")
-                conn.rollback()
-        
-    finally:
-        conn.close()
+    _verify(expected_scores)
+    return updated_count, len(failed_articles), failed_articles
+
+class StreamingUpdater:
+    """Writes reclassified chunks from a background thread while later chunks are still being classified.
+    
+    Pass put as reclassify_articles' on_chunk, then call finish() for update_classifications' return value.
+    """
+    
+    def __init__(self):
+        self.updated_count = 0
+        self.failed_articles = []
+        self.expected_scores = {}
+        # Bounded, so a stalled database applies back-pressure instead of buffering the whole run
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_CHUNKS)
+        self._thread = threading.Thread(target=self._run, name="reclassify-writer", daemon=True)
+        self._thread.start()
+    
+    def put(self, chunk):
+        """Queue one chunk of tagged results for writing."""
+        if chunk:
+            self._queue.put(chunk)
     
-    return updated_count, failed_count, failed_articles
+    def _run(self):
+        with ArticleDatabase() as db:
+            while (chunk := self._queue.get()) is not None:
+                try:
+                    stored = _store_chunk(db, chunk, self.expected_scores, self.failed_articles)
+                except Exception as e:
+                    # Keep draining, or put() would block the classifier forever
+                    logger.error("  ❌ Writer error: %s", e, exc_info=True)
+                    self.failed_articles.extend({'pmid': result.get('pmid', 'unknown'), 'id': result['article_id'],
+                                                 'error': str(e)} for result in chunk)
+                    continue
+                if stored:
+                    self.updated_count += len(chunk)
+                    logger.info("  ✅ [%d written] Updated %d articles", self.updated_count, len(chunk))
+                else:
+                    logger.error("  ❌ Failed to update %d articles", len(chunk))
+    
+    def finish(self):
+        """Wait for queued chunks to be written, verify them and return (updated, failed, failed_articles)."""
+        self._queue.put(None)
+        self._thread.join()
+        _verify(self.expected_scores)
+        return self.updated_count, len(self.failed_articles), self.failed_articles
 
 def main():
     """Main function to reclassify relevant articles."""
@@ -235,25 +413,31 @@ def main():
     print("=" * 70)
     print()
     
-    # Get relevant articles
-    print("Fetching relevant articles from database...")
-    articles = get_relevant_articles_with_data()
-    print(f"Found {len(articles)} relevant articles to reclassify")
+    # Count up front; the articles themselves are streamed during reclassification
+    print("Counting relevant articles in database...")
+    article_count, avg_abstract_len = count_relevant_articles()
+    print(f"Found {article_count} relevant articles to reclassify")
     print()
     
-    if len(articles) == 0:
+    if article_count == 0:
         print("No relevant articles found. Nothing to reclassify.")
         return
     
     # Show summary
     print("Summary:")
-    print(f"  Total articles: {len(articles)}")
-    avg_abstract_len = sum(len(a.get('abstract', '')) for a in articles) / len(articles)
+    print(f"  Total articles: {article_count}")
     print(f"  Average abstract length: {avg_abstract_len:.0f} characters")
     print()
     
+    # --no-cache forces every article back through the API (fresh results still refresh the cache)
+    use_cache = '--no-cache' not in sys.argv
+    # --batch goes through the Message Batches API: half the cost, but results can take up to 24 hours
+    use_batch = '--batch' in sys.argv
+    
     # Confirm
-    confirm = input(f"Reclassify {len(articles)} articles using Claude Sonnet 4.5? This will make {len(articles) * 2} API calls. (yes/no): ")
+    confirm = input(f"Reclassify {article_count} articles using Claude Sonnet 4.5? This will make up to {article_count * 2} "
+                    f"{'batched requests' if use_batch else 'API calls'}"
+                    f"{'' if use_cache else ' (cache disabled)'}. (yes/no): ")
     if confirm.lower() != "yes":
         print("Cancelled.")
         return
@@ -262,8 +446,18 @@ def main():
     print("Starting reclassification...")
     print("=" * 70)
     
-    # Reclassify
-    reclassified, errors = reclassify_articles(articles, model_provider="claude")
+    # Reclassify; smaller synchronous runs are written chunk by chunk while classification continues,
+    # large ones are written afterwards in one transaction with index maintenance deferred
+    updater = None
+    if use_batch:
+        reclassified, errors = reclassify_articles_batch(iter_relevant_articles_with_data(), model_provider="claude",
+                                                         use_cache=use_cache)
+    else:
+        if article_count <= DEFER_INDEX_THRESHOLD:
+            updater = StreamingUpdater()
+        reclassified, errors = reclassify_articles(iter_relevant_articles_with_data(), model_provider="claude",
+                                                   use_cache=use_cache, total=article_count,
+                                                   on_chunk=updater.put if updater else None)
     
     print()
     print("=" * 70)
@@ -281,7 +475,10 @@ def main():
         print()
         print("Updating database...")
         print("=" * 70)
-        updated_count, failed_count, failed_articles = update_classifications(reclassified)
+        if updater is not None:
+            updated_count, failed_count, failed_articles = updater.finish()
+        else:
+            updated_count, failed_count, failed_articles = update_classifications(reclassified)
         print()
         print("=" * 70)
         print(f"✅ Successfully updated {updated_count} articles in database")
@@ -296,10 +493,10 @@ def main():
         print("SCORE CHANGES SUMMARY")
         print("=" * 70)
         
-        # Get old scores from articles and compare
+        # Each result carries the score it replaced
         score_changes = []
-        for i, result in enumerate(reclassified):
-            old_score = articles[i].get('current_ranking_score')
+        for result in reclassified:
+            old_score = result.get('previous_ranking_score')
             new_score = result.get('ranking_score', 0)
             if old_score is not None:
                 change = new_score - old_score
@@ -311,10 +508,16 @@ def main():
                 })
         
         if score_changes:
-            avg_change = sum(c['change'] for c in score_changes) / len(score_changes)
-            increased = sum(1 for c in score_changes if c['change'] > 0)
-            decreased = sum(1 for c in score_changes if c['change'] < 0)
-            unchanged = sum(1 for c in score_changes if c['change'] == 0)
+            # One pass for the totals; the top fives come from heaps rather than a full sort
+            total_change = increased = decreased = 0
+            for c in score_changes:
+                total_change += c['change']
+                if c['change'] > 0:
+                    increased += 1
+                elif c['change'] < 0:
+                    decreased += 1
+            avg_change = total_change / len(score_changes)
+            unchanged = len(score_changes) - increased - decreased
             
             print(f"Articles with score changes: {len(score_changes)}")
             print(f"  Average change: {avg_change:+.1f} points")
@@ -323,14 +526,14 @@ def main():
             print(f"  Unchanged: {unchanged}")
             
             # Show top 5 increases and decreases
-            sorted_changes = sorted(score_changes, key=lambda x: x['change'], reverse=True)
+            by_change = lambda x: x['change']
             print("\nTop 5 score increases:")
-            for change in sorted_changes[:5]:
+            for change in heapq.nlargest(5, score_changes, key=by_change):
                 print(f"  PMID {change['pmid']}: {change['old']} → {change['new']} ({change['change']:+.1f})")
             
             if decreased > 0:
                 print("\nTop 5 score decreases:")
-                for change in sorted_changes[-5:]:
+                for change in reversed(heapq.nsmallest(5, score_changes, key=by_change)):
                     print(f"  PMID {change['pmid']}: {change['old']} → {change['new']} ({change['change']:+.1f})")
 
 if __name__ == "__main__":
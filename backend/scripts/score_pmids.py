@@ -3,12 +3,14 @@
 Score specific PMIDs: fetch article data from DB, run inclusion-based classification,
 and print all scoring components.
 Usage:
-  python backend/scripts/score_pmids.py 41183339 41183330
+  python backend/scripts/score_pmids.py 41183339 41183330 [--no-cache]
 """
 
+import json
 import os
-import sys
 import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
 # Ensure backend modules are importable when running from project root or scripts
@@ -17,20 +19,25 @@ BACKEND_DIR = os.path.dirname(CURRENT_DIR)
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
 
-# Load .env from backend or project root if present
+# Load .env from backend or project root if present; variables already in the environment win
 try:
     from dotenv import load_dotenv
     backend_env = os.path.join(BACKEND_DIR, '.env')
     project_root = os.path.dirname(BACKEND_DIR)
     root_env = os.path.join(project_root, '.env')
     if os.path.exists(backend_env):
-        load_dotenv(backend_env)
+        load_dotenv(backend_env, override=False)
     elif os.path.exists(root_env):
-        load_dotenv(root_env)
+        load_dotenv(root_env, override=False)
 except Exception:
     pass
 
-from medical_processing.classification.classifier import MedicalArticleClassifier
+from medical_processing.classification import cache as classification_cache
+from medical_processing.classification.classifier import _is_cacheable, get_classifier
+from medical_processing.database.schema import get_connection
+
+# PMIDs classified at once; caps the burst of API calls for long PMID lists
+SCORE_WORKERS = 8
 
 
 def get_db_path() -> str:
@@ -46,19 +53,21 @@ def get_db_path() -> str:
 
 def fetch_articles_by_pmids(pmids: List[str]) -> List[Dict]:
     db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
+    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     try:
-        placeholders = ','.join('?' for _ in pmids)
-        cursor.execute(f"""
+        # One bound JSON array instead of a placeholder per PMID: the statement text is the same
+        # for any number of PMIDs (so it is compiled once) and has no host-parameter limit
+        cursor.execute("""
             SELECT pmid, title, abstract, journal, authors, author_affiliations,
                    publication_date, doi, url, medical_category, article_type,
                    keywords, mesh_terms, publication_type
             FROM articles
-            WHERE pmid IN ({placeholders})
-        """, pmids)
-        cols = [d[0] for d in cursor.description]
-        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+            WHERE pmid IN (SELECT value FROM json_each(?))
+        """, (json.dumps(pmids),))
+        # The classifier and the classification cache read articles with dict.get
+        return [dict(row) for row in cursor]
     finally:
         conn.close()
 
@@ -88,10 +97,12 @@ def print_scoring(pmid: str, classification: Dict) -> None:
 
 
 def main():
-    if len(sys.argv) < 2:
+    # --no-cache re-scores through the API even when the article was classified before
+    use_cache = '--no-cache' not in sys.argv
+    pmids = [arg for arg in sys.argv[1:] if arg != '--no-cache']
+    if not pmids:
         print("Provide at least one PMID, e.g.: python backend/scripts/score_pmids.py 41183339 41183330")
         sys.exit(1)
-    pmids = sys.argv[1:]
 
     articles = fetch_articles_by_pmids(pmids)
     found_pmids = {a['pmid'] for a in articles}
@@ -99,15 +110,28 @@ def main():
     if missing:
         print(f"Warning: PMIDs not found in DB: {', '.join(missing)}")
 
-    classifier = MedicalArticleClassifier(model_provider=os.getenv('MODEL_PROVIDER', 'claude'))
-
-    for article in articles:
-        # Unified two-step: filter, then classify relevant ones only
-        result = classifier.classify_article_enhanced(article)
+    model_provider = os.getenv('MODEL_PROVIDER', 'claude')
+    classifier = get_classifier(model_provider)
+    if use_cache:
+        cached = classification_cache.lookup(articles, model_provider)
+    else:
+        cached = [None] * len(articles)
+
+    # Unified two-step (filter, then classify relevant ones only) for every miss concurrently;
+    # the SDK clients are thread-safe and the latency is the slowest PMID rather than the sum
+    misses = [i for i, result in enumerate(cached) if result is None]
+    fresh_results = []
+    with ThreadPoolExecutor(max_workers=SCORE_WORKERS) as executor:
+        for i, result in zip(misses, executor.map(classifier.classify_article_enhanced,
+                                                  [articles[i] for i in misses])):
+            cached[i] = result
+            if _is_cacheable(result):
+                fresh_results.append((articles[i], result))
+
+    for article, result in zip(articles, cached):
         print_scoring(article['pmid'], result)
+    classification_cache.store(fresh_results, model_provider)
 
 
 if __name__ == '__main__':
     main()
-
-
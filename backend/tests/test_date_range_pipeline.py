@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Test that the date-range fetch/classify/store pipeline returns when a stage fails."""
+
+import asyncio
+import sys
+import os
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+# Run as a script, sys.path[0] is tests/; medical_processing lives one level up in backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medical_processing import service
+from medical_processing.data_collection.pubmed_client import PubMedClient
+
+# Enough EFetch batches that the bounded fetch queue is full when classification fails
+PMIDS = [str(pmid) for pmid in range(1, 2001)]
+TIMEOUT_SECONDS = 30
+
+def _fake_articles(self, content):
+    return [{'pmid': '1', 'title': 'Fake article'}]
+
+async def _failing_classifier(batch, model_provider='claude', concurrency=8):
+    # Slower than EFetch, like the real model, so the fetch queue fills up first
+    await asyncio.sleep(3)
+    raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+
+async def _passing_classifier(batch, model_provider='claude', concurrency=8):
+    return [dict(article, is_relevant=False) for article in batch]
+
+def _run_date_range(classify):
+    """process_articles_by_date_range with PubMed and storage faked out, or None if it did not return."""
+    result = []
+    with mock.patch.object(PubMedClient, 'search_articles_custom_date', return_value=PMIDS), \
+            mock.patch.object(PubMedClient, '_request_batch', return_value=b''), \
+            mock.patch.object(PubMedClient, '_parse_articles_xml', _fake_articles), \
+            mock.patch.object(service, '_unstored_pmids', side_effect=lambda pmids: pmids), \
+            mock.patch.object(service, 'batch_insert_articles', side_effect=len), \
+            mock.patch.object(service, '_load_classifier',
+                              return_value=SimpleNamespace(classify_articles_batch_async=classify)):
+        worker = threading.Thread(
+            target=lambda: result.append(
+                service.MedicalArticlesService().process_articles_by_date_range('2024/01/01', '2024/01/07')
+            ),
+            daemon=True
+        )
+        worker.start()
+        worker.join(TIMEOUT_SECONDS)
+    return result[0] if result else None
+
+def test_failing_stage_returns_error():
+    """A classifier error is reported instead of hanging the run."""
+    result = _run_date_range(_failing_classifier)
+    assert result is not None, f"Pipeline did not return within {TIMEOUT_SECONDS}s"
+    assert result['success'] is False, result
+    assert 'ANTHROPIC_API_KEY' in result['error'], result
+    print(f"✅ Failing classifier reported: {result['error']}")
+
+def test_passing_stages_complete():
+    """Every fetched batch is classified and stored."""
+    result = _run_date_range(_passing_classifier)
+    assert result is not None, f"Pipeline did not return within {TIMEOUT_SECONDS}s"
+    assert result['success'] is True, result
+    assert result['articles_stored'] == result['articles_collected'] == 20, result
+    print(f"✅ Stored {result['articles_stored']} articles")
+
+if __name__ == "__main__":
+    print("🧪 Testing date-range pipeline")
+    print("=" * 50)
+    test_failing_stage_returns_error()
+    test_passing_stages_complete()
+    print("\n🎉 All pipeline tests passed")
@@ -5,8 +5,25 @@ Test script to load and extract information from the medical articles database
 
 import sqlite3
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Independent statistics queries, run concurrently on separate read connections
+STATS_QUERIES = {
+    'total_count': "SELECT COUNT(*) FROM articles;",
+    'journal_count': "SELECT COUNT(DISTINCT journal) FROM articles WHERE journal IS NOT NULL;",
+    'year_count': "SELECT COUNT(DISTINCT substr(publication_date, 1, 4)) FROM articles WHERE publication_date IS NOT NULL;",
+    'recent_articles': "SELECT title, journal, publication_date FROM articles WHERE publication_date IS NOT NULL ORDER BY publication_date DESC LIMIT 5;",
+}
+
+def run_read_query(db_path, query):
+    """Run one read-only query on its own connection (sqlite3 connections are not shared across threads)."""
+    conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
 def test_database_connection():
     """Test basic database connection and structure"""
     db_path = Path(__file__).parent / "medical_articles.db"
@@ -76,24 +93,22 @@ def explore_articles_table():
                     value = str(value)[:100] + "..."
                 print(f"    {col[1]}: {value}")
         
-        # Get some statistics
-        cursor.execute("SELECT COUNT(*) FROM articles;")
-        total_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(DISTINCT journal) FROM articles WHERE journal IS NOT NULL;")
-        journal_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(DISTINCT substr(publication_date, 1, 4)) FROM articles WHERE publication_date IS NOT NULL;")
-        year_count = cursor.fetchone()[0]
+        # Get some statistics; under WAL the readers don't block each other, so the wall
+        # time is the slowest query rather than the sum
+        with ThreadPoolExecutor(max_workers=len(STATS_QUERIES)) as executor:
+            futures = {name: executor.submit(run_read_query, db_path, query)
+                       for name, query in STATS_QUERIES.items()}
+            stats = {name: future.result() for name, future in futures.items()}
+        total_count = stats['total_count'][0][0]
+        journal_count = stats['journal_count'][0][0]
+        year_count = stats['year_count'][0][0]
         
         print(f"\n📈 Statistics:")
         print(f"  - Total articles: {total_count}")
         print(f"  - Unique journals: {journal_count}")
         print(f"  - Years covered: {year_count}")
         
-        # Get recent articles
-        cursor.execute("SELECT title, journal, publication_date FROM articles WHERE publication_date IS NOT NULL ORDER BY publication_date DESC LIMIT 5;")
-        recent_articles = cursor.fetchall()
+        recent_articles = stats['recent_articles']
         
         print(f"\n🆕 Most recent articles:")
         for article in recent_articles:
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for the local prefilter that rejects articles before any filtering call
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medical_processing.classification.classifier import _prefilter_reason
+
+# Adult internal-medicine studies whose titles mention pregnancy, transplants, infants or in vitro work
+KEPT_TITLES = [
+    "Gestational diabetes and later cardiovascular risk in women",
+    "CMV infection in kidney transplant recipients",
+    "In vitro susceptibility of Candida auris bloodstream isolates",
+    "Maternal hypertension and infant outcomes in a national cohort",
+    "Murine typhus in hospitalized patients in southern Texas",
+    "Rat-bite fever presenting as septic arthritis",
+    "Rapid antigen tests (RAT) for influenza in the emergency department",
+    "Mouse allergen exposure and asthma control",
+]
+
+REJECTED_TITLES = {
+    "Semaglutide reduces weight gain in mice": 'Basic science focus',
+    "A rat model of contrast-induced nephropathy": 'Basic science focus',
+    "Hepatic fibrosis in rodents fed a high-fat diet": 'Basic science focus',
+    "Erratum: Apixaban in atrial fibrillation": 'Erratum or retraction notice',
+}
+
+def test_ambiguous_titles_are_kept():
+    """Titles that only look out of scope go to the filtering model"""
+    for title in KEPT_TITLES:
+        reason = _prefilter_reason({'title': title, 'publication_type': 'Journal Article'})
+        assert reason is None, f"{title!r} rejected locally as {reason!r}"
+        print(f"✅ Kept: {title}")
+
+def test_unambiguous_titles_are_rejected():
+    """Animal-only studies and notices are rejected without a filtering call"""
+    for title, expected in REJECTED_TITLES.items():
+        reason = _prefilter_reason({'title': title, 'publication_type': 'Journal Article'})
+        assert reason == expected, f"{title!r} gave {reason!r}, expected {expected!r}"
+        print(f"✅ Rejected ({reason}): {title}")
+
+def test_non_research_publication_type_is_rejected():
+    """Publication types that are never research are rejected whatever the title"""
+    reason = _prefilter_reason({'title': "Heart failure in older adults", 'publication_type': 'Editorial'})
+    assert reason == 'Non-research publication type', reason
+    print("✅ Rejected editorial")
+
+if __name__ == "__main__":
+    print("🧪 Testing classification prefilter")
+    print("=" * 50)
+    test_ambiguous_titles_are_kept()
+    test_unambiguous_titles_are_rejected()
+    test_non_research_publication_type_is_rejected()
+    print("\n🎉 All prefilter tests passed")
@@ -3,44 +3,40 @@
 
 import sys
 import os
-import sqlite3
-import time
 
-sys.path.insert(0, os.path.dirname(__file__))
+# Run as a script, sys.path[0] is tests/; medical_processing lives one level up in backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from medical_processing.classification.classifier import MedicalArticleClassifier
-from medical_processing.database.operations import ArticleDatabase
+from medical_processing.database.operations import BREAKDOWN_FIELDS, ArticleDatabase
+from medical_processing.database.schema import get_read_connection
 
 def test_single_reclassify():
     """Test reclassifying one article."""
-    db_path = os.path.join(os.path.dirname(__file__), 'medical_articles.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    # Pooled reader on the same database ArticleDatabase writes to
+    with get_read_connection() as conn:
+        # Get one relevant article
+        row = conn.execute('''
+            SELECT 
+                a.id,
+                a.pmid,
+                a.title,
+                a.abstract,
+                a.journal,
+                a.mesh_terms,
+                a.publication_type,
+                ec.ranking_score as current_score
+            FROM articles a
+            JOIN enhanced_classifications ec ON a.id = ec.article_id
+            WHERE ec.is_relevant = 1
+            LIMIT 1
+        ''').fetchone()
     
-    # Get one relevant article
-    cursor.execute('''
-        SELECT 
-            a.id,
-            a.pmid,
-            a.title,
-            a.abstract,
-            a.journal,
-            a.mesh_terms,
-            a.publication_type,
-            ec.ranking_score as current_score
-        FROM articles a
-        JOIN enhanced_classifications ec ON a.id = ec.article_id
-        WHERE ec.is_relevant = 1
-        LIMIT 1
-    ''')
-    
-    row = cursor.fetchone()
     if not row:
         print("No relevant articles found")
         return
     
     article_id, pmid, title, abstract, journal, mesh_terms, pub_type, current_score = row
-    conn.close()
     
     print("=" * 70)
     print("TESTING SINGLE ARTICLE RECLASSIFICATION")
@@ -64,7 +60,7 @@ def test_single_reclassify():
     # Reclassify
     print("Reclassifying with Claude Sonnet 4.5...")
     classifier = MedicalArticleClassifier(model_provider="claude")
-    result = classifier.classify_article_enhanced_inclusion_based(article_data)
+    result = classifier.classify_article_enhanced(article_data)
     
     new_score = result.get('ranking_score', 0)
     print(f"✅ Reclassified - Old score: {current_score}, New score: {new_score}")
@@ -84,22 +80,13 @@ def test_single_reclassify():
     }
     
     breakdown = classification_data.get('ranking_breakdown', {})
-    classification_data['focus_points'] = breakdown.get('focus_points', 0)
-    classification_data['type_points'] = breakdown.get('type_points', 0)
-    classification_data['prevalence_points'] = breakdown.get('prevalence_points', 0)
-    classification_data['hospitalization_points'] = breakdown.get('hospitalization_points', 0)
-    classification_data['clinical_outcome_points'] = breakdown.get('clinical_outcome_points', 0)
-    classification_data['impact_factor_points'] = breakdown.get('impact_factor_points', 0)
-    classification_data['temporality_points'] = breakdown.get('temporality_points', 0)
-    classification_data['prevention_penalty_points'] = breakdown.get('prevention_penalty_points', 0)
-    classification_data['biologic_penalty_points'] = breakdown.get('biologic_penalty_points', 0)
-    classification_data['screening_penalty_points'] = breakdown.get('screening_penalty_points', 0)
-    classification_data['scores_penalty_points'] = breakdown.get('scores_penalty_points', 0)
-    classification_data['subanalysis_penalty_points'] = breakdown.get('subanalysis_penalty_points', 0)
+    for field in BREAKDOWN_FIELDS:
+        classification_data[field] = breakdown.get(field, 0)
     
     try:
         with ArticleDatabase() as db:
-            success = db.update_enhanced_classification(article_id, classification_data)
+            # Same single-transaction path the bulk reclassify script writes through
+            success = db.update_enhanced_classifications_bulk([(article_id, classification_data)])
             if success:
                 print(f"✅ Database update returned: {success}")
             else:
@@ -114,15 +101,13 @@ def test_single_reclassify():
     # Verify update
     print()
     print("Verifying update...")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT ranking_score, updated_at, clinical_bottom_line
-        FROM enhanced_classifications
-        WHERE article_id = ?
-    ''', (article_id,))
+    with get_read_connection() as conn:
+        row = conn.execute('''
+            SELECT ranking_score, updated_at, clinical_bottom_line
+            FROM enhanced_classifications
+            WHERE article_id = ?
+        ''', (article_id,)).fetchone()
     
-    row = cursor.fetchone()
     if row:
         db_score, updated_at, bottom_line = row
         print(f"Database score: {db_score}")
@@ -144,8 +129,6 @@ def test_single_reclassify():
             print(f"Expected: {new_score}, Got: {db_score}")
     else:
         print("❌ No classification found in database")
-    
-    conn.close()
 
 if __name__ == "__main__":
     test_single_reclassify()
@@ -1,8 +1,6 @@
-﻿from medical_processing.classification.classifier import MedicalArticleClassifier
+﻿"""Quick manual check that classify_relevant_article returns a category and ranking breakdown."""
 
-classifier = MedicalArticleClassifier(model_provider='claude')
-
-sample = {
+SAMPLE = {
     'title': 'Randomized trial of antibiotics in severe sepsis',
     'abstract': 'A multicenter RCT evaluated early broad-spectrum antibiotics in adults with septic shock...',
     'mesh_terms': 'Sepsis; Anti-Bacterial Agents; Intensive Care Units',
@@ -10,6 +8,14 @@ sample = {
     'journal': 'N Engl J Med'
 }
 
-result = classifier.classify_relevant_article(sample)
-print('HAS_MED_CATEGORY=', 'medical_category' in result, result.get('medical_category'))
-print('RANK_KEYS=', sorted(list(result.get('ranking_breakdown', {}).keys())))
+def main():
+    # Imported here so importing this file doesn't load the SDK or create a client
+    from medical_processing.classification.classifier import MedicalArticleClassifier
+    
+    classifier = MedicalArticleClassifier(model_provider='claude')
+    result = classifier.classify_relevant_article(SAMPLE)
+    print('HAS_MED_CATEGORY=', 'medical_category' in result, result.get('medical_category'))
+    print('RANK_KEYS=', sorted(list(result.get('ranking_breakdown', {}).keys())))
+
+if __name__ == "__main__":
+    main()
@@ -2,270 +2,465 @@
 Email sending utility for sending summary emails.
 """
 
+import atexit
+import heapq
 import os
+import re
 import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from string import Template
+from typing import Optional, Dict, List
 
 logger = logging.getLogger(__name__)
 
+# SMTP settings don't change within a process; the app loads .env before first importing this module
+_SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+_SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+_SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+_SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+_SMTP_FROM_EMAIL = os.getenv('SMTP_FROM_EMAIL') or _SMTP_USERNAME
+_SMTP_CONFIGURED = bool(_SMTP_USERNAME and _SMTP_PASSWORD)
+
+def _minify(html: str) -> str:
+    """Drop the source indentation and line breaks from an HTML scaffold."""
+    return re.sub(r'\n\s*', '', html)
+
+# Shared by every message; repeated inline style attributes would be sent once per element
+_HTML_STYLE = (
+    "body{font-family:Arial,sans-serif;line-height:1.6;color:#333}"
+    ".wrap{max-width:700px;margin:0 auto;padding:20px}"
+    "h2{color:#2563eb;border-bottom:2px solid #2563eb;padding-bottom:10px}"
+    ".box{padding:15px;border-radius:5px;margin:20px 0}"
+    ".box h3{margin-top:0}"
+    ".meta{background-color:#f8f9fa}"
+    ".meta p{margin:5px 0}"
+    ".ok{background-color:#d1fae5;border-left:4px solid #10b981}.ok h3{color:#065f46}"
+    ".info{background-color:#e0f2fe;border-left:4px solid #2563eb}.info h3{color:#1e40af}"
+    ".cat{background-color:#fef3c7;border-left:4px solid #f59e0b}.cat h3{color:#92400e}"
+    ".top{background-color:#ede9fe;border-left:4px solid #8b5cf6}.top h3{color:#6b21a8}"
+    ".filter{background-color:#f3f4f6;border-left:4px solid #6b7280}.filter h3{color:#374151}"
+    ".err{background-color:#fee2e2;border-left:4px solid #dc2626}.err h3{color:#991b1b}.err p{margin:0}"
+    "ul{list-style:none;padding:0}"
+    ".stats li{margin:10px 0}"
+    ".counts,.articles{margin:10px 0}"
+    ".counts li{margin:5px 0}"
+    ".articles li{margin:8px 0;padding:8px;background-color:#f8f9fa;border-radius:4px}"
+    ".score{color:#10b981;font-weight:bold}"
+    ".title{font-size:0.9em}"
+    ".journal{font-size:0.85em;color:#6b7280}"
+    ".empty{margin:10px 0;color:#6b7280}"
+    ".footer{margin-top:30px;padding-top:20px;border-top:1px solid #e5e7eb;color:#6b7280;font-size:12px}"
+)
+
+# Static email scaffolds, minified and parsed once at import; each send only substitutes the $fields
+_HTML_TEMPLATE = Template(_minify("""
+        <html>
+          <head><style>""" + _HTML_STYLE + """</style></head>
+          <body>
+            <div class="wrap">
+              <h2>PubMed Article Processing Summary</h2>
+              <div class="box meta">
+                <p><strong>Date Range:</strong> $start_date to $end_date</p>
+                <p><strong>Status:</strong> $status</p>
+                <p><strong>Processing Time:</strong> $time_str</p>
+              </div>
+              $details
+              <div class="footer">
+                <p>This is an automated notification from the Internal Medicine App article processing system.</p>
+              </div>
+            </div>
+          </body>
+        </html>
+        """))
+
+_HTML_SUCCESS_TEMPLATE = Template(_minify("""
+              <div class="box ok">
+                <h3>Processing Results</h3>
+                <ul class="stats">
+                  <li>📥 <strong>Articles Collected:</strong> $articles_collected</li>
+                  <li>🏷️ <strong>Articles Classified:</strong> $articles_classified</li>
+                  <li>💾 <strong>Articles Stored:</strong> $articles_stored</li>
+                </ul>
+              </div>
+              <div class="box info">
+                <h3>Quality Metrics</h3>
+                <ul class="stats">
+                  <li>⭐ <strong>Average Ranking Score:</strong> $avg_score</li>
+                  <li>🏆 <strong>Articles with Score ≥ 8:</strong> $articles_score_8_plus</li>
+                </ul>
+              </div>
+              $category_section
+              $top_articles_section
+              $filtering_section
+              """))
+
+_HTML_CATEGORY_SECTION = Template(_minify("""
+              <div class="box cat">
+                <h3>Category Breakdown</h3>
+                $category_html
+              </div>
+              """))
+
+_HTML_TOP_ARTICLES_SECTION = Template(_minify("""
+              <div class="box top">
+                <h3>Top 5 Articles by Ranking Score</h3>
+                $top_articles_html
+              </div>
+              """))
+
+_HTML_FILTERING_SECTION = Template(_minify("""
+              <div class="box filter">
+                <h3>Filtering Statistics</h3>
+                $filtering_html
+              </div>
+              """))
+
+_HTML_ERROR_SECTION = Template(_minify("""
+              <div class="box err">
+                <h3>Error Details</h3>
+                <p>$error</p>
+              </div>
+              """))
+
+_HTML_TOP_ARTICLE_ITEM = Template(_minify("""
+                <li>
+                  <strong>#$rank</strong> <span class="score">(Score: $score)</span><br>
+                  <span class="title">$title</span><br>
+                  <span class="journal">$journal</span>
+                </li>
+                """))
+
+_TEXT_TEMPLATE = Template("""
+PubMed Article Processing Summary
+
+Date Range: $start_date to $end_date
+Status: $status
+Processing Time: $time_str
+
+""")
+
+_TEXT_SUCCESS_TEMPLATE = Template("""
+Processing Results:
+- Articles Collected: $articles_collected
+- Articles Classified: $articles_classified
+- Articles Stored: $articles_stored
+
+Quality Metrics:
+- Average Ranking Score: $avg_score
+- Articles with Score ≥ 8: $articles_score_8_plus
+""")
+
+_TEXT_ERROR_TEMPLATE = Template("""
+Error Details:
+$error
+""")
+
+# filtering_stats keys reported in the email, in display order
+_FILTERING_LABELS = (
+    ('ahead_of_print_filtered', 'Ahead of Print Filtered'),
+    ('non_research_filtered', 'Non-Research Filtered'),
+    ('no_abstract_filtered', 'No Abstract Filtered'),
+    ('title_filtered', 'Title Filtered'),
+)
+
+_TEXT_FOOTER = "\n\nThis is an automated notification from the Internal Medicine App article processing system."
+
+def _format_processing_time(processing_time) -> str:
+    """Human-readable processing duration, e.g. '42 seconds', '3m 5s' or '1h 12m'."""
+    if not processing_time:
+        return "N/A"
+    if processing_time < 60:
+        return f"{int(processing_time)} seconds"
+    if processing_time < 3600:
+        minutes = int(processing_time // 60)
+        seconds = int(processing_time % 60)
+        return f"{minutes}m {seconds}s"
+    hours = int(processing_time // 3600)
+    minutes = int((processing_time % 3600) // 60)
+    return f"{hours}h {minutes}m"
+
+def _top_categories(category_breakdown: Dict) -> list:
+    """The ten categories with the most articles, largest first."""
+    return heapq.nlargest(10, category_breakdown.items(), key=lambda x: x[1])
+
+
+class _SMTPPool:
+    """One authenticated SMTP connection, opened on first use and reused across sends."""
+    
+    def __init__(self):
+        self._conn = None
+        # Request threads and the scheduler may send at the same time
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(_SMTP_SERVER, _SMTP_PORT)
+        try:
+            conn.starttls()
+            conn.login(_SMTP_USERNAME, _SMTP_PASSWORD)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+    
+    def _drop(self):
+        """Forget the current connection, closing it without waiting on the server."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+    
+    def _alive(self) -> bool:
+        try:
+            return self._conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def send(self, msg):
+        """Send msg on the shared connection, reconnecting if the server dropped it."""
+        with self._lock:
+            # Servers close idle sessions; a NOOP round trip is far cheaper than TLS + AUTH
+            if self._conn is None or not self._alive():
+                self._drop()
+                self._conn = self._connect()
+            try:
+                self._conn.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+                # Dropped between the NOOP and the send; retry once on a fresh connection
+                self._drop()
+                self._conn = self._connect()
+                self._conn.send_message(msg)
+    
+    def close(self):
+        """Send QUIT and close the connection, if one is open."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.quit()
+                except Exception:
+                    pass
+                self._drop()
+
+_pool = _SMTPPool()
+atexit.register(_pool.close)
+
+# Sends run here so callers don't wait on SMTP; one worker, since sends share one connection anyway
+_EMAIL_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email")
+# Registered after _pool.close, so it runs first (atexit is LIFO): queued emails go out before QUIT
+atexit.register(_EMAIL_EXECUTOR.shutdown, wait=True)
+
+def _build_message(subject: str, summary_data: Dict, start_date: str, end_date: str,
+                   include_plain_text: bool = False) -> EmailMessage:
+    """Build the HTML summary email, with a plain-text alternative if asked; the caller sets the To header."""
+    msg = EmailMessage()
+    msg['Subject'] = subject
+    msg['From'] = _SMTP_FROM_EMAIL
+    
+    # Build email body
+    success = summary_data.get('success', False)
+    error = summary_data.get('error') or 'Unknown error occurred during processing.'
+    statistics = summary_data.get('statistics', {})
+    filtering_stats = summary_data.get('filtering_stats', {})
+    category_breakdown = statistics.get('category_breakdown', {})
+    top_articles = statistics.get('top_articles', [])
+    time_str = _format_processing_time(summary_data.get('processing_time_seconds', 0))
+    
+    # Fields shared by the HTML and plain-text bodies
+    fields = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'time_str': time_str,
+        'articles_collected': summary_data.get('articles_collected', 0),
+        'articles_classified': summary_data.get('articles_classified', 0),
+        'articles_stored': summary_data.get('articles_stored', 0),
+        'avg_score': statistics.get('avg_ranking_score', 0),
+        'articles_score_8_plus': statistics.get('articles_score_8_plus', 0),
+        'error': error,
+    }
+    category_items = _top_categories(category_breakdown) if category_breakdown else []
+    
+    # Only the filters that removed something are listed
+    filtering_counts = [(label, filtering_stats.get(key, 0)) for key, label in _FILTERING_LABELS
+                        if filtering_stats.get(key, 0) > 0]
+    
+    # Fragments are joined once rather than grown with += (which copies the string each time)
+    category_html = (
+        "<ul class='counts'>"
+        + "".join(f"<li>{category}: <strong>{count}</strong></li>"
+                  for category, count in category_items)
+        + "</ul>"
+    ) if category_breakdown else ""
+    
+    top_articles_html = (
+        "<ul class='articles'>"
+        + "".join(_HTML_TOP_ARTICLE_ITEM.substitute(
+            rank=i,
+            score=article.get('score', 0),
+            title=article.get('title', 'Untitled'),
+            journal=article.get('journal', 'Unknown')
+        ) for i, article in enumerate(top_articles, 1))
+        + "</ul>"
+    ) if top_articles else ""
+    
+    filtering_html = (
+        "<ul class='counts'>"
+        + "".join(f"<li>{label}: <strong>{count}</strong></li>"
+                  for label, count in filtering_counts)
+        + "</ul>"
+    ) if filtering_stats else ""
+    
+    # HTML email body
+    if success:
+        details = _HTML_SUCCESS_TEMPLATE.substitute(
+            fields,
+            category_section=_HTML_CATEGORY_SECTION.substitute(category_html=category_html) if category_breakdown else '',
+            top_articles_section=_HTML_TOP_ARTICLES_SECTION.substitute(top_articles_html=top_articles_html) if top_articles else '',
+            filtering_section=_HTML_FILTERING_SECTION.substitute(
+                filtering_html=filtering_html or '<p class="empty">No filtering statistics available</p>'
+            ) if filtering_stats else ''
+        )
+    else:
+        details = _HTML_ERROR_SECTION.substitute(fields)
+    html_body = _HTML_TEMPLATE.substitute(fields, status='✅ Success' if success else '❌ Failed', details=details)
+    
+    if not include_plain_text:
+        msg.set_content(html_body, subtype='html')
+        return msg
+    
+    # Plain text email body (fallback)
+    text_parts = [_TEXT_TEMPLATE.substitute(fields, status='Success' if success else 'Failed')]
+    if success:
+        text_parts.append(_TEXT_SUCCESS_TEMPLATE.substitute(fields))
+        
+        if category_breakdown:
+            text_parts.append("\nCategory Breakdown:\n")
+            text_parts.extend(f"- {category}: {count}\n" for category, count in category_items)
+        
+        if top_articles:
+            text_parts.append("\nTop 5 Articles by Ranking Score:\n")
+            text_parts.extend(
+                f"{i}. (Score: {article.get('score', 0)}) {article.get('title', 'Untitled')} - "
+                f"{article.get('journal', 'Unknown')}\n"
+                for i, article in enumerate(top_articles, 1)
+            )
+        
+        if filtering_stats:
+            text_parts.append("\nFiltering Statistics:\n")
+            text_parts.extend(f"- {label}: {count}\n" for label, count in filtering_counts)
+    else:
+        text_parts.append(_TEXT_ERROR_TEMPLATE.substitute(fields))
+    
+    text_parts.append(_TEXT_FOOTER)
+    text_body = "".join(text_parts)
+    
+    # Plain text first, HTML as the preferred alternative (multipart/alternative)
+    msg.set_content(text_body)
+    msg.add_alternative(html_body, subtype='html')
+    return msg
+
+def _send_message(msg: EmailMessage, to_email: str) -> bool:
+    """Send a built message on the shared connection; runs on the email worker thread."""
+    try:
+        _pool.send(msg)
+        logger.info(f"Successfully sent summary email to {to_email}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to send summary email to {to_email}: {e}", exc_info=True)
+        return False
+
+def _send_to_each(msg: EmailMessage, to_emails: List[str]):
+    """Send one built message to each recipient in turn, swapping only the To header."""
+    for to_email in to_emails:
+        del msg['To']
+        msg['To'] = to_email
+        _send_message(msg, to_email)
 
 def send_summary_email(
     to_email: str,
     subject: str,
     summary_data: Dict,
     start_date: str,
-    end_date: str
+    end_date: str,
+    include_plain_text: bool = False
 ) -> bool:
     """
     Send a summary email to the admin who initiated the article fetch.
     
+    The message is built right away and sent in the background; the outcome of the
+    send itself is logged.
+    
     Args:
         to_email: Email address of the recipient
         subject: Email subject line
         summary_data: Dictionary containing summary statistics
         start_date: Start date of the processing
         end_date: End date of the processing
+        include_plain_text: Also attach a plain-text alternative to the HTML body
     
     Returns:
-        True if email was sent successfully, False otherwise
+        True if the email was queued for sending, False otherwise
     """
     try:
-        # Get SMTP configuration from environment variables
-        smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        smtp_username = os.getenv('SMTP_USERNAME')
-        smtp_password = os.getenv('SMTP_PASSWORD')
-        from_email = os.getenv('SMTP_FROM_EMAIL', smtp_username)
-        
         # If SMTP credentials are not configured, log and skip
-        if not smtp_username or not smtp_password:
+        if not _SMTP_CONFIGURED:
             logger.warning(
                 "SMTP credentials not configured. Skipping email notification. "
                 "Set SMTP_USERNAME, SMTP_PASSWORD, and optionally SMTP_SERVER, SMTP_PORT, SMTP_FROM_EMAIL"
             )
             return False
         
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = from_email
+        msg = _build_message(subject, summary_data, start_date, end_date, include_plain_text)
         msg['To'] = to_email
+        _EMAIL_EXECUTOR.submit(_send_message, msg, to_email)
+        return True
         
-        # Build email body
-        success = summary_data.get('success', False)
-        articles_collected = summary_data.get('articles_collected', 0)
-        articles_classified = summary_data.get('articles_classified', 0)
-        articles_stored = summary_data.get('articles_stored', 0)
-        error = summary_data.get('error')
-        processing_time = summary_data.get('processing_time_seconds', 0)
-        statistics = summary_data.get('statistics', {})
-        filtering_stats = summary_data.get('filtering_stats', {})
-        
-        # Format processing time
-        if processing_time:
-            if processing_time < 60:
-                time_str = f"{int(processing_time)} seconds"
-            elif processing_time < 3600:
-                minutes = int(processing_time // 60)
-                seconds = int(processing_time % 60)
-                time_str = f"{minutes}m {seconds}s"
-            else:
-                hours = int(processing_time // 3600)
-                minutes = int((processing_time % 3600) // 60)
-                time_str = f"{hours}h {minutes}m"
-        else:
-            time_str = "N/A"
-        
-        # Extract statistics
-        avg_score = statistics.get('avg_ranking_score', 0)
-        articles_score_8_plus = statistics.get('articles_score_8_plus', 0)
-        category_breakdown = statistics.get('category_breakdown', {})
-        top_articles = statistics.get('top_articles', [])
-        
-        # Build category breakdown HTML
-        category_html = ""
-        if category_breakdown:
-            category_items = sorted(category_breakdown.items(), key=lambda x: x[1], reverse=True)
-            category_html = "<ul style='list-style: none; padding: 0; margin: 10px 0;'>"
-            for category, count in category_items[:10]:  # Top 10 categories
-                category_html += f"<li style='margin: 5px 0;'>{category}: <strong>{count}</strong></li>"
-            category_html += "</ul>"
-        else:
-            category_html = "<p style='margin: 10px 0; color: #6b7280;'>No categories available</p>"
-        
-        # Build top articles HTML
-        top_articles_html = ""
-        if top_articles:
-            top_articles_html = "<ul style='list-style: none; padding: 0; margin: 10px 0;'>"
-            for i, article in enumerate(top_articles, 1):
-                title = article.get('title', 'Untitled')
-                score = article.get('score', 0)
-                journal = article.get('journal', 'Unknown')
-                top_articles_html += f"""
-                <li style='margin: 8px 0; padding: 8px; background-color: #f8f9fa; border-radius: 4px;'>
-                  <strong>#{i}</strong> <span style='color: #10b981; font-weight: bold;'>(Score: {score})</span><br>
-                  <span style='font-size: 0.9em;'>{title}</span><br>
-                  <span style='font-size: 0.85em; color: #6b7280;'>{journal}</span>
-                </li>
-                """
-            top_articles_html += "</ul>"
-        else:
-            top_articles_html = "<p style='margin: 10px 0; color: #6b7280;'>No articles available</p>"
-        
-        # Build filtering stats HTML
-        filtering_html = ""
-        if filtering_stats:
-            filtering_html = "<ul style='list-style: none; padding: 0; margin: 10px 0;'>"
-            if filtering_stats.get('ahead_of_print_filtered', 0) > 0:
-                filtering_html += f"<li style='margin: 5px 0;'>Ahead of Print Filtered: <strong>{filtering_stats.get('ahead_of_print_filtered', 0)}</strong></li>"
-            if filtering_stats.get('non_research_filtered', 0) > 0:
-                filtering_html += f"<li style='margin: 5px 0;'>Non-Research Filtered: <strong>{filtering_stats.get('non_research_filtered', 0)}</strong></li>"
-            if filtering_stats.get('no_abstract_filtered', 0) > 0:
-                filtering_html += f"<li style='margin: 5px 0;'>No Abstract Filtered: <strong>{filtering_stats.get('no_abstract_filtered', 0)}</strong></li>"
-            if filtering_stats.get('title_filtered', 0) > 0:
-                filtering_html += f"<li style='margin: 5px 0;'>Title Filtered: <strong>{filtering_stats.get('title_filtered', 0)}</strong></li>"
-            filtering_html += "</ul>"
-        
-        # HTML email body
-        html_body = f"""
-        <html>
-          <head></head>
-          <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 700px; margin: 0 auto; padding: 20px;">
-              <h2 style="color: #2563eb; border-bottom: 2px solid #2563eb; padding-bottom: 10px;">PubMed Article Processing Summary</h2>
-              
-              <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                <p style="margin: 5px 0;"><strong>Date Range:</strong> {start_date} to {end_date}</p>
-                <p style="margin: 5px 0;"><strong>Status:</strong> {'✅ Success' if success else '❌ Failed'}</p>
-                <p style="margin: 5px 0;"><strong>Processing Time:</strong> {time_str}</p>
-              </div>
-              
-              {f'''
-              <div style="background-color: #d1fae5; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #10b981;">
-                <h3 style="margin-top: 0; color: #065f46;">Processing Results</h3>
-                <ul style="list-style: none; padding: 0;">
-                  <li style="margin: 10px 0;">📥 <strong>Articles Collected:</strong> {articles_collected}</li>
-                  <li style="margin: 10px 0;">🏷️ <strong>Articles Classified:</strong> {articles_classified}</li>
-                  <li style="margin: 10px 0;">💾 <strong>Articles Stored:</strong> {articles_stored}</li>
-                </ul>
-              </div>
-              
-              <div style="background-color: #e0f2fe; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #2563eb;">
-                <h3 style="margin-top: 0; color: #1e40af;">Quality Metrics</h3>
-                <ul style="list-style: none; padding: 0;">
-                  <li style="margin: 10px 0;">⭐ <strong>Average Ranking Score:</strong> {avg_score}</li>
-                  <li style="margin: 10px 0;">🏆 <strong>Articles with Score ≥ 8:</strong> {articles_score_8_plus}</li>
-                </ul>
-              </div>
-              
-              {f'''
-              <div style="background-color: #fef3c7; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #f59e0b;">
-                <h3 style="margin-top: 0; color: #92400e;">Category Breakdown</h3>
-                {category_html}
-              </div>
-              ''' if category_breakdown else ''}
-              
-              {f'''
-              <div style="background-color: #ede9fe; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #8b5cf6;">
-                <h3 style="margin-top: 0; color: #6b21a8;">Top 5 Articles by Ranking Score</h3>
-                {top_articles_html}
-              </div>
-              ''' if top_articles else ''}
-              
-              {f'''
-              <div style="background-color: #f3f4f6; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #6b7280;">
-                <h3 style="margin-top: 0; color: #374151;">Filtering Statistics</h3>
-                {filtering_html if filtering_html else '<p style="margin: 10px 0; color: #6b7280;">No filtering statistics available</p>'}
-              </div>
-              ''' if filtering_stats else ''}
-              ''' if success else f'''
-              <div style="background-color: #fee2e2; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #dc2626;">
-                <h3 style="margin-top: 0; color: #991b1b;">Error Details</h3>
-                <p style="margin: 0;">{error or 'Unknown error occurred during processing.'}</p>
-              </div>
-              '''}
-              
-              <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #e5e7eb; color: #6b7280; font-size: 12px;">
-                <p>This is an automated notification from the Internal Medicine App article processing system.</p>
-              </div>
-            </div>
-          </body>
-        </html>
-        """
-        
-        # Plain text email body (fallback)
-        text_body = f"""
-PubMed Article Processing Summary
-
-Date Range: {start_date} to {end_date}
-Status: {'Success' if success else 'Failed'}
-Processing Time: {time_str}
-
-"""
-        if success:
-            text_body += f"""
-Processing Results:
-- Articles Collected: {articles_collected}
-- Articles Classified: {articles_classified}
-- Articles Stored: {articles_stored}
+    except Exception as e:
+        logger.error(f"Failed to queue summary email to {to_email}: {e}", exc_info=True)
+        return False
 
-Quality Metrics:
-- Average Ranking Score: {avg_score}
-- Articles with Score ≥ 8: {articles_score_8_plus}
-"""
-            
-            if category_breakdown:
-                text_body += "\nCategory Breakdown:\n"
-                category_items = sorted(category_breakdown.items(), key=lambda x: x[1], reverse=True)
-                for category, count in category_items[:10]:
-                    text_body += f"- {category}: {count}\n"
-            
-            if top_articles:
-                text_body += "\nTop 5 Articles by Ranking Score:\n"
-                for i, article in enumerate(top_articles, 1):
-                    title = article.get('title', 'Untitled')
-                    score = article.get('score', 0)
-                    journal = article.get('journal', 'Unknown')
-                    text_body += f"{i}. (Score: {score}) {title} - {journal}\n"
-            
-            if filtering_stats:
-                text_body += "\nFiltering Statistics:\n"
-                if filtering_stats.get('ahead_of_print_filtered', 0) > 0:
-                    text_body += f"- Ahead of Print Filtered: {filtering_stats.get('ahead_of_print_filtered', 0)}\n"
-                if filtering_stats.get('non_research_filtered', 0) > 0:
-                    text_body += f"- Non-Research Filtered: {filtering_stats.get('non_research_filtered', 0)}\n"
-                if filtering_stats.get('no_abstract_filtered', 0) > 0:
-                    text_body += f"- No Abstract Filtered: {filtering_stats.get('no_abstract_filtered', 0)}\n"
-                if filtering_stats.get('title_filtered', 0) > 0:
-                    text_body += f"- Title Filtered: {filtering_stats.get('title_filtered', 0)}\n"
-        else:
-            text_body += f"""
-Error Details:
-{error or 'Unknown error occurred during processing.'}
-"""
-        
-        text_body += "\n\nThis is an automated notification from the Internal Medicine App article processing system."
-        
-        # Attach both plain text and HTML versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
+def send_summary_email_bulk(
+    to_emails: List[str],
+    subject: str,
+    summary_data: Dict,
+    start_date: str,
+    end_date: str,
+    include_plain_text: bool = False
+) -> bool:
+    """
+    Send the same summary email to several admins.
+    
+    The message is built once; each recipient gets their own copy with only the To
+    header changed, sent in the background on the shared connection.
+    
+    Args:
+        to_emails: Email addresses of the recipients
+        subject: Email subject line
+        summary_data: Dictionary containing summary statistics
+        start_date: Start date of the processing
+        end_date: End date of the processing
+        include_plain_text: Also attach a plain-text alternative to the HTML body
+    
+    Returns:
+        True if the emails were queued for sending, False otherwise
+    """
+    if not to_emails:
+        return False
+    try:
+        if not _SMTP_CONFIGURED:
+            logger.warning(
+                "SMTP credentials not configured. Skipping email notification. "
+                "Set SMTP_USERNAME, SMTP_PASSWORD, and optionally SMTP_SERVER, SMTP_PORT, SMTP_FROM_EMAIL"
+            )
+            return False
         
-        logger.info(f"Successfully sent summary email to {to_email}")
+        msg = _build_message(subject, summary_data, start_date, end_date, include_plain_text)
+        _EMAIL_EXECUTOR.submit(_send_to_each, msg, list(to_emails))
         return True
         
     except Exception as e:
-        logger.error(f"Failed to send summary email to {to_email}: {e}", exc_info=True)
+        logger.error(f"Failed to queue summary emails to {', '.join(to_emails)}: {e}", exc_info=True)
         return False
-